@@ -1,16 +1,20 @@
 """Centralized authentication and authorization dependencies"""
 
-from typing import List
+from typing import List, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
 
 from app.core import database
 from app.core.config import settings
 from app.core import security
-from app.core.rbac import get_role_permissions
+from app.core.rbac import role_has_permission
+from app.core.principal_cache import Principal, principal_cache, attach, attach_async
+from app.core.token_revocation import revocation_table, TOKEN_OK, USER_INACTIVE
 from app.models.user import User
+from app.models.tenant import Tenant
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token")
@@ -32,23 +36,124 @@ def get_current_user(
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    credentials_exception = HTTPException(
+    payload = _decode_payload(token)
+    user_id = _user_id(payload)
+    claimed = _user_from_claims(user_id, payload)
+    if claimed is not None:
+        return db.merge(claimed, load=False)
+    if principal_cache.enabled:
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return _ensure_active(attach(principal, db))
+
+    return _ensure_active(_load_user(user_id, db))
+
+
+def _load_user(user_id: int, db: Session) -> Optional[User]:
+    """
+    Cache miss. With a separate read pool (replica, SQLite WAL profile) the
+    lookup runs there and the result is attached to `db` without a SELECT, so
+    the request's primary session holds no connection until it writes.
+    """
+    if database.read_engine is not database.engine:
+        read_db = database.ReadSessionLocal()
+        try:
+            user = read_db.query(User).filter(User.id == user_id).first()
+            if user is not None:
+                principal = (principal_cache.put(user, user.tenant) if principal_cache.enabled
+                             else Principal(user, user.tenant, principal_cache.ttl))
+        finally:
+            read_db.close()
+        if user is not None:
+            return attach(principal, db)
+        # Not on the replica yet (just registered): ask the primary
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None and principal_cache.enabled:
+        principal_cache.put(user, user.tenant)
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(database.get_async_db)
+) -> User:
+    """
+    Async counterpart of get_current_user for endpoints on the AsyncSession path.
+    Relationships on the returned user are not loaded; use tenant_id / role columns.
+    """
+    payload = _decode_payload(token)
+    user_id = _user_id(payload)
+    claimed = _user_from_claims(user_id, payload)
+    if claimed is not None:
+        return await db.merge(claimed, load=False)
+    if principal_cache.enabled:
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return _ensure_active(await attach_async(principal, db))
+
+    user = await db.get(User, user_id)
+    if user is not None and principal_cache.enabled:
+        tenant = await db.get(Tenant, user.tenant_id) if user.tenant_id else None
+        principal_cache.put(user, tenant)
+    return _ensure_active(user)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _decode_payload(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+def _user_id(payload: dict) -> int:
+    return int(payload["sub"])
+
+
+def _user_from_claims(user_id: int, payload: dict) -> Optional[User]:
+    """
+    For self-contained tokens (JWT_SELF_CONTAINED), build the user from the
+    claims once the revocation table confirms the token version. Returns a
+    detached User with only the authorization columns set (other columns load
+    on first access), or None to fall back to the database lookup.
+    """
+    if not settings.JWT_SELF_CONTAINED or "ver" not in payload:
+        return None
+    status_ = revocation_table.check(user_id, payload["ver"])
+    if status_ == USER_INACTIVE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+    if status_ != TOKEN_OK:
+        raise _credentials_exception()
+    user = User(
+        id=user_id,
+        tenant_id=payload.get("tid"),
+        role=payload.get("role"),
+        role_id=payload.get("rid"),
+        is_superuser=bool(payload.get("su")),
+        is_active=True,
+        token_version=payload["ver"],
+    )
+    make_transient_to_detached(user)
+    return user
+
+
+def _ensure_active(user: User) -> User:
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     if not user.is_active:
         raise HTTPException(
@@ -75,20 +180,43 @@ def require_role(allowed_roles: List[str]):
             ...
     """
     def role_checker(current_user: User = Depends(get_current_user)) -> User:
-        if current_user.role not in allowed_roles:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Access denied. Required role: {', '.join(allowed_roles)}"
-            )
+        _check_role(current_user, allowed_roles)
         return current_user
     
     return role_checker
 
 
+def require_role_async(allowed_roles: List[str]):
+    """
+    Async counterpart of require_role, resolved via get_current_user_async.
+    """
+    async def role_checker(current_user: User = Depends(get_current_user_async)) -> User:
+        _check_role(current_user, allowed_roles)
+        return current_user
+
+    return role_checker
+
+
+def _check_role(user: User, allowed_roles: List[str]):
+    if user.role not in allowed_roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Access denied. Required role: {', '.join(allowed_roles)}"
+        )
+
+
 # Convenience dependencies for common role requirements
 require_admin = require_role(["admin"])
 require_manager_or_above = require_role(["admin", "manager"])
 require_any_role = require_role(["admin", "manager", "cashier"])
+require_manager_or_above_async = require_role_async(["admin", "manager"])
+
+
+def require_superuser(current_user: User = Depends(get_current_user)) -> User:
+    """Platform operators only; a tenant's admin role is not enough."""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Super Admin access required")
+    return current_user
 
 def require_permission(permission: str):
     """
@@ -101,8 +229,7 @@ def require_permission(permission: str):
         Dependency function that validates user permission
     """
     def permission_checker(current_user: User = Depends(get_current_user)) -> User:
-        user_permissions = get_role_permissions(current_user.role)
-        if permission not in user_permissions:
+        if not role_has_permission(current_user.role, permission):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Access denied. Required permission: {permission}"
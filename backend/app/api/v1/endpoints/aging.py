@@ -14,7 +14,7 @@ router = APIRouter()
 
 @router.get("/receivables")
 def get_aging_receivables(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: User = Depends(require_manager_or_above)
 ):
     """
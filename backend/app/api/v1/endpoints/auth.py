@@ -1,8 +1,12 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.core import security, database
+from app.core.config import settings
+from app.core.login_guard import login_guard
+from app.core.password_hashing import hash_password_async, verify_and_update
 from app.services import auth_service
 from app.schemas import auth as schemas
 from app.core.ratelimit import limiter
@@ -13,49 +17,103 @@ router = APIRouter()
 
 @router.post("/register", response_model=schemas.User)
 @limiter.limit("5/minute")
-def register(request: Request, user_in: schemas.UserCreate, db: Session = Depends(database.get_db)):
-    user = auth_service.get_user_by_email(db, email=user_in.email)
-    if user:
+async def register(request: Request, user_in: schemas.UserCreate, db: Session = Depends(database.get_db)):
+    # Async like login: bcrypt waits on the hashing pool, the DB work runs in the threadpool
+    if await run_in_threadpool(_email_taken, db, user_in.email):
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
         )
-    user = auth_service.create_user(db, user=user_in)
-    return user
+    hashed_password = await hash_password_async(user_in.password)
+    return await run_in_threadpool(auth_service.create_user, db, user_in, hashed_password)
+
+
+def _email_taken(db: Session, email: str) -> bool:
+    taken = auth_service.get_user_by_email(db, email=email) is not None
+    # Return the connection to the pool while bcrypt runs
+    db.close()
+    return taken
 
 @router.post("/login/access-token", response_model=schemas.Token)
 @limiter.limit("10/minute")
-def login_access_token(request: Request, db: Session = Depends(database.get_db), form_data: OAuth2PasswordRequestForm = Depends()):
-    # Get client IP
+async def login_access_token(request: Request, db: Session = Depends(database.get_db), form_data: OAuth2PasswordRequestForm = Depends()):
+    # Async so bcrypt waits on the dedicated hashing pool, not a request thread;
+    # the DB and counter work around it still runs in the threadpool
     client_ip = request.client.host
-    
-    # 1. Check if IP is banned
-    if security_service.is_ip_blocked(db, client_ip):
-        raise HTTPException(status_code=403, detail="Access denied. IP is blocked.")
-
-    user = auth_service.get_user_by_email(db, email=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
-        # 2. Log failed attempt
-        security_service.log_event(
-            db, 
-            event_type=SecurityEventType.LOGIN_FAILED, 
-            ip_address=client_ip, 
-            description=f"Failed login for {form_data.username}",
-            severity="medium"
+
+    # 1. Banned IPs (and CIDR ranges) are rejected earlier by BlockedIPMiddleware
+
+    user, locked = await run_in_threadpool(_load_login_user, db, form_data.username)
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update(form_data.password, user.hashed_password)
+    return await run_in_threadpool(_finish_login, db, client_ip, form_data.username, user if valid else None, new_hash, locked)
+
+
+def _load_login_user(db: Session, email: str):
+    # 2. Account under a credential-stuffing attack: only the right password gets in
+    # (refusing outright would let anyone lock a known account out)
+    locked = login_guard.email_locked(email)
+    user = auth_service.get_user_by_email(db, email=email)
+    # Return the connection to the pool while bcrypt runs; the loaded user stays usable
+    db.close()
+    return user, locked
+
+
+def _finish_login(db: Session, client_ip: str, email: str, user, new_hash, locked: bool = False):
+    if not user:
+        # 3. Count the failure in memory; the event is persisted in the background
+        ip_failures, email_failures = login_guard.record_failure(client_ip, email)
+        security_service.record_event(
+            event_type=SecurityEventType.LOGIN_FAILED,
+            ip_address=client_ip,
+            description=f"Failed login for {email}",
+            severity="medium",
+            user_email=email
         )
-        
-        # 3. Check threshold and ban if necessary
-        if security_service.check_login_failures(db, client_ip):
-             raise HTTPException(status_code=403, detail="Too many failed attempts. IP blocked.")
-             
+
+        # 4. Ban only when the threshold trips
+        if login_guard.ip_tripped(ip_failures):
+            security_service.ban_ip(
+                db,
+                client_ip,
+                reason=f"Too many failed login attempts ({ip_failures} in {settings.LOGIN_FAILURE_WINDOW_SECONDS // 60}m)",
+                duration_minutes=settings.LOGIN_BAN_MINUTES
+            )
+            security_service.record_event(
+                event_type=SecurityEventType.BRUTE_FORCE,
+                ip_address=client_ip,
+                description=f"IP banned after {ip_failures} failed logins",
+                severity="high",
+                user_email=email
+            )
+            raise HTTPException(status_code=403, detail="Too many failed attempts. IP blocked.")
+
+        if email_failures == login_guard.email_threshold and not locked:
+            security_service.record_event(
+                event_type=SecurityEventType.BRUTE_FORCE,
+                ip_address=client_ip,
+                description=f"Account locked after {email_failures} failed logins from multiple IPs",
+                severity="high",
+                user_email=email
+            )
+
+        if locked:
+            raise HTTPException(status_code=429, detail="Too many failed attempts for this account. Try again later.")
         raise HTTPException(status_code=400, detail="Incorrect email or password")
-        
+
+    login_guard.record_success(email)
+
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    
+
+    # 5. Stored hash uses an older BCRYPT_ROUNDS: replace it now that we know the password
+    if new_hash:
+        auth_service.upgrade_password_hash(db, user.id, new_hash)
+
     access_token_expires = timedelta(minutes=security.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
-        "access_token": security.create_access_token(user.id, expires_delta=access_token_expires),
+        "access_token": security.create_access_token(user.id, expires_delta=access_token_expires, claims=security.token_claims(user)),
         "token_type": "bearer",
     }
 
@@ -77,7 +135,7 @@ def login_google(token: str, db: Session = Depends(database.get_db)):
     
     access_token_expires = timedelta(minutes=security.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
-        "access_token": security.create_access_token(user.id, expires_delta=access_token_expires),
+        "access_token": security.create_access_token(user.id, expires_delta=access_token_expires, claims=security.token_claims(user)),
         "token_type": "bearer",
     }
 
@@ -99,6 +157,6 @@ def login_github(code: str, db: Session = Depends(database.get_db)):
     
     access_token_expires = timedelta(minutes=security.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
-        "access_token": security.create_access_token(user.id, expires_delta=access_token_expires),
+        "access_token": security.create_access_token(user.id, expires_delta=access_token_expires, claims=security.token_claims(user)),
         "token_type": "bearer",
     }
@@ -10,7 +10,7 @@ router = APIRouter()
 
 @router.get("/inventory", response_class=StreamingResponse)
 def export_inventory(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: User = Depends(require_admin),
 ):
     csv_file = backup_service.export_inventory_csv(db, current_user.tenant_id)
@@ -20,7 +20,7 @@ def export_inventory(
 
 @router.get("/sales", response_class=StreamingResponse)
 def export_sales(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: User = Depends(require_admin),
 ):
     csv_file = backup_service.export_sales_csv(db, current_user.tenant_id)
@@ -30,7 +30,7 @@ def export_sales(
 
 @router.get("/customers", response_class=StreamingResponse)
 def export_customers(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: User = Depends(require_admin),
 ):
     csv_file = backup_service.export_customers_csv(db, current_user.tenant_id)
@@ -1,19 +1,22 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func
 from datetime import datetime, timedelta, date
 from app.core import database
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user_async
 from app.models import User, Sale, InventoryItem
 
 router = APIRouter()
 
 @router.get("/stats")
-def get_dashboard_stats(
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(get_current_user),
+async def get_dashboard_stats(
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    tenant_id = current_user.tenant_id
+    return await database.run_sync(db, get_stats, current_user.tenant_id)
+
+def get_stats(db: Session, tenant_id: int):
     today = date.today()
     yesterday = today - timedelta(days=1)
 
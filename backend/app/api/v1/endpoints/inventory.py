@@ -1,6 +1,7 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import database, security
 from app.services import inventory_service
 from app.schemas import item as schemas
@@ -12,32 +13,40 @@ from app.models import User, InventoryItem
 from app.core.rbac import check_plan_limits
 
 # Import centralized auth dependencies
-from app.api.dependencies import get_current_user, require_manager_or_above
+from app.api.dependencies import get_current_user, get_current_user_async, require_manager_or_above
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Item])
-def read_items(
+async def read_items(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    items = inventory_service.get_items(db, tenant_id=current_user.tenant_id, skip=skip, limit=limit)
-    return items
+    return await database.run_sync(
+        db, inventory_service.get_items, tenant_id=current_user.tenant_id, skip=skip, limit=limit
+    )
 
 @router.get("/scan/{barcode}", response_model=schemas.Item)
-def scan_item(
+async def scan_item(
     barcode: str,
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     """
     Scan an item by barcode or QR code.
     """
+    item = await database.run_sync(db, _find_by_barcode, current_user.tenant_id, barcode)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+        
+    return item
+
+def _find_by_barcode(db: Session, tenant_id: int, barcode: str):
     # First try exact barcode match
     item = db.query(InventoryItem).filter(
-        InventoryItem.tenant_id == current_user.tenant_id,
+        InventoryItem.tenant_id == tenant_id,
         InventoryItem.barcode == barcode
     ).first()
     
@@ -45,13 +54,10 @@ def scan_item(
         # Fallback: Try ID match if barcode is numeric (for legacy support or direct ID scanning)
         if barcode.isdigit():
             item = db.query(InventoryItem).filter(
-                InventoryItem.tenant_id == current_user.tenant_id,
+                InventoryItem.tenant_id == tenant_id,
                 InventoryItem.id == int(barcode)
             ).first()
             
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-        
     return item
 
 @router.post("/", response_model=schemas.Item)
@@ -112,13 +118,15 @@ def upload_image(file: UploadFile = File(...), current_user: User = Depends(get_
 
 # Category Endpoints
 @router.get("/categories", response_model=List[cat_schemas.Category])
-def read_categories(
+async def read_categories(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    return inventory_service.get_categories(db, tenant_id=current_user.tenant_id, skip=skip, limit=limit)
+    return await database.run_sync(
+        db, inventory_service.get_categories, tenant_id=current_user.tenant_id, skip=skip, limit=limit
+    )
 
 @router.post("/categories", response_model=cat_schemas.Category)
 def create_category(
@@ -6,7 +6,6 @@ from app.core import database
 from app.models import User, Purchase, PurchaseItem, InventoryItem
 from app.schemas import purchase as schemas
 from app.api.dependencies import get_current_user, require_manager_or_above
-from datetime import datetime
 
 router = APIRouter()
 
@@ -28,12 +27,9 @@ def create_purchase(
     db: Session = Depends(database.get_db),
     current_user: User = Depends(require_manager_or_above),
 ):
-    # Override invoice number generation to be consistent
-    count = db.query(Purchase).filter(Purchase.tenant_id == current_user.tenant_id).count()
-    invoice_number = f"PO-{datetime.now().year}-{count + 1:04d}"
-
+    # Numbered by create_purchase from the tenant's PO series (PURCHASE_NUMBER_FORMAT)
     from app.services import sales_service
-    return sales_service.create_purchase(db, purchase_in, current_user.tenant_id, current_user.id, invoice_number=invoice_number)
+    return sales_service.create_purchase(db, purchase_in, current_user.tenant_id, current_user.id)
 
 class PaymentRequest(BaseModel):
     amount: float
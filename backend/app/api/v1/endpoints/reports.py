@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Response, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 from app.core import database
 from app.services import report_service
-from app.api.dependencies import get_current_user, require_manager_or_above
+from app.api.dependencies import get_current_user, require_manager_or_above, require_manager_or_above_async
 from app.models import User, Sale, SaleItem, InventoryItem, Category
 from sqlalchemy import func, desc
 
@@ -13,7 +14,7 @@ router = APIRouter()
 # CSV Export Endpoints
 @router.get("/dashboard-stats")
 def get_dashboard_stats(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: User = Depends(require_manager_or_above),
 ):
     """Get key metrics for the dashboard"""
@@ -21,19 +22,22 @@ def get_dashboard_stats(
     return {"message": "Stats placeholder"}
 
 @router.get("/sales-over-time")
-def get_sales_over_time(
+async def get_sales_over_time(
     days: int = 30,
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(require_manager_or_above),
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: User = Depends(require_manager_or_above_async),
 ):
     """Get sales volume over the last N days"""
+    return await database.run_sync(db, _sales_over_time, current_user.tenant_id, days)
+
+def _sales_over_time(db: Session, tenant_id: int, days: int):
     start_date = datetime.utcnow() - timedelta(days=days)
     
     sales_data = db.query(
         func.date(Sale.date).label('date'),
         func.sum(Sale.total_amount).label('total')
     ).filter(
-        Sale.tenant_id == current_user.tenant_id,
+        Sale.tenant_id == tenant_id,
         Sale.date >= start_date
     ).group_by(
         func.date(Sale.date)
@@ -44,12 +48,15 @@ def get_sales_over_time(
     return [{"date": str(s.date), "total": s.total} for s in sales_data]
 
 @router.get("/top-selling-items")
-def get_top_selling_items(
+async def get_top_selling_items(
     limit: int = 5,
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(require_manager_or_above),
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: User = Depends(require_manager_or_above_async),
 ):
     """Get top selling items by quantity"""
+    return await database.run_sync(db, _top_selling_items, current_user.tenant_id, limit)
+
+def _top_selling_items(db: Session, tenant_id: int, limit: int):
     top_items = db.query(
         InventoryItem.name,
         func.sum(SaleItem.quantity).label('total_quantity')
@@ -58,7 +65,7 @@ def get_top_selling_items(
     ).join(
         Sale, Sale.id == SaleItem.sale_id
     ).filter(
-        Sale.tenant_id == current_user.tenant_id
+        Sale.tenant_id == tenant_id
     ).group_by(
         InventoryItem.name
     ).order_by(
@@ -68,11 +75,14 @@ def get_top_selling_items(
     return [{"name": i.name, "quantity": i.total_quantity} for i in top_items]
 
 @router.get("/category-distribution")
-def get_category_distribution(
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(require_manager_or_above),
+async def get_category_distribution(
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: User = Depends(require_manager_or_above_async),
 ):
     """Get sales distribution by category"""
+    return await database.run_sync(db, _category_distribution, current_user.tenant_id)
+
+def _category_distribution(db: Session, tenant_id: int):
     cat_dist = db.query(
         Category.name,
         func.sum(SaleItem.total).label('total_sales')
@@ -83,7 +93,7 @@ def get_category_distribution(
     ).join(
         Sale, Sale.id == SaleItem.sale_id
     ).filter(
-        Sale.tenant_id == current_user.tenant_id
+        Sale.tenant_id == tenant_id
     ).group_by(
         Category.name
     ).all()
@@ -92,7 +102,7 @@ def get_category_distribution(
 
 @router.get("/inventory/export")
 def export_inventory(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: User = Depends(require_manager_or_above),  # Manager+ only
 ):
     csv_content = report_service.export_inventory_csv(db, current_user.tenant_id)
@@ -106,7 +116,7 @@ def export_inventory(
 def export_sales(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: User = Depends(require_manager_or_above),  # Manager+ only
 ):
     csv_content = report_service.export_sales_csv(db, current_user.tenant_id, start_date, end_date)
@@ -120,7 +130,7 @@ def export_sales(
 def export_purchases(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: User = Depends(require_manager_or_above),  # Manager+ only
 ):
     csv_content = report_service.export_purchases_csv(db, current_user.tenant_id, start_date, end_date)
@@ -134,7 +144,7 @@ def export_purchases(
 def export_expenses(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: User = Depends(require_manager_or_above),  # Manager+ only
 ):
     csv_content = report_service.export_expenses_csv(db, current_user.tenant_id, start_date, end_date)
@@ -146,49 +156,49 @@ def export_expenses(
 
 # Analytics Endpoints
 @router.get("/analytics/sales")
-def get_sales_analytics(
+async def get_sales_analytics(
     days: int = Query(30, ge=1, le=365),
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(require_manager_or_above),  # Manager+ only
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: User = Depends(require_manager_or_above_async),  # Manager+ only
 ):
     """Get sales analytics for the last N days"""
-    return report_service.get_sales_analytics(db, current_user.tenant_id, days)
+    return await database.run_sync(db, report_service.get_sales_analytics, current_user.tenant_id, days)
 
 @router.get("/analytics/inventory-valuation")
-def get_inventory_valuation(
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(require_manager_or_above),  # Manager+ only
+async def get_inventory_valuation(
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: User = Depends(require_manager_or_above_async),  # Manager+ only
 ):
     """Get total inventory valuation"""
-    return report_service.get_inventory_valuation(db, current_user.tenant_id)
+    return await database.run_sync(db, report_service.get_inventory_valuation, current_user.tenant_id)
 
 @router.get("/analytics/profit-loss")
-def get_profit_loss(
+async def get_profit_loss(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(require_manager_or_above),  # Manager+ only
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: User = Depends(require_manager_or_above_async),  # Manager+ only
 ):
     """Get profit and loss data"""
-    return report_service.get_profit_loss_data(db, current_user.tenant_id, start_date, end_date)
+    return await database.run_sync(db, report_service.get_profit_loss_data, current_user.tenant_id, start_date, end_date)
 
 @router.get("/analytics/inventory-by-category")
-def get_inventory_by_category(
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(require_manager_or_above),
+async def get_inventory_by_category(
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: User = Depends(require_manager_or_above_async),
 ):
     """Get inventory distribution by category"""
-    return report_service.get_inventory_category_analytics(db, current_user.tenant_id)
+    return await database.run_sync(db, report_service.get_inventory_category_analytics, current_user.tenant_id)
 
 @router.get("/analytics/expenses-by-category")
-def get_expenses_by_category(
+async def get_expenses_by_category(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(require_manager_or_above),
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: User = Depends(require_manager_or_above_async),
 ):
     """Get expense distribution by category"""
-    return report_service.get_expense_category_analytics(db, current_user.tenant_id, start_date, end_date)
+    return await database.run_sync(db, report_service.get_expense_category_analytics, current_user.tenant_id, start_date, end_date)
 
 # Inventory Import
 @router.post("/inventory/import")
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.core import database
+from app.core.config import settings as app_settings
 from app.services import sales_service
 from app.api.dependencies import get_current_user
 from app.models import User
@@ -16,6 +17,26 @@ def create_sale(
     sale = sales_service.create_sale(db, sale_in, current_user.tenant_id, current_user.id)
     return {"id": sale.id, "invoice_number": sale.invoice_number, "total": sale.total_amount}
 
+@router.post("/sales/batch", response_model=dict)
+def create_sales_batch(
+    batch_in: sales_service.SaleBatchCreate,
+    db: Session = Depends(database.get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Sync sales queued by an offline POS. Each sale carries a client-generated
+    idempotency_key, so a batch can be resent safely after a lost response.
+    """
+    if len(batch_in.sales) > app_settings.SALES_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {app_settings.SALES_BATCH_MAX_SIZE} sales per batch")
+    results = sales_service.ingest_sales_batch(db, batch_in.sales, current_user.tenant_id, current_user.id)
+    return {
+        "created": sum(r["status"] == "created" for r in results),
+        "duplicates": sum(r["status"] == "duplicate" for r in results),
+        "rejected": sum(r["status"] == "rejected" for r in results),
+        "results": results,
+    }
+
 @router.post("/purchases", response_model=dict)
 def create_purchase(
     purchase_in: sales_service.PurchaseCreate,
@@ -26,7 +47,6 @@ def create_purchase(
     return {"id": purchase.id, "invoice_number": purchase.invoice_number, "total": purchase.total_amount}
 
 from fastapi.responses import StreamingResponse
-from app.services.pdf_service_enhanced import generate_sale_receipt_pdf
 
 @router.get("/sales/{sale_id}/pdf")
 def get_sale_pdf(
@@ -37,6 +57,8 @@ def get_sale_pdf(
     from app.models import Sale, SaleItem
     from app.models.settings import Settings
     from app.api.dependencies import get_tenant_scoped_query
+    # reportlab/qrcode are loaded on first PDF render, not at worker boot
+    from app.services.pdf_service_enhanced import generate_sale_receipt_pdf
     
     sale = get_tenant_scoped_query(db, Sale, current_user).filter(Sale.id == sale_id).first()
     if not sale:
@@ -117,8 +139,6 @@ def get_sale_pdf(
         headers={"Content-Disposition": f"attachment; filename=receipt_{sale.invoice_number}.pdf"}
     )
 
-from app.services.purchase_pdf_service import generate_purchase_receipt_pdf
-
 @router.get("/purchases/{purchase_id}/pdf")
 def get_purchase_pdf(
     purchase_id: int,
@@ -127,6 +147,7 @@ def get_purchase_pdf(
 ):
     from app.models import Purchase, PurchaseItem
     from app.api.dependencies import get_tenant_scoped_query
+    from app.services.purchase_pdf_service import generate_purchase_receipt_pdf
     purchase = get_tenant_scoped_query(db, Purchase, current_user).filter(Purchase.id == purchase_id).first()
     if not purchase:
         raise HTTPException(status_code=404, detail="Purchase not found")
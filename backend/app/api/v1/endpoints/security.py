@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.core import database
 from app.services.security_service import security_service
-from app.api.dependencies import require_admin
+from app.api.dependencies import require_superuser
 from app.models import User
 
 router = APIRouter()
@@ -10,8 +10,17 @@ router = APIRouter()
 @router.get("/stats")
 def get_security_stats(
     db: Session = Depends(database.get_db),
-    current_user: User = Depends(require_admin),  # Admin only
+    current_user: User = Depends(require_superuser),
 ):
-    """Get security statistics (admin only)"""
-    # In a real app, check for admin role
+    """Platform-wide security statistics (Super Admin only)"""
     return security_service.get_stats(db)
+
+@router.get("/top-offenders")
+def get_top_offenders(
+    hours: int = 24,
+    limit: int = 10,
+    db: Session = Depends(database.get_db),
+    current_user: User = Depends(require_superuser),
+):
+    """Source networks (/24, /64) with the most security events, across all tenants (Super Admin only)"""
+    return security_service.get_top_offenders(db, hours=min(hours, 24 * 90), limit=min(limit, 100))
@@ -5,7 +5,7 @@ from pydantic import BaseModel
 from datetime import datetime
 
 from app.core import database
-from app.api.dependencies import get_current_user
+from app.api.dependencies import require_superuser
 from app.models.user import User
 from app.models.tenant import Tenant
 
@@ -27,11 +27,6 @@ class TenantResponse(BaseModel):
 class TenantStatusUpdate(BaseModel):
     subscription_status: str
 
-def require_superuser(current_user: User = Depends(get_current_user)):
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=403, detail="Super Admin access required")
-    return current_user
-
 @router.get("/tenants", response_model=List[TenantResponse])
 def list_tenants(
     db: Session = Depends(database.get_db),
@@ -81,3 +76,38 @@ def update_tenant_status(
         "created_at": tenant.created_at,
         "user_count": user_count
     }
+
+@router.get("/db/pool")
+def get_db_pool_status(
+    current_user: User = Depends(require_superuser)
+):
+    """Live connection pool metrics (Super Admin only)"""
+    from app.core.pool import get_pool_status
+    status = get_pool_status(database.engine)
+    if database.read_engine is not database.engine:
+        status["replica"] = get_pool_status(database.read_engine)
+    return status
+
+@router.get("/db/timeouts")
+def get_db_timeouts(
+    current_user: User = Depends(require_superuser)
+):
+    """Statement timeout budgets and timeouts per route (Super Admin only)"""
+    from app.core.query_budget import get_timeout_stats
+    return get_timeout_stats()
+
+@router.get("/cache/principals")
+def get_principal_cache_stats(
+    current_user: User = Depends(require_superuser)
+):
+    """Hit/miss metrics of the get_current_user cache (Super Admin only)"""
+    from app.core.principal_cache import principal_cache
+    return principal_cache.stats()
+
+@router.get("/auth/hashing")
+def get_password_hashing_stats(
+    current_user: User = Depends(require_superuser)
+):
+    """Load of the bcrypt worker pool and 503 rejections (Super Admin only)"""
+    from app.core.password_hashing import password_hasher
+    return password_hasher.stats()
@@ -12,7 +12,7 @@ router = APIRouter()
 def get_tax_report(
     start_date: str = None,
     end_date: str = None,
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user = Depends(require_manager_or_above),
 ):
     # Default to current month if no dates provided
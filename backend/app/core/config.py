@@ -11,6 +11,11 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     ENVIRONMENT: str = "development"  # dev, staging, production
+
+    # Startup
+    # When True, workers skip create_all/migrations on boot; run
+    # `python -m app.core.db_init` once per deploy instead.
+    FAST_BOOT: bool = False
     
     # Database (Neon-first)
     DATABASE_URL: Optional[str] = None
@@ -21,6 +26,109 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: Optional[str] = None
     POSTGRES_DB: Optional[str] = None
 
+    # Optional read replica for reports/analytics/exports
+    DATABASE_READ_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # route a client to the primary this long after it writes
+
+    # Connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 300  # seconds; Neon closes idle connections
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite WAL profile for single-node/edge installs (file databases only)
+    SQLITE_HIGH_PERFORMANCE: bool = False
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_READ_POOL_SIZE: int = 8
+    SQLITE_WRITE_POOL_SIZE: int = 4
+
+    # Opt-in access tokens carrying tenant/role/permission claims, checked against an
+    # in-memory revocation table instead of loading the user on every request
+    JWT_SELF_CONTAINED: bool = False
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 5.0
+
+    # Optional Redis (redis://...) shared by workers for login failure and rate limit counters
+    SHARED_STORE_URL: Optional[str] = None
+
+    # Login brute-force detection (sliding window, in memory)
+    LOGIN_FAILURE_WINDOW_SECONDS: int = 300
+    LOGIN_FAILURE_THRESHOLD_IP: int = 5
+    LOGIN_FAILURE_THRESHOLD_EMAIL: int = 10
+    LOGIN_BAN_MINUTES: int = 60
+
+    # Route-class rate limits ("<n>/<period>") per user or IP; a tenant may use
+    # RATE_LIMIT_TENANT_MULTIPLIER times that across its users (0 = no tenant cap).
+    # Storage: memory://, redis://... or sqlite:///path; defaults to SHARED_STORE_URL
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORAGE_URL: Optional[str] = None
+    RATE_LIMIT_POS_WRITES: str = "120/minute"
+    RATE_LIMIT_REPORTS: str = "30/minute"
+    RATE_LIMIT_EXPORTS: str = "5/minute"
+    RATE_LIMIT_DEFAULT: str = "300/minute"
+    RATE_LIMIT_TENANT_MULTIPLIER: int = 10
+
+    # bcrypt cost and its dedicated worker pool; logins beyond workers + queue get a 503
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+
+    # SQL injection / XSS request inspection: "block" (400), "log" (record only) or "off"
+    REQUEST_INSPECTION_MODE: str = "log"
+    REQUEST_INSPECTION_MAX_BODY_BYTES: int = 32768
+
+    # Reload interval of the in-memory blocked IP / CIDR list
+    BLOCKLIST_REFRESH_SECONDS: float = 10.0
+
+    # Batched background writes of SecurityEvent rows
+    SECURITY_EVENT_FLUSH_SECONDS: float = 1.0
+    SECURITY_EVENT_BATCH_SIZE: int = 200
+
+    # Raw security events older than this are purged (rollups are kept; 0 keeps everything)
+    SECURITY_EVENT_RETENTION_DAYS: int = 30
+    SECURITY_EVENT_PURGE_INTERVAL_SECONDS: float = 3600.0
+
+    # Authenticated principal cache in get_current_user (0 disables)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
+    # Compiled role permission bitsets per tenant (permission_service)
+    ROLE_PERMISSION_CACHE_TTL_SECONDS: float = 60.0
+
+    # Per-statement timeouts by endpoint class (0 disables); see app/core/query_budget.py
+    STATEMENT_TIMEOUT_POS_MS: int = 200
+    STATEMENT_TIMEOUT_REPORTS_MS: int = 10000
+    STATEMENT_TIMEOUT_DEFAULT_MS: int = 30000
+
+    # Reject a sale (409) instead of letting stock go negative
+    SALES_REJECT_INSUFFICIENT_STOCK: bool = False
+
+    # Most sales accepted by one offline-POS sync (POST /sales/sales/batch)
+    SALES_BATCH_MAX_SIZE: int = 5000
+
+    # Invoice / purchase order numbers: {year}, {month} and {seq} fields; a format
+    # with {year} restarts at 1 every year ({month}: every month). Each worker
+    # leases DOCUMENT_NUMBER_BLOCK_SIZE numbers at a time (unused ones become gaps).
+    INVOICE_NUMBER_FORMAT: str = "INV-{year}-{seq:06d}"
+    PURCHASE_NUMBER_FORMAT: str = "PO-{year}-{seq:04d}"
+    DOCUMENT_NUMBER_BLOCK_SIZE: int = 20
+
+    # Log a statement as a suspected N+1 when one request runs it this many times
+    N_PLUS_ONE_THRESHOLD: int = 10
+
+    # Shared outbound HTTP client (social login, payment providers); see app/core/http_client.py
+    OUTBOUND_HTTP_CONNECT_TIMEOUT: float = 3.0
+    OUTBOUND_HTTP_READ_TIMEOUT: float = 10.0
+    OUTBOUND_HTTP_POOL_TIMEOUT: float = 2.0
+    OUTBOUND_HTTP_MAX_CONNECTIONS: int = 50
+    OUTBOUND_HTTP_MAX_KEEPALIVE: int = 20
+    OUTBOUND_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    OUTBOUND_HTTP_RETRIES: int = 2
+    OUTBOUND_HTTP_BACKOFF_SECONDS: float = 0.2
+    OUTBOUND_HTTP_BACKOFF_MAX_SECONDS: float = 2.0
+
     # Integrations
     STRIPE_API_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
@@ -30,12 +138,17 @@ class Settings(BaseSettings):
     PAYPAL_CLIENT_SECRET: str = ""
     PAYPAL_MODE: str = "sandbox"
     PAYPAL_WEBHOOK_ID: str = ""
+    PAYPAL_API_BASE: str = ""  # defaults to the sandbox or live REST host for PAYPAL_MODE
 
     # Social Auth
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
     GITHUB_CLIENT_ID: str = ""
     GITHUB_CLIENT_SECRET: str = ""
+    GOOGLE_JWKS_URL: str = "https://www.googleapis.com/oauth2/v3/certs"
+    GOOGLE_USERINFO_URL: str = "https://www.googleapis.com/oauth2/v3/userinfo"
+    GITHUB_OAUTH_URL: str = "https://github.com/login/oauth/access_token"
+    GITHUB_API_URL: str = "https://api.github.com"
 
     # CORS / Hosts
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
@@ -1,11 +1,53 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from fastapi import Depends, Request
 from app.core.config import settings
+from app.core.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+from app.core.read_routing import wrote_recently
+from app.core import sqlite_profile
 
-connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+def _pool_kwargs(poolclass):
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def _sqlite_high_performance(url: str) -> bool:
+    return settings.SQLITE_HIGH_PERFORMANCE and sqlite_profile.is_file_database(make_url(url))
+
+def _make_engine(url: str, read_only: bool = False):
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+        if not _sqlite_high_performance(url):
+            return create_engine(url, connect_args=connect_args)
+        # WAL profile: writer connections that lock only when they write, a separate pool of query_only readers
+        if read_only:
+            sqlite_engine = create_engine(url, connect_args=connect_args, **sqlite_profile.reader_engine_kwargs())
+        else:
+            sqlite_engine = create_engine(url, connect_args=connect_args, **sqlite_profile.writer_engine_kwargs())
+            sqlite_profile.install_immediate_transactions(sqlite_engine)
+        sqlite_profile.install_pragmas(sqlite_engine, query_only=read_only)
+        return sqlite_engine
+    return create_engine(url, **_pool_kwargs(InstrumentedQueuePool))
+
+engine = _make_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replica for reports/analytics; falls back to the primary.
+# In the SQLite WAL profile, reads go to their own connection pool on the same file.
+if settings.DATABASE_READ_URL:
+    read_engine = _make_engine(settings.DATABASE_READ_URL, read_only=True)
+elif _sqlite_high_performance(settings.DATABASE_URL):
+    read_engine = _make_engine(settings.DATABASE_URL, read_only=True)
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 Base = declarative_base()
 
 def get_db():
@@ -14,3 +56,92 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db(request: Request, db=Depends(get_db)):
+    """
+    Session for read-only endpoints. Uses the replica unless this client wrote
+    within the last READ_YOUR_WRITES_SECONDS, so it sees its own changes; then
+    it is the request's own get_db session rather than a second connection.
+    """
+    if wrote_recently(request.scope):
+        yield db
+        return
+    read_db = ReadSessionLocal()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
+# --------------------------------------------------
+# Async engine (read-heavy endpoints)
+# --------------------------------------------------
+_async_engines = {}
+_async_sessionmakers = {}
+
+def async_database_url(url: str) -> str:
+    """
+    Map the sync DATABASE_URL onto its async driver (asyncpg / aiosqlite).
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+
+    # asyncpg takes `ssl` instead of libpq's `sslmode` and has no channel_binding option (Neon URLs)
+    query = dict(parsed.query)
+    sslmode = query.pop("sslmode", None)
+    query.pop("channel_binding", None)
+    if sslmode and sslmode != "disable":
+        query["ssl"] = "require"
+    return parsed.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+
+def get_async_engine(url: str = None):
+    """
+    Lazily create the async engine for `url` (default: DATABASE_URL) so the
+    async driver is only needed by workers that use it.
+    """
+    url = url or settings.DATABASE_URL
+    if url not in _async_engines:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+        async_url = async_database_url(url)
+        if async_url.startswith("sqlite"):
+            async_engine = create_async_engine(async_url)
+            if _sqlite_high_performance(url):
+                sqlite_profile.install_pragmas(async_engine.sync_engine)
+        else:
+            async_engine = create_async_engine(async_url, **_pool_kwargs(InstrumentedAsyncQueuePool))
+        _async_engines[url] = async_engine
+        _async_sessionmakers[url] = async_sessionmaker(
+            bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+    return _async_engines[url]
+
+def _async_sessionmaker(url: str):
+    get_async_engine(url)
+    return _async_sessionmakers[url]
+
+async def get_async_db():
+    async with _async_sessionmaker(settings.DATABASE_URL)() as db:
+        yield db
+
+async def get_async_read_db(request: Request):
+    """
+    Async counterpart of get_read_db.
+    """
+    url = settings.DATABASE_READ_URL
+    if not url or wrote_recently(request.scope):
+        url = settings.DATABASE_URL
+    async with _async_sessionmaker(url)() as db:
+        yield db
+
+async def run_sync(db, fn, *args, **kwargs):
+    """
+    Call a sync service function `fn(db, *args, **kwargs)` with either session type.
+
+    AsyncSession runs it in a greenlet on its underlying Session, so existing
+    service code (including lazy loads) works unchanged without a threadpool hop.
+    """
+    if hasattr(db, "run_sync"):
+        return await db.run_sync(fn, *args, **kwargs)
+    return fn(db, *args, **kwargs)
@@ -2,78 +2,219 @@ import os
 import sys
 import importlib.util
 import glob
+import hashlib
 import warnings
+from contextlib import contextmanager
+from sqlalchemy import select
 from app.core.database import engine, Base
+from app.models.migration import SchemaMigration
+# Every model on Base.metadata, whatever the caller imported: create_all and the checksum cover them all
+import app.models  # noqa: F401
+from app.models import activity_log  # noqa: F401  (not exported by app.models)
 
 # Suppress Pydantic V2 migration warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
 
-def run_auto_migrations():
+# Arbitrary constant shared by every worker for pg_advisory_lock
+MIGRATION_LOCK_KEY = 727274001
+
+# Ledger row holding the checksum of the model schema create_all last ran against
+MODELS_LEDGER_NAME = "(models)"
+
+def _discover_migrations(migrations_dir: str):
     """
-    Automatically discovers and runs all 'migrate_*.py' scripts in the backend root.
+    Returns [(filename, path, sha256)] for every migrate_*.py script, in run order.
     """
-    print("🚀 Starting Automated Migration System...")
-    
+    scripts = []
+    for file_path in sorted(glob.glob(os.path.join(migrations_dir, "migrate_*.py"))):
+        with open(file_path, "rb") as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+        scripts.append((os.path.basename(file_path), file_path, checksum))
+    return scripts
+
+def _read_ledger(conn):
+    """
+    Returns {filename: checksum} for applied scripts, or None if the ledger table is missing.
+    """
+    try:
+        rows = conn.execute(select(SchemaMigration.name, SchemaMigration.checksum)).all()
+    except Exception:
+        conn.rollback()
+        return None
+    return {name: checksum for name, checksum in rows}
+
+def _models_checksum() -> str:
+    """
+    sha256 of every table's columns, indexes and constraints as the models
+    declare them; changes whenever create_all could have something new to create.
+    """
+    parts = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(f"table {table.name}")
+        for column in table.columns:
+            parts.append(f"  {column.name} {column.type!r} nullable={column.nullable} pk={column.primary_key}")
+        # indexes and constraints are sets, and unnamed constraints have no key: sort the lines
+        parts.extend(sorted(
+            [f"  index {index.name} {[c.name for c in index.columns]} unique={index.unique}" for index in table.indexes]
+            + [f"  constraint {constraint.name} {type(constraint).__name__} {[c.name for c in constraint.columns]}"
+               for constraint in table.constraints]
+        ))
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+def _record(conn, ledger, name: str, checksum: str):
+    if name in ledger:
+        conn.execute(
+            SchemaMigration.__table__.update()
+            .where(SchemaMigration.name == name)
+            .values(checksum=checksum)
+        )
+    else:
+        conn.execute(SchemaMigration.__table__.insert().values(name=name, checksum=checksum))
+    ledger[name] = checksum
+
+def _backend_scripts():
     # Get the backend root directory (where this script is running from or parent of app)
     # Assuming db_init.py is in app/core/, we need to go up two levels to reach backend root
     current_dir = os.path.dirname(os.path.abspath(__file__))
     backend_root = os.path.abspath(os.path.join(current_dir, "../../"))
-    
+
     # Add backend root to sys.path if not present
     if backend_root not in sys.path:
         sys.path.append(backend_root)
-        
-    # Find all migrate_*.py files in the backend/migrations directory
-    migrations_dir = os.path.join(backend_root, "migrations")
-    migration_files = glob.glob(os.path.join(migrations_dir, "migrate_*.py"))
-    
-    print(f"📂 Found {len(migration_files)} migration scripts.")
-    
-    for file_path in sorted(migration_files):
-        filename = os.path.basename(file_path)
-        module_name = os.path.splitext(filename)[0]
-        
-        print(f"   👉 Running {filename}...")
-        
+
+    return _discover_migrations(os.path.join(backend_root, "migrations"))
+
+def _pending(scripts, ledger):
+    ledger = ledger or {}
+    return [s for s in scripts if ledger.get(s[0]) != s[2]]
+
+@contextmanager
+def migration_lock():
+    """
+    Cross-process lock so concurrent workers don't run the same scripts at once.
+    Postgres uses a session-level advisory lock; SQLite uses a lock file next to the database.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.exec_driver_sql(f"SELECT pg_advisory_lock({MIGRATION_LOCK_KEY})")
+            try:
+                yield
+            finally:
+                conn.exec_driver_sql(f"SELECT pg_advisory_unlock({MIGRATION_LOCK_KEY})")
+                conn.commit()
+        return
+
+    db_path = engine.url.database if engine.dialect.name == "sqlite" else None
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    if not db_path or db_path == ":memory:" or fcntl is None:
+        yield
+        return
+
+    with open(f"{db_path}.migrate.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
         try:
-            # Dynamically import the module
-            spec = importlib.util.spec_from_file_location(module_name, file_path)
-            if spec and spec.loader:
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[module_name] = module
-                spec.loader.exec_module(module)
-                
-                # Try to find a callable function
-                # Priority 1: 'migrate()'
-                # Priority 2: 'migrate_something()' (matching the filename pattern roughly)
-                
-                if hasattr(module, "migrate") and callable(module.migrate):
-                    module.migrate()
-                    print(f"      ✅ {filename} executed successfully.")
-                else:
-                    # Fallback: look for any function starting with 'migrate_'
-                    found_func = False
-                    for attr_name in dir(module):
-                        if attr_name.startswith("migrate_") and callable(getattr(module, attr_name)):
-                            getattr(module, attr_name)()
-                            print(f"      ✅ {filename} executed successfully (via {attr_name}).")
-                            found_func = True
-                            break
-                    
-                    if not found_func:
-                        print(f"      ⚠️  No 'migrate()' function found in {filename}. Skipped.")
-                        
-        except Exception as e:
-            print(f"      ❌ FAILED to run {filename}: {e}")
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _run_script(filename: str, file_path: str) -> bool:
+    """
+    Import a migration script and call its entry point. Returns True on success.
+    """
+    module_name = os.path.splitext(filename)[0]
+    try:
+        # Dynamically import the module
+        spec = importlib.util.spec_from_file_location(module_name, file_path)
+        if not (spec and spec.loader):
+            return False
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+
+        # Try to find a callable function
+        # Priority 1: 'migrate()'
+        # Priority 2: 'migrate_something()' (matching the filename pattern roughly)
+        if hasattr(module, "migrate") and callable(module.migrate):
+            module.migrate()
+            print(f"      ✅ {filename} executed successfully.")
+            return True
+
+        # Fallback: look for any function starting with 'migrate_'
+        for attr_name in dir(module):
+            if attr_name.startswith("migrate_") and callable(getattr(module, attr_name)):
+                getattr(module, attr_name)()
+                print(f"      ✅ {filename} executed successfully (via {attr_name}).")
+                return True
+
+        print(f"      ⚠️  No 'migrate()' function found in {filename}. Skipped.")
+        return False
+    except (Exception, SystemExit) as e:
+        # Some scripts call sys.exit() on failure; don't let that kill the worker
+        print(f"      ❌ FAILED to run {filename}: {e!r}")
+        return False
+
+def run_auto_migrations():
+    """
+    Runs each 'migrate_*.py' script in backend/migrations exactly once per database.
+
+    Applied scripts are recorded in the schema_migrations ledger with a checksum of
+    their contents; an edited script is run again. When nothing is pending this
+    costs a single ledger query and takes no lock.
+    """
+    scripts = _backend_scripts()
+
+    with engine.connect() as conn:
+        ledger = _read_ledger(conn)
+    if not _pending(scripts, ledger):
+        print(f"✅ Migrations up to date ({len(scripts)} applied).")
+        return
+
+    print("🚀 Starting Automated Migration System...")
+    with migration_lock():
+        # Another worker may have finished while we waited for the lock
+        SchemaMigration.__table__.create(bind=engine, checkfirst=True)
+        with engine.connect() as conn:
+            ledger = _read_ledger(conn) or {}
+        pending = _pending(scripts, ledger)
+        print(f"📂 {len(pending)} of {len(scripts)} migration scripts pending.")
+
+        for filename, file_path, checksum in pending:
+            print(f"   👉 Running {filename}...")
+            if not _run_script(filename, file_path):
+                continue
+            with engine.begin() as conn:
+                _record(conn, ledger, filename, checksum)
 
 def init_db():
+    """
+    create_all, then the pending migration scripts. Both are skipped when the
+    ledger shows every script applied and the models unchanged since the last
+    create_all, so a routine restart costs one ledger query.
+    """
     try:
+        models_checksum = _models_checksum()
+        with engine.connect() as conn:
+            ledger = _read_ledger(conn)
+        if (ledger is not None and ledger.get(MODELS_LEDGER_NAME) == models_checksum
+                and not _pending(_backend_scripts(), ledger)):
+            print("✅ Database schema up to date.")
+            return
+
         print("📌 Ensuring database tables...")
         Base.metadata.create_all(bind=engine)
-        
+        with engine.begin() as conn:
+            _record(conn, ledger or {}, MODELS_LEDGER_NAME, models_checksum)
+
         print("📌 Running migrations...")
         run_auto_migrations()
-        
+
         print("✅ Database initialization completed.")
     except Exception as e:
         print(f"❌ DB INIT ERROR: {e}")
+
+if __name__ == "__main__":
+    # Explicit schema step for deploys that boot workers with FAST_BOOT=true
+    init_db()
@@ -0,0 +1,120 @@
+"""Shared, keep-alive HTTP client for calls to external providers"""
+
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import httpx
+
+# Safe to send twice; anything else is retried only when the caller says so
+# (e.g. PayPal requests carrying a PayPal-Request-Id)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class OutboundHTTP:
+    """
+    One httpx.Client per worker for Google, GitHub and PayPal, so repeat
+    calls reuse pooled keep-alive connections instead of paying TCP + TLS
+    setup every time. Timeouts are explicit for every phase (connect, read,
+    write, waiting for a pooled connection). request() retries transport
+    errors and 429/502/503/504 with capped, jittered exponential backoff,
+    honouring Retry-After. The client is created on first use and closed
+    from the app lifespan; a later call simply opens a new one. httpx itself
+    is imported on first use, not at worker boot.
+    """
+    def __init__(self):
+        self._client: Optional["httpx.Client"] = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+
+    @property
+    def client(self) -> "httpx.Client":
+        client = self._client
+        if client is None:
+            import httpx
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        timeout=httpx.Timeout(
+                            settings.OUTBOUND_HTTP_READ_TIMEOUT,
+                            connect=settings.OUTBOUND_HTTP_CONNECT_TIMEOUT,
+                            pool=settings.OUTBOUND_HTTP_POOL_TIMEOUT,
+                        ),
+                        limits=httpx.Limits(
+                            max_connections=settings.OUTBOUND_HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=settings.OUTBOUND_HTTP_MAX_KEEPALIVE,
+                            keepalive_expiry=settings.OUTBOUND_HTTP_KEEPALIVE_EXPIRY,
+                        ),
+                        headers={"User-Agent": f"{settings.PROJECT_NAME} backend"},
+                    )
+                client = self._client
+        return client
+
+    def request(self, method: str, url: str, *, retries: Optional[int] = None,
+                idempotent: Optional[bool] = None, **kwargs) -> "httpx.Response":
+        """
+        Send one request, retrying up to `retries` times (OUTBOUND_HTTP_RETRIES
+        by default). Non-idempotent methods are only retried when the request
+        never left (connect errors) unless `idempotent=True`. Returns the last
+        response, whatever its status; raises the last httpx error.
+        """
+        import httpx
+
+        # Failures where the request never reached the server: always safe to retry
+        not_sent = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+        method = method.upper()
+        if retries is None:
+            retries = settings.OUTBOUND_HTTP_RETRIES
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self.requests += 1
+            try:
+                response = self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= retries or not (idempotent or isinstance(e, not_sent)):
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if attempt >= retries or not idempotent or response.status_code not in RETRY_STATUSES:
+                    return response
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                response.close()
+            attempt += 1
+            self.retries += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> "httpx.Response":
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> "httpx.Response":
+        return self.request("POST", url, **kwargs)
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+        cap = settings.OUTBOUND_HTTP_BACKOFF_MAX_SECONDS
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), cap)
+            except ValueError:
+                pass  # HTTP-date form: fall back to our own schedule
+        return random.uniform(0, min(settings.OUTBOUND_HTTP_BACKOFF_SECONDS * 2 ** attempt, cap))
+
+    def stats(self):
+        return {"requests": self.requests, "retries": self.retries, "open": self._client is not None}
+
+    def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+
+outbound_http = OutboundHTTP()
@@ -0,0 +1,218 @@
+"""In-memory blocked-IP set with CIDR ranges, checked before routing"""
+
+import ipaddress
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+_MISSING = object()
+
+
+def _epoch(expires_at: Optional[datetime]) -> Optional[float]:
+    if expires_at is None:
+        return None
+    if expires_at.tzinfo is None:
+        # Naive timestamps in this codebase are UTC (datetime.utcnow())
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at.timestamp()
+
+
+def in_force():
+    """
+    Filter for bans currently in force: active and not yet expired. Expired
+    rows stay in the table (ban_ip reuses them) but are left out of reloads.
+    """
+    from sqlalchemy import and_, or_
+    from app.models.security import BlockedIP
+
+    # expires_at is written as naive UTC (datetime.utcnow()), so compare against the same
+    return and_(
+        BlockedIP.is_active == True,
+        or_(BlockedIP.expires_at.is_(None), BlockedIP.expires_at > datetime.utcnow()),
+    )
+
+
+class _Snapshot:
+    """
+    Immutable lookup tables, swapped in whole on refresh.
+
+    Single addresses live in a dict keyed by their normalised text, so the
+    common case is one hash lookup with no parsing. CIDR ranges form a prefix
+    table: one dict per prefix length, keyed by the network bits
+    (address >> host_bits). A lookup probes each distinct length present,
+    which is a handful of dict hits regardless of entry count. Ranges at
+    least as long as the family's coarse bucket (/16, /48) are also indexed
+    by that bucket, so clean traffic usually stops after one set probe.
+    Values are expiry epochs (None = permanent).
+    """
+    __slots__ = ("exact", "v4", "v6", "size")
+
+    def __init__(self, exact, v4, v6):
+        self.exact: Dict[str, Optional[float]] = exact
+        self.v4 = _PrefixTables(v4, _COARSE_HOST_BITS[4])
+        self.v6 = _PrefixTables(v6, _COARSE_HOST_BITS[6])
+        self.size = len(exact) + self.v4.size + self.v6.size
+
+    @classmethod
+    def build(cls, entries):
+        exact: Dict[str, Optional[float]] = {}
+        prefixes = {4: {}, 6: {}}
+        for address, expires in entries:
+            try:
+                network = ipaddress.ip_network(address.strip(), strict=False)
+            except ValueError:
+                print(f"⚠️  Ignoring invalid blocked IP entry: {address!r}")
+                continue
+            if network.num_addresses == 1:
+                exact[str(network.network_address)] = expires
+                continue
+            host_bits = network.max_prefixlen - network.prefixlen
+            table = prefixes[network.version].setdefault(host_bits, {})
+            table[int(network.network_address) >> host_bits] = expires
+        return cls(exact, prefixes[4], prefixes[6])
+
+    def blocked(self, ip: str, now: float) -> bool:
+        expires = self.exact.get(ip, _MISSING)
+        if expires is not _MISSING and (expires is None or expires > now):
+            return True
+        if ":" in ip:
+            tables = self.v6
+            if not tables.size:
+                return False
+            try:
+                value = int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), "big")
+            except OSError:
+                return False
+        else:
+            tables = self.v4
+            if not tables.size:
+                return False
+            try:
+                value = int.from_bytes(socket.inet_aton(ip), "big")
+            except OSError:
+                return False
+        return tables.blocked(value, now)
+
+
+# Host bits of the bucket that gates long-prefix probes: /16 for IPv4, /48 for IPv6
+_COARSE_HOST_BITS = {4: 16, 6: 80}
+
+
+class _PrefixTables:
+    __slots__ = ("short", "all", "buckets", "coarse", "size")
+
+    def __init__(self, tables: Dict[int, Dict[int, Optional[float]]], coarse: int):
+        # Longest prefixes first
+        ordered: List[Tuple[int, Dict[int, Optional[float]]]] = sorted(tables.items())
+        self.coarse = coarse
+        self.all = ordered
+        self.short = [(bits, t) for bits, t in ordered if bits > coarse]
+        self.buckets = {key >> (coarse - bits) for bits, t in ordered if bits <= coarse for key in t}
+        self.size = sum(len(t) for _, t in ordered)
+
+    def blocked(self, value: int, now: float) -> bool:
+        tables = self.all if value >> self.coarse in self.buckets else self.short
+        for host_bits, table in tables:
+            expires = table.get(value >> host_bits, _MISSING)
+            if expires is not _MISSING and (expires is None or expires > now):
+                return True
+        return False
+
+
+class IPBlocklist:
+    """
+    BlockedIP rows in force (single addresses or CIDR ranges such as
+    "203.0.113.0/24"), reloaded every BLOCKLIST_REFRESH_SECONDS. Expiry is
+    also evaluated at lookup time, so lapsed bans stop matching without a write.
+    """
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._snapshot = _Snapshot({}, {}, {})
+        self._entries: Dict[str, Optional[float]] = {}
+        self._loaded_at: Optional[float] = None
+        self._refreshing = False
+
+    def is_blocked(self, ip: str) -> bool:
+        return self._snapshot.blocked(ip, time.time())
+
+    @property
+    def size(self) -> int:
+        return self._snapshot.size
+
+    def stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def load(self, entries):
+        """
+        Replace the table from (address_or_cidr, expires_at) pairs.
+        """
+        now = time.time()
+        self._entries = {
+            address: _epoch(expires_at) for address, expires_at in entries
+            if expires_at is None or _epoch(expires_at) > now
+        }
+        self._snapshot = _Snapshot.build(self._entries.items())
+        self._loaded_at = time.monotonic()
+
+    def refresh(self):
+        from app.core.database import SessionLocal
+        from app.models.security import BlockedIP
+
+        db = SessionLocal()
+        try:
+            rows = db.query(BlockedIP.ip_address, BlockedIP.expires_at).filter(in_force()).all()
+            self.load(rows)
+        except Exception as e:
+            print(f"⚠️  Blocked IP refresh failed, keeping previous list: {e}")
+            self._loaded_at = time.monotonic()
+        finally:
+            db.close()
+
+    async def refresh_if_stale(self):
+        # One request refreshes in the threadpool; concurrent requests use the current snapshot
+        if self._refreshing or not self.stale():
+            return
+        self._refreshing = True
+        try:
+            await run_in_threadpool(self.refresh)
+        finally:
+            self._refreshing = False
+
+    def add(self, address: str, expires_at: Optional[datetime]):
+        """
+        Apply a ban made by this process right away instead of at the next refresh.
+        """
+        entries = dict(self._entries)
+        entries[address] = _epoch(expires_at)
+        self._entries = entries
+        self._snapshot = _Snapshot.build(entries.items())
+
+
+ip_blocklist = IPBlocklist(settings.BLOCKLIST_REFRESH_SECONDS)
+
+
+class BlockedIPMiddleware:
+    """
+    Rejects banned clients with 403 before routing, auth or any DB work.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        await ip_blocklist.refresh_if_stale()
+        client = scope.get("client")
+        if client and ip_blocklist.is_blocked(client[0]):
+            response = JSONResponse(status_code=403, content={"detail": "Access denied. IP is blocked."})
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,68 @@
+"""Cached JSON Web Key Sets for verifying provider-signed tokens locally"""
+
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from app.core.http_client import outbound_http
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class JWKSCache:
+    """
+    Signing keys from a JWKS endpoint, keyed by `kid`. Keys are kept for the
+    Cache-Control max-age the provider sends (default_ttl when it sends
+    none), so verifying a token is normally a dict lookup. An unknown kid
+    (the provider rotated keys) forces a refresh, at most once every
+    min_refresh_seconds so forged kids cannot hammer the endpoint. If a
+    refresh fails the previous keys stay in use.
+    """
+    def __init__(self, url: str, default_ttl: float = 3600.0, min_refresh_seconds: float = 60.0):
+        self.url = url
+        self.default_ttl = default_ttl
+        self.min_refresh_seconds = min_refresh_seconds
+        self._keys: Dict[str, dict] = {}
+        self._expires_at = 0.0
+        self._fetched_at = float("-inf")
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    def key_for(self, kid: Optional[str]) -> Optional[dict]:
+        now = time.monotonic()
+        key = self._keys.get(kid)
+        if key is not None and now < self._expires_at:
+            return key
+        with self._lock:
+            key = self._keys.get(kid)
+            # Another thread may have refreshed while we waited
+            if key is not None and time.monotonic() < self._expires_at:
+                return key
+            expired = time.monotonic() >= self._expires_at
+            if expired or time.monotonic() - self._fetched_at >= self.min_refresh_seconds:
+                self._refresh()
+            return self._keys.get(kid)
+
+    def _refresh(self):
+        self._fetched_at = time.monotonic()
+        self.fetches += 1
+        try:
+            response = outbound_http.get(self.url)
+            response.raise_for_status()
+            keys = {k["kid"]: k for k in response.json().get("keys", []) if "kid" in k}
+        except Exception as e:
+            print(f"⚠️ JWKS refresh from {self.url} failed: {e}")
+            # Keep serving the old keys; try again after min_refresh_seconds
+            self._expires_at = self._fetched_at + self.min_refresh_seconds
+            return
+        match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+        ttl = float(match.group(1)) if match else self.default_ttl
+        self._keys = keys
+        self._expires_at = self._fetched_at + ttl
+
+    def clear(self):
+        with self._lock:
+            self._keys = {}
+            self._expires_at = 0.0
+            self._fetched_at = float("-inf")
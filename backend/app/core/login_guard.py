@@ -0,0 +1,161 @@
+"""In-memory sliding-window brute-force detection for login"""
+
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from app.core.config import settings
+
+
+class SlidingWindowCounter:
+    """
+    Sliding-window log of hits per key. Only the newest `limit` timestamps
+    are kept per key, which is all that is needed to tell whether `limit`
+    hits happened within `window_seconds`.
+    """
+    def __init__(self, window_seconds: float, limit: int, max_keys: int = 100000):
+        self.window = window_seconds
+        self.limit = limit
+        self.max_keys = max_keys
+        self._hits: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, hits: Deque[float], now: float) -> int:
+        cutoff = now - self.window
+        while hits and hits[0] <= cutoff:
+            hits.popleft()
+        return len(hits)
+
+    def hit(self, key: str, now: Optional[float] = None) -> int:
+        """
+        Record a hit and return the number of hits for `key` inside the window.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                if len(self._hits) >= self.max_keys:
+                    self._prune(now)
+                hits = self._hits[key] = deque(maxlen=self.limit)
+            hits.append(now)
+            return self._count(hits, now)
+
+    def count(self, key: str, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            hits = self._hits.get(key)
+            return self._count(hits, now) if hits else 0
+
+    def reset(self, key: str):
+        with self._lock:
+            self._hits.pop(key, None)
+
+    def _prune(self, now: float):
+        cutoff = now - self.window
+        for key in [k for k, hits in self._hits.items() if not hits or hits[-1] <= cutoff]:
+            del self._hits[key]
+        # Still full of live keys: drop the oldest-inserted ones
+        overflow = len(self._hits) - self.max_keys + 1
+        for key in list(self._hits)[:max(overflow, 0)]:
+            del self._hits[key]
+
+
+class RedisSlidingWindow:
+    """
+    The same sliding window kept in a Redis sorted set so every worker sees
+    the combined count. Used alongside the local counter when SHARED_STORE_URL
+    points at Redis.
+    """
+    def __init__(self, url: str, prefix: str, window_seconds: float):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.prefix = prefix
+        self.window = window_seconds
+
+    def hit(self, key: str) -> int:
+        now = time.time()
+        redis_key = f"{self.prefix}:{key}"
+        pipe = self.client.pipeline()
+        pipe.zadd(redis_key, {uuid.uuid4().hex: now})
+        pipe.zremrangebyscore(redis_key, 0, now - self.window)
+        pipe.zcard(redis_key)
+        pipe.expire(redis_key, int(self.window) + 1)
+        return int(pipe.execute()[2])
+
+    def count(self, key: str) -> int:
+        redis_key = f"{self.prefix}:{key}"
+        return int(self.client.zcount(redis_key, time.time() - self.window, "+inf"))
+
+    def reset(self, key: str):
+        self.client.delete(f"{self.prefix}:{key}")
+
+
+class LoginGuard:
+    """
+    Counts failed logins per client IP and per target email.
+
+    An IP that reaches LOGIN_FAILURE_THRESHOLD_IP within the window gets
+    banned; an email that reaches LOGIN_FAILURE_THRESHOLD_EMAIL (credential
+    stuffing from many IPs) is locked until its window drains: wrong
+    passwords get 429, but the right one still logs in, so the lock can't
+    be used to keep the owner out. Counts are
+    local to the worker unless SHARED_STORE_URL is set, in which case the
+    shared count wins and the local one is the fallback when Redis is down.
+    """
+    def __init__(self):
+        window = settings.LOGIN_FAILURE_WINDOW_SECONDS
+        self.ip_threshold = settings.LOGIN_FAILURE_THRESHOLD_IP
+        self.email_threshold = settings.LOGIN_FAILURE_THRESHOLD_EMAIL
+        self._ip = SlidingWindowCounter(window, self.ip_threshold)
+        self._email = SlidingWindowCounter(window, self.email_threshold)
+        self._shared_ip = self._shared_email = None
+        if settings.SHARED_STORE_URL and settings.SHARED_STORE_URL.startswith(("redis://", "rediss://")):
+            self._shared_ip = RedisSlidingWindow(settings.SHARED_STORE_URL, "login_fail:ip", window)
+            self._shared_email = RedisSlidingWindow(settings.SHARED_STORE_URL, "login_fail:email", window)
+
+    @staticmethod
+    def _shared(op, fallback: int) -> int:
+        try:
+            return op()
+        except Exception as e:
+            print(f"⚠️  Shared login counter unavailable, using local count: {e}")
+            return fallback
+
+    def record_failure(self, ip_address: str, email: Optional[str]):
+        """
+        Returns (ip_failures, email_failures) inside the window, this attempt included.
+        """
+        ip_count = self._ip.hit(ip_address)
+        if self._shared_ip is not None:
+            ip_count = self._shared(lambda: self._shared_ip.hit(ip_address), ip_count)
+
+        email_count = 0
+        if email:
+            email = email.lower()
+            email_count = self._email.hit(email)
+            if self._shared_email is not None:
+                email_count = self._shared(lambda: self._shared_email.hit(email), email_count)
+        return ip_count, email_count
+
+    def ip_tripped(self, ip_failures: int) -> bool:
+        return ip_failures >= self.ip_threshold
+
+    def email_locked(self, email: str) -> bool:
+        email = email.lower()
+        count = self._email.count(email)
+        if self._shared_email is not None:
+            count = self._shared(lambda: self._shared_email.count(email), count)
+        return count >= self.email_threshold
+
+    def record_success(self, email: str):
+        # Only the account's counter resets; an attacker's IP keeps its failures
+        email = email.lower()
+        self._email.reset(email)
+        if self._shared_email is not None:
+            self._shared(lambda: self._shared_email.reset(email) or 0, 0)
+
+
+login_guard = LoginGuard()
@@ -0,0 +1,120 @@
+"""Dedicated, bounded executor for bcrypt hashing and verification"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+class HashingSaturated(Exception):
+    """Raised when every hashing worker is busy and the queue is full."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on PASSWORD_HASH_WORKERS threads of its own, so a login burst
+    queues here instead of occupying the request threadpool. At most
+    PASSWORD_HASH_QUEUE_SIZE calls wait behind the busy workers; beyond that
+    callers get HashingSaturated straight away (a 503) rather than a slow
+    timeout. PASSWORD_HASH_WORKERS=0 hashes on the calling thread as before.
+    """
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = None  # created on first use, and again after shutdown()
+        self._slots = threading.BoundedSemaphore(workers + queue_size) if workers > 0 else None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingSaturated()
+        with self._lock:
+            self.in_flight += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            executor = self._executor
+        future = executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future):
+        self._slots.release()
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def run(self, fn, *args):
+        """
+        Blocking call for sync code paths (user creation, password changes).
+        """
+        if self.workers <= 0:
+            return fn(*args)
+        return self._submit(fn, *args).result()
+
+    async def run_async(self, fn, *args):
+        """
+        Awaitable call for async endpoints; the request thread is never held.
+        """
+        if self.workers <= 0:
+            return await run_in_threadpool(fn, *args)
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            }
+
+    def shutdown(self):
+        """
+        Wait for running hashes and release the workers. A later call (e.g.
+        the next lifespan in the same process) starts a fresh executor.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE)
+
+
+async def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    (valid, new_hash) where new_hash is set when the stored hash was made
+    with a different BCRYPT_ROUNDS and should be replaced.
+    """
+    from app.core.security import verify_and_update_password
+
+    return await password_hasher.run_async(verify_and_update_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    from app.core.security import hash_password
+
+    return await password_hasher.run_async(hash_password, password)
+
+
+async def hashing_saturated_handler(request: Request, exc: HashingSaturated):
+    print(f"🔐 Password hashing saturated ({password_hasher.workers} workers, queue {password_hasher.queue_size}); rejected {request.url.path}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many sign-in requests right now. Please retry in a moment."},
+        headers={"Retry-After": "1"},
+    )
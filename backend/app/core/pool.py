@@ -0,0 +1,103 @@
+"""Instrumented connection pool for the primary database engine"""
+
+import threading
+import time
+from typing import Dict, Any
+
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+# Upper bounds (milliseconds) of the checkout wait-time histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters for connection checkouts.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_checkout(self, wait_ms: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            if wait_ms > self.max_wait_ms:
+                self.max_wait_ms = wait_ms
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self.buckets[i] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            histogram = {f"<={bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.buckets)}
+            histogram[f">{WAIT_BUCKETS_MS[-1]}ms"] = self.buckets[-1]
+            return {
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "wait_histogram": histogram,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _CheckoutTimingMixin:
+    """
+    Records how long each checkout waited for a connection and how many
+    checkouts timed out.
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_failure()
+            raise
+        pool_metrics.record_checkout((time.perf_counter() - start) * 1000)
+        return conn
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_pool_status(engine) -> Dict[str, Any]:
+    """
+    Live pool state plus accumulated checkout metrics for an engine.
+    """
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    status.update(pool_metrics.snapshot())
+    return status
@@ -0,0 +1,184 @@
+"""TTL cache of authenticated principals for get_current_user"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.rbac import ROLE_PERMISSION_MASKS
+from app.models.user import User
+from app.models.tenant import Tenant
+from app.models.role import Role, Permission
+
+
+class Principal:
+    """
+    Column snapshot of a user and their tenant, plus the role's permission mask.
+    Immutable once cached; attach to a session with `attach()` to get ORM objects.
+    """
+    __slots__ = ("user_id", "user_columns", "tenant_columns", "permission_mask", "expires_at")
+
+    def __init__(self, user: User, tenant: Optional[Tenant], ttl: float):
+        self.user_id = user.id
+        self.user_columns = _columns(user)
+        self.tenant_columns = _columns(tenant) if tenant is not None else None
+        self.permission_mask = ROLE_PERMISSION_MASKS.get(user.role, 0)
+        self.expires_at = time.monotonic() + ttl
+
+    @property
+    def tenant_id(self) -> Optional[int]:
+        return self.user_columns["tenant_id"]
+
+    @property
+    def tenant_plan(self) -> Optional[str]:
+        return self.tenant_columns["plan"] if self.tenant_columns else None
+
+    @property
+    def role(self) -> str:
+        return self.user_columns["role"]
+
+
+def _columns(obj) -> Dict[str, Any]:
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(type(obj)).column_attrs}
+
+
+def _detached(model, columns: Dict[str, Any]):
+    obj = model(**columns)
+    make_transient_to_detached(obj)
+    return obj
+
+
+def attach(principal: Principal, db: Session) -> User:
+    """
+    Merge the cached user (and tenant) into `db` without a SELECT, so
+    `user.tenant` resolves from the identity map and writes behave as usual.
+    """
+    if principal.tenant_columns is not None:
+        db.merge(_detached(Tenant, principal.tenant_columns), load=False)
+    return db.merge(_detached(User, principal.user_columns), load=False)
+
+
+async def attach_async(principal: Principal, db) -> User:
+    if principal.tenant_columns is not None:
+        await db.merge(_detached(Tenant, principal.tenant_columns), load=False)
+    return await db.merge(_detached(User, principal.user_columns), load=False)
+
+
+class PrincipalCache:
+    """
+    Per-process LRU of principals keyed by user id, expiring after
+    PRINCIPAL_CACHE_TTL_SECONDS. Entries are dropped as soon as a commit
+    touches the user, their tenant or any role, so the TTL only bounds
+    staleness across worker processes.
+    """
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, Principal]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            principal = self._entries.get(user_id)
+            if principal is None or principal.expires_at < time.monotonic():
+                if principal is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return principal
+
+    def tenant_id_of(self, user_id: int) -> Optional[int]:
+        """
+        Tenant of a cached, unexpired principal, without touching LRU order or stats.
+        """
+        principal = self._entries.get(user_id)
+        if principal is None or principal.expires_at < time.monotonic():
+            return None
+        return principal.tenant_id
+
+    def put(self, user: User, tenant: Optional[Tenant]) -> Principal:
+        principal = Principal(user, tenant, self.ttl)
+        with self._lock:
+            self._entries[user.id] = principal
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return principal
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_tenant(self, tenant_id: int):
+        with self._lock:
+            stale = [uid for uid, p in self._entries.items() if p.tenant_id == tenant_id]
+            for uid in stale:
+                del self._entries[uid]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_SIZE)
+
+
+# --------------------------------------------------
+# Invalidation: collect touched users/tenants/roles on flush, evict on commit
+# --------------------------------------------------
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault("principal_cache_evict", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            pending.add(("user", obj.id))
+        elif isinstance(obj, Tenant):
+            pending.add(("tenant", obj.id))
+        elif isinstance(obj, (Role, Permission)):
+            pending.add(("all", None))
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed(session):
+    for kind, key in session.info.pop("principal_cache_evict", ()):
+        if kind == "user":
+            principal_cache.invalidate_user(key)
+        elif kind == "tenant":
+            principal_cache.invalidate_tenant(key)
+        else:
+            principal_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("principal_cache_evict", None)
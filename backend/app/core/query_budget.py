@@ -0,0 +1,143 @@
+"""Per-endpoint-class statement timeouts"""
+
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+
+# Checked in order; the first matching path prefix decides the class
+ENDPOINT_CLASSES = [
+    # Offline-POS sync writes thousands of rows per statement
+    ("/api/v1/sales/sales/batch", "default"),
+    ("/api/v1/sales", "pos"),
+    ("/api/v1/inventory", "pos"),
+    ("/api/v1/reports", "reports"),
+    ("/api/v1/analytics", "reports"),
+    ("/api/v1/ai", "reports"),
+    ("/api/v1/tax", "reports"),
+    ("/api/v1/aging", "reports"),
+    ("/api/v1/backup", "reports"),
+]
+
+# Retry-After (seconds) suggested to clients when a class times out
+RETRY_AFTER = {"pos": 1, "reports": 30, "default": 5}
+
+PG_QUERY_CANCELED = "57014"
+SQLITE_PROGRESS_STEPS = 1000  # VM instructions between deadline checks
+
+_timeout_ms: ContextVar[Optional[int]] = ContextVar("statement_timeout_ms", default=None)
+
+_counts = Counter()
+_counts_lock = threading.Lock()
+
+
+def classify(path: str) -> str:
+    for prefix, endpoint_class in ENDPOINT_CLASSES:
+        if path.startswith(prefix):
+            return endpoint_class
+    return "default"
+
+
+def timeout_for(endpoint_class: str) -> int:
+    return {
+        "pos": settings.STATEMENT_TIMEOUT_POS_MS,
+        "reports": settings.STATEMENT_TIMEOUT_REPORTS_MS,
+    }.get(endpoint_class, settings.STATEMENT_TIMEOUT_DEFAULT_MS)
+
+
+@event.listens_for(Engine, "begin")
+def _set_local_statement_timeout(conn):
+    # SET LOCAL ends with the transaction, so pooled connections never keep a stale budget
+    timeout_ms = _timeout_ms.get()
+    if timeout_ms and conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _arm_sqlite_deadline(conn, cursor, statement, parameters, context, executemany):
+    # SQLite has no statement_timeout; interrupt from the progress handler instead
+    if conn.dialect.name != "sqlite":
+        return
+    driver_connection = conn.connection.driver_connection
+    if not isinstance(driver_connection, sqlite3.Connection):
+        return
+    timeout_ms = _timeout_ms.get()
+    if not timeout_ms:
+        driver_connection.set_progress_handler(None, 0)
+        return
+    deadline = time.monotonic() + timeout_ms / 1000
+    driver_connection.set_progress_handler(lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS)
+
+
+def is_statement_timeout(exc: DBAPIError) -> bool:
+    orig = exc.orig
+    for err in (orig, getattr(orig, "__cause__", None)):
+        if err is None:
+            continue
+        if getattr(err, "pgcode", None) == PG_QUERY_CANCELED or getattr(err, "sqlstate", None) == PG_QUERY_CANCELED:
+            return True
+    return isinstance(orig, sqlite3.OperationalError) and str(orig) == "interrupted"
+
+
+def _route_label(request: Request) -> str:
+    route = request.scope.get("route")
+    return f"{request.method} {route.path if route else request.url.path}"
+
+
+async def statement_timeout_handler(request: Request, exc: DBAPIError):
+    """
+    Turns a cancelled statement into a 503 with Retry-After; other DB errors
+    propagate as before.
+    """
+    if not is_statement_timeout(exc):
+        raise exc
+    label = _route_label(request)
+    with _counts_lock:
+        _counts[label] += 1
+    endpoint_class = classify(request.url.path)
+    print(f"⏱️  Statement timeout ({endpoint_class}, {timeout_for(endpoint_class)}ms) on {label}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "The request took too long to process. Please retry shortly or narrow the date range."},
+        headers={"Retry-After": str(RETRY_AFTER.get(endpoint_class, RETRY_AFTER["default"]))},
+    )
+
+
+def get_timeout_stats():
+    with _counts_lock:
+        by_route = dict(_counts.most_common())
+    return {
+        "budgets_ms": {name: timeout_for(name) for name in RETRY_AFTER},
+        "total": sum(by_route.values()),
+        "by_route": by_route,
+    }
+
+
+class StatementTimeoutMiddleware:
+    """
+    Applies the statement timeout of the request's endpoint class to every
+    transaction it opens (Postgres SET LOCAL statement_timeout; a progress
+    handler deadline on SQLite).
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _timeout_ms.set(timeout_for(classify(scope["path"])))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _timeout_ms.reset(token)
@@ -0,0 +1,92 @@
+"""Per-request SQL query counting and N+1 detection"""
+
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+
+class QueryStats:
+    """
+    Statements executed while handling one request.
+    """
+    __slots__ = ("count", "total_ms", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements = Counter()
+
+    def repeated(self, threshold: int):
+        """
+        Statements executed at least `threshold` times, most frequent first.
+        """
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+# Registered on the Engine class so the primary, replica and async engines are all covered
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None or not conn.info.get("query_start_time"):
+        return
+    stats.count += 1
+    stats.total_ms += (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+    stats.statements[statement] += 1
+
+
+class QueryStatsMiddleware:
+    """
+    Counts SQL statements and DB time per request.
+
+    Outside production the totals are returned as X-DB-Query-Count and
+    X-DB-Time-Ms headers. Any statement repeated N_PLUS_ONE_THRESHOLD times in
+    one request is logged as a suspected N+1 pattern.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.expose_headers = settings.ENVIRONMENT != "production"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_ms:.1f}".encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            for statement, times in stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+                print(
+                    f"⚠️  Possible N+1: {scope['method']} {scope['path']} ran {times}x "
+                    f"({stats.count} queries, {stats.total_ms:.1f}ms total): {' '.join(statement.split())[:200]}"
+                )
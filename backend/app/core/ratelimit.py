@@ -1,9 +1,36 @@
+"""Rate limiting: slowapi decorators plus per-user/per-tenant route-class budgets"""
+
+import math
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from jose import jwt, JWTError
+from limits import parse as parse_limit
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import ALGORITHM
+
+
+def _storage_url() -> str:
+    return settings.RATE_LIMIT_STORAGE_URL or settings.SHARED_STORE_URL or "memory://"
+
+
+def _slowapi_storage_uri() -> str:
+    # slowapi/limits understands memory:// and redis://; a SQLite file is only used by the budgets below
+    url = _storage_url()
+    return url if url.startswith(("redis://", "rediss://")) else "memory://"
+
 
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=get_remote_address, storage_uri=_slowapi_storage_uri())
 
 def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     """
@@ -12,3 +39,276 @@ def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     response = _rate_limit_exceeded_handler(request, exc)
     response.status_code = 429
     return response
+
+
+# --------------------------------------------------
+# Counter storage: fixed windows, incremented atomically
+# --------------------------------------------------
+class MemoryRateLimitStorage:
+    """
+    Per-process counters. Each worker enforces the full budget on its own,
+    so use a shared backend when running more than one worker.
+    """
+    blocking = False
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._counts: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, key: str, expires_in: float) -> int:
+        now = time.monotonic()
+        with self._lock:
+            count, expires_at = self._counts.get(key, (0, 0.0))
+            if expires_at <= now:
+                if len(self._counts) >= self.max_keys:
+                    self._prune(now)
+                count, expires_at = 0, now + expires_in
+            self._counts[key] = (count + 1, expires_at)
+            return count + 1
+
+    def _prune(self, now: float):
+        for key in [k for k, (_, expires_at) in self._counts.items() if expires_at <= now]:
+            del self._counts[key]
+        overflow = len(self._counts) - self.max_keys + 1
+        for key in list(self._counts)[:max(overflow, 0)]:
+            del self._counts[key]
+
+
+class RedisRateLimitStorage:
+    """
+    Counters in Redis (or anything speaking its protocol), shared by every
+    worker. `client` may be passed directly, e.g. a fakeredis instance.
+    """
+    blocking = True
+
+    def __init__(self, url: Optional[str] = None, client=None):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.client = client
+
+    def incr(self, key: str, expires_in: float) -> int:
+        pipe = self.client.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, max(int(math.ceil(expires_in)), 1))
+        return int(pipe.execute()[0])
+
+
+class SQLiteRateLimitStorage:
+    """
+    Counters in a local SQLite file, shared by the workers of one host.
+    Meant for single-node installs and tests without a Redis server.
+    """
+    blocking = True
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_counters "
+            "(key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def incr(self, key: str, expires_in: float) -> int:
+        conn = self._connection()
+        now = time.time()
+        count = conn.execute(
+            "INSERT INTO rate_limit_counters (key, count, expires_at) VALUES (?, 1, ?) "
+            "ON CONFLICT(key) DO UPDATE SET count = count + 1 "
+            "RETURNING count",
+            (key, now + expires_in),
+        ).fetchone()[0]
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM rate_limit_counters WHERE expires_at < ?", (now,))
+        return count
+
+
+def storage_from_url(url: str):
+    if url.startswith(("redis://", "rediss://")):
+        return RedisRateLimitStorage(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteRateLimitStorage(url[len("sqlite:///"):])
+    if url == "memory://":
+        return MemoryRateLimitStorage()
+    raise ValueError(f"Unsupported rate limit storage: {url}")
+
+
+# --------------------------------------------------
+# Route-class budgets
+# --------------------------------------------------
+_WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Checked in order; the first match decides the class
+ROUTE_CLASSES = [
+    ("exports", None, ("/api/v1/backup", "/api/v1/reports/inventory/export", "/api/v1/reports/sales/export",
+                       "/api/v1/reports/purchases/export", "/api/v1/reports/expenses/export")),
+    ("pos_writes", _WRITE_METHODS, ("/api/v1/sales", "/api/v1/inventory")),
+    ("reports", None, ("/api/v1/reports", "/api/v1/analytics", "/api/v1/ai", "/api/v1/tax", "/api/v1/aging")),
+]
+
+
+def classify(method: str, path: str) -> str:
+    for route_class, methods, prefixes in ROUTE_CLASSES:
+        if (methods is None or method in methods) and path.startswith(prefixes):
+            return route_class
+    return "default"
+
+
+@lru_cache(maxsize=None)
+def _parse(limit: str):
+    return parse_limit(limit)
+
+
+def budget_for(route_class: str):
+    return _parse({
+        "pos_writes": settings.RATE_LIMIT_POS_WRITES,
+        "reports": settings.RATE_LIMIT_REPORTS,
+        "exports": settings.RATE_LIMIT_EXPORTS,
+    }.get(route_class, settings.RATE_LIMIT_DEFAULT))
+
+
+RATE_LIMIT_HEADERS = ["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy", "Retry-After"]
+
+
+class Decision:
+    __slots__ = ("allowed", "limit", "remaining", "reset", "policy")
+
+    def __init__(self, allowed: bool, limit: int, remaining: int, reset: int, policy: str):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.policy = policy
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset),
+            "RateLimit-Policy": self.policy,
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.reset)
+        return headers
+
+
+class RouteBudgets:
+    """
+    Fixed-window budgets per route class, counted separately for the caller
+    (user id from the bearer token, else client IP) and for their tenant.
+    Each class has its own buckets, so exhausting the reports budget leaves
+    POS writes untouched; the tenant bucket (RATE_LIMIT_TENANT_MULTIPLIER x
+    the per-user budget) stops one tenant's users from crowding out others.
+    If the shared storage fails, counting falls back to process memory.
+    """
+    def __init__(self, storage, tenant_multiplier: int):
+        self.storage = storage
+        self.tenant_multiplier = tenant_multiplier
+        self._fallback = MemoryRateLimitStorage() if storage.blocking else storage
+
+    def _incr(self, key: str, expires_in: float) -> int:
+        try:
+            return self.storage.incr(key, expires_in)
+        except Exception as e:
+            print(f"⚠️  Rate limit storage unavailable, counting locally: {e}")
+            return self._fallback.incr(key, expires_in)
+
+    def hit(self, route_class: str, caller: str, tenant_id: Optional[int], now: Optional[float] = None) -> Decision:
+        budget = budget_for(route_class)
+        period = budget.get_expiry()
+        now = time.time() if now is None else now
+        window = int(now // period)
+        expires_in = (window + 1) * period - now
+        reset = max(int(math.ceil(expires_in)), 1)
+
+        buckets = [(f"rl:{route_class}:{caller}:{window}", budget.amount)]
+        if tenant_id is not None and self.tenant_multiplier > 0:
+            buckets.append((f"rl:{route_class}:tenant:{tenant_id}:{window}", budget.amount * self.tenant_multiplier))
+
+        counts = [(amount, self._incr(key, expires_in)) for key, amount in buckets]
+        # Report the bucket that rejected the request, else the one closest to running out
+        limit, count = min(counts, key=lambda c: (c[1] <= c[0], c[0] - c[1]))
+        policy = f"{limit};w={period}"
+        return Decision(count <= limit, limit, max(limit - count, 0), reset, policy)
+
+
+route_budgets = RouteBudgets(storage_from_url(_storage_url()), settings.RATE_LIMIT_TENANT_MULTIPLIER)
+
+
+def _caller(scope) -> Tuple[str, Optional[int]]:
+    """
+    (caller key, tenant id) from the bearer token without touching the
+    database. The tenant comes from the `tid` claim of self-contained tokens
+    or from the principal cache; when neither knows it, only the per-user
+    budget applies to that request.
+    """
+    from app.core.principal_cache import principal_cache
+
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            try:
+                payload = jwt.decode(value[7:].decode("latin-1"), settings.SECRET_KEY, algorithms=[ALGORITHM])
+                user_id = int(payload["sub"])
+            except (JWTError, KeyError, TypeError, ValueError):
+                break
+            tenant_id = payload.get("tid")
+            if tenant_id is None:
+                tenant_id = principal_cache.tenant_id_of(user_id)
+            return f"user:{user_id}", tenant_id
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}", None
+
+
+class RateLimitMiddleware:
+    """
+    Enforces RouteBudgets and adds RateLimit-* headers to every API response;
+    over-budget requests get 429 with Retry-After before reaching the endpoint.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or not scope["path"].startswith(settings.API_V1_STR):
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify(scope["method"], scope["path"])
+        caller, tenant_id = _caller(scope)
+        if route_budgets.storage.blocking:
+            decision = await run_in_threadpool(route_budgets.hit, route_class, caller, tenant_id)
+        else:
+            decision = route_budgets.hit(route_class, caller, tenant_id)
+
+        headers = decision.headers()
+        if not decision.allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": f"Rate limit exceeded for {route_class.replace('_', ' ')}. Retry in {decision.reset}s."},
+                headers=headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        raw_headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()]
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + raw_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -61,6 +61,30 @@ ROLE_PERMISSIONS: Dict[str, List[str]] = {
 def get_role_permissions(role: str) -> List[str]:
     return ROLE_PERMISSIONS.get(role, [])
 
+# Stable bit position per permission, for compact masks in tokens.
+# Append new permissions at the end; reordering changes the meaning of issued tokens.
+PERMISSION_BITS: Dict[str, int] = {
+    code: 1 << i
+    for i, code in enumerate(
+        value for name, value in vars(Permissions).items() if not name.startswith("_")
+    )
+}
+
+def permission_mask(permissions: List[str]) -> int:
+    mask = 0
+    for code in permissions:
+        mask |= PERMISSION_BITS.get(code, 0)
+    return mask
+
+# ROLE_PERMISSIONS compiled once at import
+ROLE_PERMISSION_MASKS: Dict[str, int] = {
+    role: permission_mask(permissions) for role, permissions in ROLE_PERMISSIONS.items()
+}
+
+def role_has_permission(role: str, permission: str) -> bool:
+    bit = PERMISSION_BITS.get(permission, 0)
+    return bit != 0 and ROLE_PERMISSION_MASKS.get(role, 0) & bit == bit
+
 # Plan Limits
 PLAN_LIMITS = {
     "free": {
@@ -0,0 +1,67 @@
+"""Read-your-writes stickiness for routing read-only endpoints to a replica"""
+
+import threading
+import time
+
+from app.core.config import settings
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+_PRUNE_THRESHOLD = 10000
+
+_last_write = {}  # client key -> time.monotonic() of its last successful write
+_lock = threading.Lock()
+
+
+def client_key(scope) -> str:
+    """
+    Identify the caller by its bearer token, falling back to the client address.
+    """
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            return value.decode("latin-1")
+    client = scope.get("client")
+    return client[0] if client else ""
+
+
+def mark_write(scope):
+    now = time.monotonic()
+    with _lock:
+        _last_write[client_key(scope)] = now
+        if len(_last_write) > _PRUNE_THRESHOLD:
+            cutoff = now - settings.READ_YOUR_WRITES_SECONDS
+            for key in [k for k, t in _last_write.items() if t < cutoff]:
+                del _last_write[key]
+
+
+def wrote_recently(scope) -> bool:
+    """
+    True if this caller wrote within READ_YOUR_WRITES_SECONDS and should read from the primary.
+    """
+    if not settings.DATABASE_READ_URL:
+        return False
+    last = _last_write.get(client_key(scope))
+    return last is not None and time.monotonic() - last < settings.READ_YOUR_WRITES_SECONDS
+
+
+class ReadYourWritesMiddleware:
+    """
+    Records successful non-GET requests so the caller's next reads go to the primary.
+
+    Stickiness is per worker process; with several workers a read can still land
+    on the replica if the load balancer sends it elsewhere, so keep
+    READ_YOUR_WRITES_SECONDS above typical replica lag.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or not settings.DATABASE_READ_URL:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                mark_write(scope)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,177 @@
+"""Request inspection for SQL injection / XSS payloads"""
+
+import json
+import re
+from typing import Optional, Tuple
+from urllib.parse import unquote_plus
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.models.security import SecurityEventType
+
+# Two-stage matcher over lower-cased input. Every pattern begins with one of the
+# literal GATES, and str.find locates those at memchr speed, so clean input never
+# reaches the regex engine. At each gate occurrence PATTERN (all patterns in one
+# alternation, grouped by family) is tried with match(), anchored at that offset.
+# (A plain PATTERN.search tries every alternative at every offset: ~1ms per 2KB.)
+#
+# Bare SQL keywords show up in ordinary text ("(select plan)", "sleep (2 nights)",
+# "price; drop table at front"), so each pattern also needs a quote or SQL syntax
+# around the keyword before it counts.
+_SQL_INJECTION = [
+    r"union(?:\s|/\*.*?\*/|\()+(?:all\s+|distinct\s+)?select\s+(?:null\b|\d|@@|\*|[\w.]+\s*(?:,|from\b))",
+    r"['`]\s*\)*\s*(?:or|and)\s+['\"`]?\w+['\"`]?\s*(?:=|like)\s*['\"`]?\w+",
+    r"['`]\s*\)*\s*;\s*(?:drop|delete|truncate|alter|insert|update|create|exec|shutdown|waitfor)\b",
+    r"['`]\s*(?:--|/\*)",
+    r"['`]\s*#\s*(?:$|\")",
+    r";\s*(?:drop|truncate|alter)\s+(?:table|database|schema)\s+(?:if\s+exists\s+)?[\w.\"`\[\]]+\s*(?:;|--|/\*|#|$|\")",
+    r";\s*(?:shutdown\s*(?:;|--|$|\"|with\s+nowait)|exec(?:ute)?\s+(?:master\.|xp_|sp_)|waitfor\s+delay\s+')",
+    r"\(\s*select\s+(?:[^()]{1,100}?\bfrom\s+[\w\"`\[]|@@\w|\d+\s*[),]"
+    r"|(?:pg_)?sleep\s*\(|benchmark\s*\(|(?:version|user|database|current_user|char|concat|load_file)\s*\()",
+    r"(?:sleep|benchmark)\(\s*\d+(?:\.\d+)?\s*[),]",
+]
+_XSS = [
+    r"<\s*/?\s*script\b",
+    r"<[^<>]{0,256}?\bon(?:error|load|click|mouseover|focus|blur|submit|toggle|animationstart)\s*=",
+    r"<\s*(?:iframe|object|embed|applet|base|meta)\b",
+    r"(?:(?<=java)|(?<=vb))script\s*:",
+]
+GATES = ("'", "`", "<", ";", "(", "union", "sleep", "benchmark", "script")
+
+PATTERN = re.compile(
+    "(?P<sql>" + "|".join(_SQL_INJECTION) + ")|(?P<xss>" + "|".join(_XSS) + ")",
+    re.DOTALL,
+)
+
+# Boolean tautologies (`or 1=1`, `and 'a'='a'`) have no leading token of their own:
+# each "=" is checked against a short window before it
+TAUTOLOGY = re.compile(r"\b(?:or|and)\s+(['\"`]?)(\w+)\1\s*=\s*\1\2\1(?!\w)")
+_TAUTOLOGY_WINDOW = 48
+
+EVENT_TYPES = {"sql": SecurityEventType.SQL_INJECTION, "xss": SecurityEventType.XSS_ATTEMPT}
+
+# Anything a password may legitimately contain is blanked before scanning
+_SECRET_VALUES = re.compile(r'("(?:\w*password\w*|secret|token)"\s*:\s*)"(?:[^"\\]|\\.)*"', re.IGNORECASE)
+_BODY_METHODS = {"POST", "PUT", "PATCH"}
+
+
+def scan(text: str) -> Optional[Tuple[str, str]]:
+    """
+    (family, matched text) for the first suspicious fragment, or None.
+    """
+    text = text.lower()
+    for gate in GATES:
+        start = text.find(gate)
+        while start != -1:
+            match = PATTERN.match(text, start)
+            if match is not None:
+                return match.lastgroup, match.group(0)
+            start = text.find(gate, start + 1)
+    start = text.find("=")
+    while start != -1:
+        window_start = max(start - _TAUTOLOGY_WINDOW, 0)
+        before = text[window_start:start]
+        if "or" in before or "and" in before:
+            match = TAUTOLOGY.search(text, window_start, start + _TAUTOLOGY_WINDOW)
+            if match is not None:
+                return "sql", match.group(0)
+        start = text.find("=", start + 1)
+    return None
+
+
+def _json_text(body: bytes) -> str:
+    text = body.decode("utf-8", "replace")
+    if "password" in text or "secret" in text or "token" in text:
+        text = _SECRET_VALUES.sub(r'\1""', text)
+    if "\\u" in text:
+        # <script> and friends: scan the decoded strings too
+        try:
+            text += "\n" + json.dumps(json.loads(text), ensure_ascii=False)
+        except ValueError:
+            pass
+    return text
+
+
+def _is_json(scope) -> bool:
+    for name, value in scope.get("headers", ()):
+        if name == b"content-type":
+            return b"json" in value
+    return False
+
+
+class RequestInspectionMiddleware:
+    """
+    Scans the path, query string and JSON body of API requests with PATTERN
+    and records hits as SQL_INJECTION / XSS_ATTEMPT events through the
+    batched security event writer. REQUEST_INSPECTION_MODE=block also
+    rejects the request with 400; "log" only records; "off" skips scanning.
+    Bodies are scanned up to REQUEST_INSPECTION_MAX_BODY_BYTES.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        mode = settings.REQUEST_INSPECTION_MODE
+        if scope["type"] != "http" or mode == "off" or not scope["path"].startswith(settings.API_V1_STR):
+            await self.app(scope, receive, send)
+            return
+
+        where, hit = "path", scan(scope["path"])
+        if hit is None:
+            query = scope.get("query_string")
+            if query:
+                where, hit = "query", scan(unquote_plus(query.decode("latin-1")))
+
+        if hit is None and scope["method"] in _BODY_METHODS and _is_json(scope):
+            messages, body = await _read_body(receive, settings.REQUEST_INSPECTION_MAX_BODY_BYTES)
+            if body:
+                where, hit = "body", scan(_json_text(body))
+            receive = _replay(messages, receive)
+
+        if hit is None:
+            await self.app(scope, receive, send)
+            return
+
+        family, fragment = hit
+        client = scope.get("client")
+        from app.services.security_service import security_service
+        security_service.record_event(
+            event_type=EVENT_TYPES[family],
+            ip_address=client[0] if client else "unknown",
+            description=f"{'Blocked' if mode == 'block' else 'Detected'} {family} pattern in {where} of "
+                        f"{scope['method']} {scope['path']}: {fragment[:120]!r}",
+            severity="high",
+        )
+        if mode == "block":
+            response = JSONResponse(status_code=400, content={"detail": "Request rejected by security policy."})
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+async def _read_body(receive, limit: int):
+    """
+    Drain the request body; returns the raw messages (to replay) and up to `limit` bytes.
+    """
+    messages, chunks, size = [], [], 0
+    more = True
+    while more:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        chunk = message.get("body", b"")
+        if size < limit:
+            chunks.append(chunk[:limit - size])
+        size += len(chunk)
+        more = message.get("more_body", False)
+    return messages, b"".join(chunks)
+
+
+def _replay(messages, receive):
+    async def replay():
+        if messages:
+            return messages.pop(0)
+        return await receive()
+    return replay
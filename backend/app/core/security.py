@@ -1,27 +1,55 @@
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Dict, Optional, Union
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.rbac import ROLE_PERMISSION_MASKS
+from app.core.password_hashing import password_hasher
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost are flagged by verify_and_update and upgraded on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 ALGORITHM = "HS256"
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None, claims: Optional[Dict[str, Any]] = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = dict(claims or {})
+    to_encode.update({"exp": expire, "sub": str(subject)})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def token_claims(user) -> Dict[str, Any]:
+    """
+    Authorization claims for a self-contained access token (JWT_SELF_CONTAINED).
+    Empty when the option is off, which keeps the classic sub/exp token.
+    """
+    if not settings.JWT_SELF_CONTAINED:
+        return {}
+    return {
+        "tid": user.tenant_id,
+        "role": user.role,
+        "rid": user.role_id,
+        "perm": ROLE_PERMISSION_MASKS.get(user.role, 0),
+        "su": bool(user.is_superuser),
+        "ver": user.token_version or 0,
+    }
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.run(pwd_context.verify, plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    # Runs on the caller's thread; use password_hashing.verify_and_update from endpoints
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def hash_password(password: str) -> str:
+    # Runs on the caller's thread; use password_hashing.hash_password_async from endpoints
     # Bcrypt supports max 72 bytes → enforce it
     if len(password.encode("utf-8")) > 72:
         password = password[:72]
 
     return pwd_context.hash(password)
+
+def get_password_hash(password: str) -> str:
+    return password_hasher.run(hash_password, password)
@@ -0,0 +1,77 @@
+"""SQLite high-performance profile for single-node and edge deployments"""
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.pool import InstrumentedQueuePool
+
+
+def _pragmas(query_only: bool = False):
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",  # negative = KiB rather than pages
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA foreign_keys=ON",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if query_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def install_pragmas(engine, query_only: bool = False):
+    """
+    Apply the profile's PRAGMAs to every new DBAPI connection of `engine`
+    (sync engine, or an AsyncEngine's sync_engine).
+    """
+    pragmas = _pragmas(query_only)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def install_immediate_transactions(engine):
+    """
+    Open write transactions with BEGIN IMMEDIATE so the write lock is taken up
+    front. A deferred transaction that reads and then writes can fail with
+    "database is locked" immediately when another process committed in between;
+    IMMEDIATE waits on busy_timeout instead.
+
+    pysqlite emits the BEGIN itself, just before the first INSERT/UPDATE/DELETE,
+    so sessions that only read never take the write lock.
+    """
+    @event.listens_for(engine, "connect")
+    def _begin_immediate(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = "IMMEDIATE"
+
+
+def writer_engine_kwargs():
+    """
+    A small pool on the primary file. Only sessions that write take SQLite's
+    lock (and wait on busy_timeout for it); the pool just bounds connections.
+    """
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.SQLITE_WRITE_POOL_SIZE,
+        "max_overflow": 0,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+def reader_engine_kwargs():
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.SQLITE_READ_POOL_SIZE,
+        "max_overflow": 0,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+def is_file_database(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
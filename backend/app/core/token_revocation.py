@@ -0,0 +1,110 @@
+"""In-memory token version / revocation table for self-contained access tokens"""
+
+import threading
+import time
+from typing import Dict, Tuple
+
+from sqlalchemy import event, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.core.config import settings
+
+TOKEN_OK = "ok"
+TOKEN_REVOKED = "revoked"
+USER_INACTIVE = "inactive"
+
+# Changing any of these invalidates tokens issued before the change
+_VERSIONED_ATTRIBUTES = ("role", "role_id", "is_active", "is_superuser", "hashed_password", "tenant_id")
+
+
+class RevocationTable:
+    """
+    Users whose tokens need a check: anyone with token_version > 0 or who is
+    inactive. Everyone else is implicitly (version 0, active). Reloaded from
+    the database at most every TOKEN_REVOCATION_REFRESH_SECONDS by whichever
+    request notices it is stale; other requests keep using the previous copy.
+    """
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._entries: Dict[int, Tuple[int, bool]] = {}
+        self._loaded_at = None
+        self._refresh_lock = threading.Lock()
+
+    def _load(self):
+        from app.core.database import engine
+
+        stmt = select(User.id, User.token_version, User.is_active).where(
+            or_(User.token_version > 0, User.is_active.is_(False))
+        )
+        with engine.connect() as conn:
+            rows = conn.execute(stmt).all()
+        self._entries = {user_id: (version or 0, bool(active)) for user_id, version, active in rows}
+        self._loaded_at = time.monotonic()
+
+    def refresh_if_stale(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        # First load blocks; afterwards a single request refreshes while others read the old table
+        if self._loaded_at is None:
+            with self._refresh_lock:
+                if self._loaded_at is None:
+                    self._load()
+            return
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                self._load()
+            except Exception as e:
+                print(f"⚠️  Token revocation refresh failed, keeping previous table: {e}")
+                self._loaded_at = time.monotonic()
+            finally:
+                self._refresh_lock.release()
+
+    def check(self, user_id: int, token_version: int) -> str:
+        self.refresh_if_stale()
+        version, active = self._entries.get(user_id, (0, True))
+        if not active:
+            return USER_INACTIVE
+        if token_version != version:
+            return TOKEN_REVOKED
+        return TOKEN_OK
+
+    def update(self, user_id: int, version: int, active: bool):
+        """
+        Apply a change committed by this process without waiting for the next refresh.
+        """
+        entries = dict(self._entries)
+        if version or not active:
+            entries[user_id] = (version, active)
+        else:
+            entries.pop(user_id, None)
+        self._entries = entries
+
+
+revocation_table = RevocationTable(settings.TOKEN_REVOCATION_REFRESH_SECONDS)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_token_versions(session, flush_context, instances):
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        version_changed = state.attrs.token_version.history.has_changes()
+        if not version_changed and any(state.attrs[name].history.has_changes() for name in _VERSIONED_ATTRIBUTES):
+            obj.token_version = (obj.token_version or 0) + 1
+            version_changed = True
+        if version_changed:
+            # Captured now: attributes are expired by the time after_commit runs
+            session.info.setdefault("token_versions", {})[obj.id] = (obj.token_version, bool(obj.is_active))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_token_versions(session):
+    for user_id, (version, active) in session.info.pop("token_versions", {}).items():
+        revocation_table.update(user_id, version, active)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_token_versions(session):
+    session.info.pop("token_versions", None)
@@ -1,3 +1,7 @@
+import time
+_boot_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
@@ -12,24 +16,54 @@ from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
 from app.api.v1.endpoints import (
-    auth, users, inventory, sales, dashboard, reports, crm, expenses, billing, settings as settings_endpoint, super_admin, notifications, ai, aging, activity_logs, backup, branches, analytics, roles, purchases, tax_report, banking
+    auth, users, inventory, sales, dashboard, reports, crm, expenses, billing, settings as settings_endpoint, super_admin, notifications, ai, aging, activity_logs, backup, branches, analytics, roles, purchases, tax_report, banking, security
 )
 from app.core.database import engine, Base
 from app.core.ratelimit import limiter
 import app.models  # Ensure model registration
 
+startup_timings = {"imports": time.perf_counter() - _boot_started}
+
 
 # --------------------------------------------------
-# ✔ CREATE ALL TABLES & RUN MIGRATIONS
+# ✔ CREATE ALL TABLES & RUN MIGRATIONS (unless FAST_BOOT)
 # --------------------------------------------------
-from app.core.db_init import init_db
-init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.FAST_BOOT:
+        print("⚡ FAST_BOOT enabled: skipping schema init")
+    else:
+        from app.core.db_init import init_db
+        started = time.perf_counter()
+        init_db()
+        startup_timings["db_init"] = time.perf_counter() - started
+
+    # Background security event writer: batched inserts, rollups, retention purge
+    from app.services.security_service import security_event_writer
+    security_event_writer.start()
+
+    breakdown = ", ".join(f"{phase}={seconds * 1000:.0f}ms" for phase, seconds in startup_timings.items())
+    print(f"🚦 Startup breakdown: {breakdown}")
+    yield
+
+    # Write security events still queued for the background writer
+    security_event_writer.stop()
+
+    from app.core.password_hashing import password_hasher
+    password_hasher.shutdown()
+
+    from app.core.http_client import outbound_http
+    outbound_http.close()
+
+    from app.services.numbering_service import numbering_service
+    numbering_service.close()
 
 
 # --------------------------------------------------
 # ✔ APP INITIALIZATION
 # --------------------------------------------------
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=None if settings.ENVIRONMENT == "production" else "/docs",
@@ -37,6 +71,23 @@ app = FastAPI(
 )
 
 
+# --------------------------------------------------
+# ✔ REQUEST INSPECTION (SQL injection / XSS → SecurityEvent; inside the rate limiter)
+# --------------------------------------------------
+from app.core.request_inspection import RequestInspectionMiddleware
+app.add_middleware(RequestInspectionMiddleware)
+
+
+# --------------------------------------------------
+# ✔ RATE LIMITING (route-class budgets per user/tenant + slowapi decorators)
+# Added before CORS so 429s carry CORS headers and preflights are not counted
+# --------------------------------------------------
+from app.core.ratelimit import RateLimitMiddleware, RATE_LIMIT_HEADERS
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_middleware(RateLimitMiddleware)
+
+
 # --------------------------------------------------
 # 🔥 GLOBAL CORS — ABSOLUTE FIX FOR RENDER + VERCEL
 # --------------------------------------------------
@@ -53,6 +104,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=RATE_LIMIT_HEADERS,
 )
 
 # --------------------------------------------------
@@ -75,10 +127,40 @@ app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 
 # --------------------------------------------------
-# ✔ RATE LIMITING
+# ✔ READ REPLICA STICKINESS
 # --------------------------------------------------
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+from app.core.read_routing import ReadYourWritesMiddleware
+app.add_middleware(ReadYourWritesMiddleware)
+
+
+# --------------------------------------------------
+# ✔ PER-REQUEST QUERY COUNT / N+1 DETECTION
+# --------------------------------------------------
+from app.core.query_stats import QueryStatsMiddleware
+app.add_middleware(QueryStatsMiddleware)
+
+
+# --------------------------------------------------
+# ✔ STATEMENT TIMEOUTS PER ENDPOINT CLASS
+# --------------------------------------------------
+from sqlalchemy.exc import DBAPIError
+from app.core.query_budget import StatementTimeoutMiddleware, statement_timeout_handler
+app.add_middleware(StatementTimeoutMiddleware)
+app.add_exception_handler(DBAPIError, statement_timeout_handler)
+
+
+# --------------------------------------------------
+# ✔ PASSWORD HASHING BACKPRESSURE (503 when the bcrypt pool is full)
+# --------------------------------------------------
+from app.core.password_hashing import HashingSaturated, hashing_saturated_handler
+app.add_exception_handler(HashingSaturated, hashing_saturated_handler)
+
+
+# --------------------------------------------------
+# ✔ BLOCKED IPs (outermost: rejected before routing/auth)
+# --------------------------------------------------
+from app.core.ip_blocklist import BlockedIPMiddleware
+app.add_middleware(BlockedIPMiddleware)
 
 
 # --------------------------------------------------
@@ -90,6 +172,7 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # --------------------------------------------------
 # ✔ API ROUTES
 # --------------------------------------------------
+_routes_started = time.perf_counter()
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(inventory.router, prefix="/api/v1/inventory", tags=["inventory"])
@@ -113,6 +196,8 @@ app.include_router(roles.router, prefix="/api/v1/roles", tags=["roles"])
 app.include_router(purchases.router, prefix="/api/v1/purchases", tags=["purchases"])
 app.include_router(tax_report.router, prefix="/api/v1/tax", tags=["tax"])
 app.include_router(banking.router, prefix="/api/v1/banking", tags=["banking"])
+app.include_router(security.router, prefix="/api/v1/security", tags=["security"])
+startup_timings["router_registration"] = time.perf_counter() - _routes_started
 
 
 
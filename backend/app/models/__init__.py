@@ -6,11 +6,13 @@ from .crm import Customer, Supplier
 from .expense import Expense, ExpenseCategory
 from .purchase import Purchase, PurchaseItem
 from .notification import Notification
-from .security import SecurityEvent, BlockedIP as IPBlacklist
+from .security import SecurityEvent, SecurityEventRollup, BlockedIP as IPBlacklist
 from .payment_request import PaymentRequest
 from .payment import Payment
 from .payment_account import PaymentAccount
 from .settings import Settings
 from .role import Role, Permission
 from .branch import Branch
+from .migration import SchemaMigration
+from .sequence import DocumentSequence
 
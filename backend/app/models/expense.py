@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -18,6 +18,9 @@ class ExpenseCategory(str, enum.Enum):
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_tenant_id_date", "tenant_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     category = Column(Enum(ExpenseCategory), nullable=False, index=True)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class SchemaMigration(Base):
+    """Ledger of auto-migration scripts that have been applied to this database."""
+    __tablename__ = "schema_migrations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)  # e.g. "migrate_branches.py"
+    checksum = Column(String, nullable=False)  # sha256 of the script contents
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
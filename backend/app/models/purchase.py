@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class Purchase(Base):
     __tablename__ = "purchases"
+    __table_args__ = (
+        Index("ix_purchases_tenant_id_date", "tenant_id", "date"),
+        Index("ux_purchases_tenant_id_invoice_number", "tenant_id", "invoice_number", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     invoice_number = Column(String, index=True)
@@ -32,6 +36,10 @@ class Purchase(Base):
 
 class PurchaseItem(Base):
     __tablename__ = "purchase_items"
+    __table_args__ = (
+        Index("ix_purchase_items_purchase_id", "purchase_id"),
+        Index("ix_purchase_items_item_id", "item_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     quantity = Column(Integer)
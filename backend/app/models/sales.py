@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = (
+        Index("ix_sales_tenant_id_date", "tenant_id", "date"),
+        # Client-generated key of a sale synced from an offline POS; replays are no-ops
+        Index("ux_sales_tenant_id_idempotency_key", "tenant_id", "idempotency_key", unique=True),
+        Index("ux_sales_tenant_id_invoice_number", "tenant_id", "invoice_number", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     invoice_number = Column(String, index=True)
@@ -13,6 +19,7 @@ class Sale(Base):
     tax_amount = Column(Float, default=0.0)
     discount = Column(Float, default=0.0)
     payment_method = Column(String, default="Cash")
+    idempotency_key = Column(String(64), nullable=True)
     
     # Aging Report Fields
     payment_status = Column(String, default="paid")  # paid, partial, pending
@@ -32,6 +39,10 @@ class Sale(Base):
 
 class SaleItem(Base):
     __tablename__ = "sale_items"
+    __table_args__ = (
+        Index("ix_sale_items_sale_id", "sale_id"),
+        Index("ix_sale_items_item_id", "item_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     quantity = Column(Integer)
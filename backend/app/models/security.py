@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -27,8 +27,26 @@ class BlockedIP(Base):
     __tablename__ = "blocked_ips"
 
     id = Column(Integer, primary_key=True, index=True)
-    ip_address = Column(String, unique=True, index=True)
+    ip_address = Column(String, unique=True, index=True)  # single address or CIDR range, e.g. "203.0.113.0/24"
     reason = Column(String)
     blocked_at = Column(DateTime(timezone=True), server_default=func.now())
     expires_at = Column(DateTime(timezone=True), nullable=True) # Null means permanent
     is_active = Column(Boolean, default=True)
+
+class SecurityEventRollup(Base):
+    """
+    Hourly event counters, maintained as security events are written.
+    ip_prefix is the /24 (IPv4) or /64 (IPv6) network of the source address.
+    """
+    __tablename__ = "security_event_rollups"
+    __table_args__ = (
+        UniqueConstraint("hour", "event_type", "severity", "ip_prefix", name="uq_security_event_rollups_bucket"),
+        Index("ix_security_event_rollups_hour", "hour"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    hour = Column(DateTime, nullable=False)  # UTC, truncated to the hour
+    event_type = Column(String, nullable=False)
+    severity = Column(String, nullable=False)
+    ip_prefix = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
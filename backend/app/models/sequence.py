@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from app.core.database import Base
+
+class DocumentSequence(Base):
+    """
+    Next unleased document number per tenant, series ("sale", "purchase")
+    and period ("2026" for formats that reset yearly, "" for none).
+    Workers lease blocks from it; see app/services/numbering_service.py.
+    """
+    __tablename__ = "document_sequences"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "series", "period", name="uq_document_sequences_series_period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
+    series = Column(String, nullable=False)
+    period = Column(String, nullable=False, default="")
+    next_value = Column(Integer, nullable=False)
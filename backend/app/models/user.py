@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 # Note: Role is imported as string "Role" in relationship to avoid circular imports
@@ -6,6 +6,9 @@ from app.core.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_tenant_id", "tenant_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -13,6 +16,8 @@ class User(Base):
     full_name = Column(String, index=True)
     is_active = Column(Boolean(), default=True)
     is_superuser = Column(Boolean(), default=False)
+    # Bumped when role/activation/password changes; tokens carrying an older version are rejected
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
 
     # Social Auth
     social_provider = Column(String, nullable=True)  # e.g., 'google', 'github'
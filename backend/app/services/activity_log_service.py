@@ -12,21 +12,27 @@ class ActivityLogService:
         action: str, 
         entity_type: str, 
         entity_id: Optional[int] = None, 
-        details: Optional[Dict[str, Any]] = None
+        details: Optional[Dict[str, Any]] = None,
+        commit: bool = True
     ):
         """
         Create a new activity log entry.
+
+        commit=False adds the entry to the caller's transaction, so it is
+        written (or rolled back) together with the change it records.
         """
+        log_entry = ActivityLog(
+            tenant_id=tenant_id,
+            user_id=user_id,
+            action=action,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            details=details
+        )
+        db.add(log_entry)
+        if not commit:
+            return log_entry
         try:
-            log_entry = ActivityLog(
-                tenant_id=tenant_id,
-                user_id=user_id,
-                action=action,
-                entity_type=entity_type,
-                entity_id=entity_id,
-                details=details
-            )
-            db.add(log_entry)
             db.commit()
             return log_entry
         except Exception as e:
@@ -1,18 +1,15 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from app.models import Sale, InventoryItem as Item, Customer, Supplier
-import pandas as pd
 from datetime import datetime, timedelta
 import re
 
-try:
-    from prophet import Prophet
-    PROPHET_AVAILABLE = True
-except ImportError:
-    PROPHET_AVAILABLE = False
-
 def generate_forecast(db: Session, tenant_id: int, days: int = 30):
-    if not PROPHET_AVAILABLE:
+    # Prophet and pandas are loaded on first forecast, not at worker boot
+    try:
+        from prophet import Prophet
+        import pandas as pd
+    except ImportError:
         return {"error": "Prophet library not available"}
 
     # Fetch historical sales
@@ -1,16 +1,19 @@
+from typing import Optional
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from app.models import User, Tenant
 from app.schemas import auth as schemas
 from app.core.security import get_password_hash
 
-def create_user(db: Session, user: schemas.UserCreate):
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
     # 1. Create Tenant
     new_tenant = Tenant(name=user.tenant_name)
     db.add(new_tenant)
     db.flush() # Get ID
 
-    # 2. Create User
-    hashed_password = get_password_hash(user.password)
+    # 2. Create User (async callers hash the password beforehand, off the request thread)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -43,3 +46,15 @@ def create_tenant_user(db: Session, user: schemas.UserCreate, tenant_id: int):
 
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
+
+def upgrade_password_hash(db: Session, user_id: int, hashed_password: str):
+    """
+    Store a re-hash of the same password (new bcrypt cost). Written with a
+    plain UPDATE so the ORM's token_version bump doesn't log the user out
+    everywhere for a change that isn't a credential change.
+    """
+    db.execute(
+        update(User).where(User.id == user_id).values(hashed_password=hashed_password),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
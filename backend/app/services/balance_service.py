@@ -0,0 +1,22 @@
+from typing import Optional
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+
+def add_to_balance(db: Session, model, row_id: int, amount: float, tenant_id: Optional[int] = None,
+                   column: str = "outstanding_balance") -> Optional[float]:
+    """
+    Atomically add `amount` (negative to subtract) to `model.column` with
+    UPDATE ... SET col = col + :amount ... RETURNING col, instead of an ORM
+    read-modify-write that loses concurrent updates. Returns the new value,
+    or None when no such row exists (for this tenant, if given).
+
+    Objects already loaded in the session are not refreshed; do not also
+    assign the same column through the ORM before committing.
+    """
+    col = getattr(model, column)
+    stmt = update(model).where(model.id == row_id)
+    if tenant_id is not None:
+        stmt = stmt.where(model.tenant_id == tenant_id)
+    stmt = stmt.values({column: func.coalesce(col, 0) + amount}).returning(col).execution_options(synchronize_session=False)
+    return db.execute(stmt).scalar_one_or_none()
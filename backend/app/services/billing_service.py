@@ -1,11 +1,15 @@
-import stripe
 from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.models.tenant import Tenant
 
-stripe.api_key = settings.STRIPE_API_KEY
+def _stripe():
+    """Import and configure the Stripe SDK on first use instead of at worker boot."""
+    import stripe
+    stripe.api_key = settings.STRIPE_API_KEY
+    return stripe
 
 def create_checkout_session(tenant_id: int, plan_type: str):
+    stripe = _stripe()
     # Map plan_type to Stripe Price ID
     price_id = "price_1Q..." # Replace with actual Stripe Price ID from env or config
     if plan_type == "pro":
@@ -34,6 +38,7 @@ def create_checkout_session(tenant_id: int, plan_type: str):
         return None
 
 def create_portal_session(tenant_id: int, stripe_customer_id: str):
+    stripe = _stripe()
     try:
         session = stripe.billing_portal.Session.create(
             customer=stripe_customer_id,
@@ -45,6 +50,7 @@ def create_portal_session(tenant_id: int, stripe_customer_id: str):
         return None
 
 def handle_webhook(db: Session, payload, sig_header):
+    stripe = _stripe()
     try:
         event = stripe.Webhook.construct_event(
             payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
@@ -1,5 +1,7 @@
+from fastapi import HTTPException
+from sqlalchemy import case, or_, select, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from app.models import InventoryItem as Item, Category
 from app.schemas import item as schemas
 from app.schemas import category as cat_schemas
@@ -10,6 +12,49 @@ def get_items(db: Session, tenant_id: int, skip: int = 0, limit: int = 100) -> L
 from app.services.activity_log_service import activity_log_service
 from app.services.notification_service import notification_service
 
+class InsufficientStock(HTTPException):
+    """
+    Raised by adjust_stock(require_stock=True) when a decrement would take an
+    item below zero. Nothing is changed for any item in the call.
+    """
+    def __init__(self, item_ids: List[int]):
+        self.item_ids = item_ids
+        super().__init__(status_code=409, detail=f"Insufficient stock for item(s): {', '.join(map(str, item_ids))}")
+
+def adjust_stock(db: Session, tenant_id: int, deltas: Dict[int, int], require_stock: bool = False):
+    """
+    Apply quantity deltas ({item_id: +n or -n}) in one atomic
+    UPDATE ... SET quantity = quantity + CASE id ... END ... RETURNING, so
+    concurrent terminals never overwrite each other's changes. Rows are
+    locked in id order through the sub-select (no deadlocks between
+    overlapping baskets). With require_stock, items that would go negative
+    are left alone and InsufficientStock is raised; the caller rolls back.
+
+    Returns {item_id: row} with the new id, name, quantity and min_stock.
+    """
+    deltas = {item_id: delta for item_id, delta in deltas.items() if delta}
+    if not deltas:
+        return {}
+    ids = sorted(deltas)
+    delta = case(deltas, value=Item.id, else_=0)
+    locked = (
+        select(Item.id)
+        .where(Item.tenant_id == tenant_id, Item.id.in_(ids))
+        .order_by(Item.id)
+        .with_for_update()
+    )
+    stmt = update(Item).where(Item.id.in_(locked)).values(quantity=Item.quantity + delta)
+    if require_stock:
+        stmt = stmt.where(or_(delta >= 0, Item.quantity + delta >= 0))
+    stmt = stmt.returning(Item.id, Item.name, Item.quantity, Item.min_stock).execution_options(synchronize_session=False)
+    rows = {row.id: row for row in db.execute(stmt)}
+
+    if require_stock:
+        short = [item_id for item_id in ids if deltas[item_id] < 0 and item_id not in rows]
+        if short:
+            raise InsufficientStock(short)
+    return rows
+
 def check_low_stock(db: Session, item_id: int, tenant_id: int):
     """
     Check if item stock is below minimum level and trigger notification.
@@ -17,24 +62,37 @@ def check_low_stock(db: Session, item_id: int, tenant_id: int):
     item = get_item(db, item_id, tenant_id)
     if not item:
         return
+    check_low_stock_items(db, [item], tenant_id)
 
-    if item.quantity <= item.min_stock:
-        # Check if notification already exists to avoid spamming (optional, but good practice)
-        # For now, we'll just create it. A more robust system would check for recent unread notifications.
-        
-        # Find admin users for this tenant to notify
-        from app.models import User
-        admins = db.query(User).filter(User.tenant_id == tenant_id, User.role == "admin").all()
-        
-        for admin in admins:
-            notification_service.create_notification(
-                db, 
-                tenant_id, 
-                "Low Stock Alert", 
-                f"Item '{item.name}' is low on stock. Current quantity: {item.quantity} (Min: {item.min_stock})",
-                "warning",
-                user_id=admin.id
-            )
+def check_low_stock_items(db: Session, items: List[Item], tenant_id: int, commit: bool = True):
+    """
+    Low-stock notifications for items whose stock was just changed (loaded
+    items or adjust_stock rows, with current quantities). The tenant's
+    admins are looked up once, and only when at least one item is at or
+    below its minimum. commit=False leaves the notifications in the
+    caller's transaction.
+    """
+    low = [item for item in items if item.quantity <= item.min_stock]
+    if not low:
+        return
+
+    # Check if notification already exists to avoid spamming (optional, but good practice)
+    # For now, we'll just create it. A more robust system would check for recent unread notifications.
+
+    # Find admin users for this tenant to notify
+    from app.models import User
+    admin_ids = [row.id for row in db.query(User.id).filter(User.tenant_id == tenant_id, User.role == "admin")]
+
+    notification_service.create_notifications(db, tenant_id, [
+        {
+            "title": "Low Stock Alert",
+            "message": f"Item '{item.name}' is low on stock. Current quantity: {item.quantity} (Min: {item.min_stock})",
+            "type": "warning",
+            "user_id": admin_id,
+        }
+        for item in low
+        for admin_id in admin_ids
+    ], commit=commit)
 
 import time
 import random
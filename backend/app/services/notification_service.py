@@ -1,3 +1,4 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.models.notification import Notification
 from typing import List, Optional
@@ -25,6 +26,19 @@ class NotificationService:
         db.refresh(notification)
         return notification
 
+    def create_notifications(self, db: Session, tenant_id: int, notifications: List[dict], commit: bool = True):
+        """
+        Insert many notifications ({title, message, type, user_id}) with one
+        executemany. commit=False leaves them in the caller's transaction.
+        """
+        if not notifications:
+            return
+        db.execute(insert(Notification), [
+            {"tenant_id": tenant_id, "is_read": False, "type": "info", "user_id": None, **n} for n in notifications
+        ])
+        if commit:
+            db.commit()
+
     def get_unread_notifications(self, db: Session, tenant_id: int, user_id: int) -> List[Notification]:
         return db.query(Notification).filter(
             Notification.tenant_id == tenant_id,
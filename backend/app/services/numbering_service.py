@@ -0,0 +1,215 @@
+import datetime
+import re
+import string
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.purchase import Purchase
+from app.models.sales import Sale
+from app.models.sequence import DocumentSequence
+
+# series -> (model numbered by it, setting holding its format)
+SERIES = {
+    "sale": (Sale, "INVOICE_NUMBER_FORMAT"),
+    "purchase": (Purchase, "PURCHASE_NUMBER_FORMAT"),
+}
+
+
+def _fields(fmt: str) -> List[str]:
+    return [field for _, field, _, _ in string.Formatter().parse(fmt) if field]
+
+
+def period_of(fmt: str, now: datetime.datetime) -> str:
+    """The period a format restarts in: "2026" with {year}, "2026-10" with {year} and {month}, else ""."""
+    fields = _fields(fmt)
+    if "year" in fields and "month" in fields:
+        return now.strftime("%Y-%m")
+    if "year" in fields:
+        return now.strftime("%Y")
+    return ""
+
+
+def _pattern(fmt: str, now: datetime.datetime) -> Tuple[str, "re.Pattern"]:
+    """
+    (prefix, regex) matching the numbers `fmt` produces in `now`'s period;
+    the regex captures the sequence value.
+    """
+    prefix, regex, seen_seq = "", "", False
+    for literal, field, spec, conversion in string.Formatter().parse(fmt):
+        if literal:
+            regex += re.escape(literal)
+            prefix += "" if seen_seq else literal
+        if not field:
+            continue
+        if field == "seq":
+            regex += r"(\d+)"
+            seen_seq = True
+            continue
+        value = format({"year": now.year, "month": now.month}[field], spec or "")
+        regex += re.escape(value)
+        prefix += "" if seen_seq else value
+    return prefix, re.compile(regex + "$")
+
+
+class NumberingService:
+    """
+    Collision-free invoice and purchase order numbers, per tenant and series.
+
+    Numbers come from document_sequences, but each worker leases a block of
+    DOCUMENT_NUMBER_BLOCK_SIZE at a time (one UPDATE ... RETURNING) and
+    hands them out from memory, so most allocations need no round-trip.
+    Numbers are unique and increasing per worker, not gapless: a lease that
+    is never used up (restart, year end) leaves a gap. The unique index on
+    (tenant_id, invoice_number) backs this up.
+
+    Leases commit in their own short transaction, on a small engine of
+    their own so they never wait for (or hold) a request's connection.
+    SQLite has a single writer, so there the lease joins the caller's
+    transaction instead (a second connection would wait on the caller's
+    write lock). The rest of such a block is only handed out once the
+    caller commits; on rollback it is dropped with the lease, so another
+    worker can lease the same range without a collision.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (tenant_id, series, period) -> [[next, end), ...] leased and not yet handed out
+        self._free: Dict[Tuple[int, str, str], List[List[int]]] = {}
+        self._engine = None
+        # session.info key for blocks leased in a session's open transaction
+        self._pending_key = f"numbering_leases_{id(self)}"
+        event.listen(Session, "after_commit", self._publish_pending)
+        event.listen(Session, "after_transaction_end", self._drop_pending)
+
+    def next_number(self, db: Session, tenant_id: int, series: str) -> str:
+        return self.allocate(db, tenant_id, series, 1)[0]
+
+    def allocate(self, db: Session, tenant_id: int, series: str, count: int,
+                 now: Optional[datetime.datetime] = None) -> List[str]:
+        """
+        `count` formatted numbers for the tenant's series, in increasing order.
+        Call before the caller's first write: on SQLite a lease is a write.
+        """
+        model, format_setting = SERIES[series]
+        fmt = getattr(settings, format_setting)
+        now = now or datetime.datetime.now()
+        key = (tenant_id, series, period_of(fmt, now))
+
+        values = self._take(key, count)
+        if len(values) < count:
+            needed = count - len(values)
+            start, end = self._lease(db, model, fmt, now, key, max(needed, settings.DOCUMENT_NUMBER_BLOCK_SIZE))
+            values.extend(range(start, start + needed))
+            if start + needed < end:
+                self._release(db, key, [start + needed, end])
+        values.sort()
+        return [fmt.format(year=now.year, month=now.month, seq=value) for value in values]
+
+    def _take(self, key, count: int) -> List[int]:
+        values = []
+        with self._lock:
+            ranges = self._free.get(key, [])
+            while ranges and len(values) < count:
+                block = ranges[0]
+                n = min(count - len(values), block[1] - block[0])
+                values.extend(range(block[0], block[0] + n))
+                block[0] += n
+                if block[0] == block[1]:
+                    ranges.pop(0)
+        return values
+
+    def _add_free(self, leases):
+        with self._lock:
+            for key, block in leases:
+                self._free.setdefault(key, []).append(block)
+                self._free[key].sort()
+
+    def _release(self, db: Session, key, block: List[int]):
+        """Make the unused part of a lease available, once the lease is durable."""
+        if self._joins_caller(db):
+            db.info.setdefault(self._pending_key, []).append((key, block))
+        else:
+            self._add_free([(key, block)])
+
+    def _publish_pending(self, session: Session):
+        pending = session.info.pop(self._pending_key, None)
+        if pending:
+            self._add_free(pending)
+
+    def _drop_pending(self, session: Session, transaction):
+        # Runs after after_commit; anything still pending was rolled back
+        if transaction.parent is None:
+            session.info.pop(self._pending_key, None)
+
+    @staticmethod
+    def _joins_caller(db: Session) -> bool:
+        return db.get_bind().dialect.name == "sqlite"
+
+    def _lease_engine(self, bind):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    # A lease is one short UPDATE; a few connections serve every worker thread
+                    self._engine = create_engine(
+                        bind.url, pool_size=2, max_overflow=2, pool_timeout=settings.DB_POOL_TIMEOUT,
+                        pool_recycle=settings.DB_POOL_RECYCLE, pool_pre_ping=settings.DB_POOL_PRE_PING,
+                    )
+        return self._engine
+
+    def _lease(self, db: Session, model, fmt: str, now: datetime.datetime, key, size: int) -> Tuple[int, int]:
+        """Reserve [start, start + size) in document_sequences and return it."""
+        if self._joins_caller(db):
+            return self._lease_on(db, model, fmt, now, key, size)
+        lease_engine = self._lease_engine(db.get_bind())
+        for attempt in range(2):
+            try:
+                with lease_engine.begin() as conn:
+                    return self._lease_on(conn, model, fmt, now, key, size)
+            except IntegrityError:
+                # Another worker created the period's row first; lease from it
+                if attempt:
+                    raise
+
+    def _lease_on(self, conn, model, fmt: str, now: datetime.datetime, key, size: int) -> Tuple[int, int]:
+        tenant_id, series, period = key
+        end = conn.execute(
+            update(DocumentSequence)
+            .where(DocumentSequence.tenant_id == tenant_id, DocumentSequence.series == series,
+                   DocumentSequence.period == period)
+            .values(next_value=DocumentSequence.next_value + size)
+            .returning(DocumentSequence.next_value)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        if end is None:
+            # First number of the period: continue after any matching numbers already on file
+            start = self._highest_existing(conn, model, fmt, now, tenant_id) + 1
+            end = start + size
+            conn.execute(insert(DocumentSequence).values(tenant_id=tenant_id, series=series, period=period, next_value=end))
+        return end - size, end
+
+    @staticmethod
+    def _highest_existing(conn, model, fmt: str, now: datetime.datetime, tenant_id: int) -> int:
+        prefix, regex = _pattern(fmt, now)
+        numbers = conn.execute(
+            select(model.invoice_number).where(
+                model.tenant_id == tenant_id, model.invoice_number.startswith(prefix, autoescape=True)
+            )
+        ).scalars()
+        return max((int(m.group(1)) for m in map(regex.match, numbers) if m), default=0)
+
+    def clear(self):
+        with self._lock:
+            self._free.clear()
+
+    def close(self):
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+
+
+numbering_service = NumberingService()
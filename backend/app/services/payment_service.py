@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.models import Payment, Customer, Supplier
+from app.services.balance_service import add_to_balance
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -26,16 +27,12 @@ def create_payment(db: Session, payment_in: PaymentCreate, tenant_id: int):
     
     # Update Balance
     if payment_in.customer_id:
-        customer = db.query(Customer).filter(Customer.id == payment_in.customer_id, Customer.tenant_id == tenant_id).first()
-        if customer:
-            # Payment from customer reduces their debt (outstanding balance)
-            customer.outstanding_balance -= payment_in.amount
+        # Payment from customer reduces their debt (outstanding balance)
+        add_to_balance(db, Customer, payment_in.customer_id, -payment_in.amount, tenant_id)
             
     if payment_in.supplier_id:
-        supplier = db.query(Supplier).filter(Supplier.id == payment_in.supplier_id, Supplier.tenant_id == tenant_id).first()
-        if supplier:
-            # Payment to supplier reduces our debt to them (outstanding balance)
-            supplier.outstanding_balance -= payment_in.amount
+        # Payment to supplier reduces our debt to them (outstanding balance)
+        add_to_balance(db, Supplier, payment_in.supplier_id, -payment_in.amount, tenant_id)
             
     db.commit()
     db.refresh(db_payment)
@@ -48,14 +45,10 @@ def delete_payment(db: Session, payment_id: int, tenant_id: int):
         
     # Revert Balance
     if payment.customer_id:
-        customer = db.query(Customer).filter(Customer.id == payment.customer_id, Customer.tenant_id == tenant_id).first()
-        if customer:
-            customer.outstanding_balance += payment.amount
+        add_to_balance(db, Customer, payment.customer_id, payment.amount, tenant_id)
             
     if payment.supplier_id:
-        supplier = db.query(Supplier).filter(Supplier.id == payment.supplier_id, Supplier.tenant_id == tenant_id).first()
-        if supplier:
-            supplier.outstanding_balance += payment.amount
+        add_to_balance(db, Supplier, payment.supplier_id, payment.amount, tenant_id)
             
     db.delete(payment)
     db.commit()
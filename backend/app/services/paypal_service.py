@@ -2,18 +2,67 @@
 PayPal payment integration service for BizTrackr.
 Handles PayPal checkout, order creation, and webhook processing.
 """
-import os
-import paypalrestsdk
+import threading
+import time
+import uuid
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.http_client import outbound_http
 from app.models.tenant import Tenant
 
-# Configure PayPal SDK
-paypalrestsdk.configure({
-    "mode": os.getenv('PAYPAL_MODE', 'sandbox'),  # sandbox or live
-    "client_id": os.getenv('PAYPAL_CLIENT_ID', ''),
-    "client_secret": os.getenv('PAYPAL_CLIENT_SECRET', '')
-})
+PAYPAL_API_BASES = {"sandbox": "https://api-m.sandbox.paypal.com", "live": "https://api-m.paypal.com"}
+
+
+class PayPalAPI:
+    """
+    Minimal PayPal REST (v1 payments) client on the shared keep-alive pool.
+    The OAuth token is cached until shortly before it expires, and every
+    POST carries a PayPal-Request-Id so a retried request is deduplicated
+    by PayPal instead of charging twice.
+    """
+    def __init__(self):
+        self._token = None
+        self._token_expires_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return settings.PAYPAL_API_BASE or PAYPAL_API_BASES.get(settings.PAYPAL_MODE, PAYPAL_API_BASES["sandbox"])
+
+    def _access_token(self) -> str:
+        with self._lock:
+            if self._token is None or time.monotonic() >= self._token_expires_at:
+                response = outbound_http.post(
+                    f"{self.base_url}/v1/oauth2/token",
+                    data={"grant_type": "client_credentials"},
+                    auth=(settings.PAYPAL_CLIENT_ID, settings.PAYPAL_CLIENT_SECRET),
+                    idempotent=True,
+                )
+                response.raise_for_status()
+                data = response.json()
+                self._token = data["access_token"]
+                self._token_expires_at = time.monotonic() + max(float(data.get("expires_in", 0)) - 60, 0)
+            return self._token
+
+    def post(self, path: str, body: dict, request_id: str):
+        """
+        (status_code, json body); a 401 drops the cached token and retries once.
+        """
+        for _ in range(2):
+            response = outbound_http.post(
+                f"{self.base_url}{path}",
+                json=body,
+                headers={"Authorization": f"Bearer {self._access_token()}", "PayPal-Request-Id": request_id},
+                idempotent=True,
+            )
+            if response.status_code != 401:
+                break
+            with self._lock:
+                self._token = None
+        return response.status_code, response.json() if response.content else {}
+
+
+paypal_api = PayPalAPI()
 
 
 def create_paypal_order(tenant_id: int, plan_type: str, amount: float):
@@ -29,7 +78,7 @@ def create_paypal_order(tenant_id: int, plan_type: str, amount: float):
         dict: PayPal payment details with approval URL
     """
     try:
-        payment = paypalrestsdk.Payment({
+        status_code, payment = paypal_api.post("/v1/payments/payment", {
             "intent": "sale",
             "payer": {
                 "payment_method": "paypal"
@@ -55,19 +104,19 @@ def create_paypal_order(tenant_id: int, plan_type: str, amount: float):
                 "description": f"BizTrackr {plan_type.title()} Monthly Subscription",
                 "custom": str(tenant_id)  # Store tenant_id for webhook
             }]
-        })
+        }, request_id=str(uuid.uuid4()))
         
-        if payment.create():
+        if status_code in (200, 201):
             # Get approval URL
-            for link in payment.links:
-                if link.rel == "approval_url":
+            for link in payment.get("links", []):
+                if link.get("rel") == "approval_url":
                     return {
-                        "payment_id": payment.id,
-                        "approval_url": link.href,
-                        "status": payment.state
+                        "payment_id": payment["id"],
+                        "approval_url": link["href"],
+                        "status": payment.get("state")
                     }
         else:
-            print(f"PayPal error: {payment.error}")
+            print(f"PayPal error: {payment}")
             return None
             
     except Exception as e:
@@ -88,17 +137,23 @@ def capture_paypal_payment(db: Session, payment_id: str, payer_id: str):
         dict: Payment execution details
     """
     try:
-        payment = paypalrestsdk.Payment.find(payment_id)
+        # A stable request id: a repeated capture of the same approval is deduplicated by PayPal
+        status_code, payment = paypal_api.post(
+            f"/v1/payments/payment/{payment_id}/execute", {"payer_id": payer_id},
+            request_id=f"execute-{payment_id}-{payer_id}",
+        )
         
-        if payment.execute({"payer_id": payer_id}):
+        if status_code == 200:
+            transactions = payment.get("transactions") or []
             # Extract tenant_id from custom field
-            tenant_id = payment.transactions[0].custom if payment.transactions else None
+            tenant_id = transactions[0].get("custom") if transactions else None
             
             if tenant_id:
                 tenant = db.query(Tenant).filter(Tenant.id == int(tenant_id)).first()
                 if tenant:
                     # Determine plan from SKU or description
-                    sku = payment.transactions[0].item_list.items[0].sku
+                    items = transactions[0].get("item_list", {}).get("items") or [{}]
+                    sku = items[0].get("sku")
                     plan = sku.replace("plan_", "") if sku else "pro"
                     
                     tenant.plan = plan
@@ -111,11 +166,11 @@ def capture_paypal_payment(db: Session, payment_id: str, payer_id: str):
                 "status": "completed",
                 "tenant_id": tenant_id,
                 "payment_id": payment_id,
-                "payer_email": payment.payer.payer_info.email if hasattr(payment.payer, 'payer_info') else None,
-                "amount": payment.transactions[0].amount.total if payment.transactions else None
+                "payer_email": payment.get("payer", {}).get("payer_info", {}).get("email"),
+                "amount": transactions[0].get("amount", {}).get("total") if transactions else None
             }
         else:
-            print(f"Payment execution failed: {payment.error}")
+            print(f"Payment execution failed: {payment}")
             return None
             
     except Exception as e:
@@ -8,7 +8,6 @@ from reportlab.pdfgen import canvas
 from io import BytesIO
 from datetime import datetime
 from typing import Dict
-import qrcode
 
 class NumberedCanvas(canvas.Canvas):
     """Custom canvas to add page numbers and elegant borders"""
@@ -53,6 +52,7 @@ class NumberedCanvas(canvas.Canvas):
 
 def generate_qr_code(data: str) -> BytesIO:
     """Generate QR code image"""
+    import qrcode
     qr = qrcode.QRCode(version=1, box_size=10, border=2)
     qr.add_data(data)
     qr.make(fit=True)
@@ -1,7 +1,10 @@
+import threading
+import time
 from sqlalchemy.orm import Session
 from app.models.role import Role, Permission, role_permissions
 from app.models.user import User
-from typing import List, Optional, Set
+from app.core.config import settings
+from typing import Dict, List, Optional, Set
 from pydantic import BaseModel
 
 class RoleCreate(BaseModel):
@@ -12,6 +15,52 @@ class RoleUpdate(BaseModel):
     name: Optional[str] = None
     permissions: Optional[List[str]] = None
 
+class RoleBitsetCache:
+    """
+    Role permissions compiled to integer bitsets (bit = 1 << permission.id).
+
+    Permission codes are global and loaded once; role masks are loaded per
+    tenant in one query and kept until a role of that tenant changes in this
+    process, or ROLE_PERMISSION_CACHE_TTL_SECONDS passes (changes made by
+    other workers).
+    """
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._code_bits: Optional[Dict[str, int]] = None
+        self._tenants: Dict[int, tuple] = {}  # tenant_id -> (expires_at, {role_id: mask})
+        self._lock = threading.Lock()
+
+    def code_bits(self, db: Session) -> Dict[str, int]:
+        if self._code_bits is None:
+            rows = db.query(Permission.id, Permission.code).all()
+            self._code_bits = {code: 1 << perm_id for perm_id, code in rows}
+        return self._code_bits
+
+    def role_masks(self, db: Session, tenant_id: int) -> Dict[int, int]:
+        cached = self._tenants.get(tenant_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        rows = (
+            db.query(Role.id, role_permissions.c.permission_id)
+            .outerjoin(role_permissions, role_permissions.c.role_id == Role.id)
+            .filter(Role.tenant_id == tenant_id)
+            .all()
+        )
+        masks: Dict[int, int] = {}
+        for role_id, permission_id in rows:
+            masks[role_id] = masks.get(role_id, 0) | (1 << permission_id if permission_id is not None else 0)
+        with self._lock:
+            self._tenants[tenant_id] = (time.monotonic() + self.ttl, masks)
+        return masks
+
+    def invalidate_tenant(self, tenant_id: int):
+        with self._lock:
+            self._tenants.pop(tenant_id, None)
+
+
+role_bitsets = RoleBitsetCache(settings.ROLE_PERMISSION_CACHE_TTL_SECONDS)
+
 class PermissionService:
     def get_permissions(self, db: Session) -> List[Permission]:
         return db.query(Permission).all()
@@ -34,6 +83,7 @@ class PermissionService:
             db_role.permissions = perms
             
         db.commit()
+        role_bitsets.invalidate_tenant(tenant_id)
         db.refresh(db_role)
         return db_role
 
@@ -50,6 +100,7 @@ class PermissionService:
             db_role.permissions = perms
             
         db.commit()
+        role_bitsets.invalidate_tenant(tenant_id)
         db.refresh(db_role)
         return db_role
 
@@ -64,17 +115,24 @@ class PermissionService:
             
         db.delete(db_role)
         db.commit()
+        role_bitsets.invalidate_tenant(tenant_id)
         return True
 
+    def get_user_permission_mask(self, db: Session, user_id: int) -> int:
+        # The authenticated user is already in the session's identity map, so get() costs no query
+        user = db.get(User, user_id)
+        if not user or not user.role_id or not user.tenant_id:
+            return 0
+        return role_bitsets.role_masks(db, user.tenant_id).get(user.role_id, 0)
+
     def get_user_permissions(self, db: Session, user_id: int) -> Set[str]:
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user or not user.role_obj:
+        mask = self.get_user_permission_mask(db, user_id)
+        if not mask:
             return set()
-        
-        return {p.code for p in user.role_obj.permissions}
+        return {code for code, bit in role_bitsets.code_bits(db).items() if mask & bit}
 
     def check_permission(self, db: Session, user_id: int, permission_code: str) -> bool:
-        perms = self.get_user_permissions(db, user_id)
-        return permission_code in perms
+        bit = role_bitsets.code_bits(db).get(permission_code, 0)
+        return bit != 0 and self.get_user_permission_mask(db, user_id) & bit == bit
 
 permission_service = PermissionService()
@@ -1,4 +1,3 @@
-import pandas as pd
 import io
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
@@ -7,6 +6,7 @@ from app.models import InventoryItem as Item, Sale, Purchase, Expense, SaleItem,
 from fastapi import UploadFile, HTTPException
 
 def export_inventory_csv(db: Session, tenant_id: int):
+    import pandas as pd  # Heavy; only load when exporting/importing
     items = db.query(Item).filter(Item.tenant_id == tenant_id).all()
     df = pd.DataFrame([vars(i) for i in items])
     if '_sa_instance_state' in df.columns:
@@ -17,6 +17,7 @@ def export_inventory_csv(db: Session, tenant_id: int):
     return stream.getvalue()
 
 async def import_inventory(db: Session, file: UploadFile, tenant_id: int):
+    import pandas as pd  # Heavy; only load when exporting/importing
     contents = await file.read()
     try:
         if file.filename.endswith('.csv'):
@@ -45,6 +46,7 @@ async def import_inventory(db: Session, file: UploadFile, tenant_id: int):
 
 def export_sales_csv(db: Session, tenant_id: int, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
     """Export sales data to CSV"""
+    import pandas as pd
     query = db.query(Sale).filter(Sale.tenant_id == tenant_id)
     
     if start_date:
@@ -72,6 +74,7 @@ def export_sales_csv(db: Session, tenant_id: int, start_date: Optional[datetime]
 
 def export_purchases_csv(db: Session, tenant_id: int, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
     """Export purchases data to CSV"""
+    import pandas as pd
     query = db.query(Purchase).filter(Purchase.tenant_id == tenant_id)
     
     if start_date:
@@ -98,6 +101,7 @@ def export_purchases_csv(db: Session, tenant_id: int, start_date: Optional[datet
 
 def export_expenses_csv(db: Session, tenant_id: int, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
     """Export expenses data to CSV"""
+    import pandas as pd
     query = db.query(Expense).filter(Expense.tenant_id == tenant_id)
     
     if start_date:
@@ -1,11 +1,17 @@
+from sqlalchemy import case, func, insert, update
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from sqlalchemy.exc import IntegrityError
 from app.models import Sale, SaleItem, Purchase, PurchaseItem, InventoryItem as Item, Customer, Supplier, User
+from app.models.activity_log import ActivityLog
 from app.models.settings import Settings
 from app.models.payment_account import PaymentAccount
+from app.core.config import settings as app_settings
 from app.services import inventory_service
+from app.services.balance_service import add_to_balance
+from app.services.numbering_service import numbering_service
 from app.services.activity_log_service import activity_log_service
 from app.schemas.purchase import PurchaseCreate
 
@@ -16,24 +22,46 @@ class SaleCreate(BaseModel):
     discount: float = 0.0
     account_id: Optional[int] = None
 
-def create_sale(db: Session, sale_in: SaleCreate, tenant_id: int, user_id: Optional[int] = None):
-    # Fetch global settings for tax rate
-    settings = db.query(Settings).first()
-    tax_rate = settings.tax_rate if settings else 0.0
-    
-    # 1. Calculate Total
+class OfflineSale(SaleCreate):
+    idempotency_key: str = Field(..., min_length=1, max_length=64) # generated by the POS, unique per tenant
+    date: Optional[datetime.datetime] = None # when the sale was rung up; defaults to arrival
+
+class SaleBatchCreate(BaseModel):
+    sales: List[OfflineSale]
+
+# Keys per IN (...) list; well under SQLite's bound-parameter limit
+_IN_CHUNK = 500
+
+def _chunks(values, size: int = _IN_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _load_items(db: Session, tenant_id: int, item_ids) -> dict:
+    """
+    {item_id: item} for the tenant's items among item_ids, one IN query per chunk.
+    """
+    db_items = {}
+    for chunk in _chunks(sorted(item_ids)):
+        db_items.update((db_item.id, db_item) for db_item in db.query(Item).filter(Item.tenant_id == tenant_id, Item.id.in_(chunk)))
+    return db_items
+
+def _price_sale(sale_in: SaleCreate, db_items: dict, tax_rate: float) -> dict:
+    """
+    Lines, totals and payment status for one sale; lines whose item is not
+    in db_items are skipped.
+    """
     total_amount = 0.0
-    sale_items_data = []
-    
+    lines = []
     for item_data in sale_in.items:
-        db_item = db.query(Item).filter(Item.id == item_data['item_id'], Item.tenant_id == tenant_id).first()
+        db_item = db_items.get(item_data['item_id'])
         if not db_item:
             continue # Or raise error
         
         item_total = (db_item.selling_price * item_data['quantity']) - item_data.get('discount', 0)
         total_amount += item_total
         
-        sale_items_data.append({
+        lines.append({
             "db_item": db_item,
             "quantity": item_data['quantity'],
             "price": db_item.selling_price,
@@ -56,9 +84,48 @@ def create_sale(db: Session, sale_in: SaleCreate, tenant_id: int, user_id: Optio
         payment_status = "paid"
         amount_paid = final_total
 
-    # 2. Create Sale
-    invoice_number = f"INV-{int(datetime.datetime.utcnow().timestamp())}"
+    return {
+        "lines": lines,
+        "tax_amount": tax_amount,
+        "total_amount": final_total,
+        "payment_status": payment_status,
+        "amount_paid": amount_paid,
+    }
+
+def create_sale(db: Session, sale_in: SaleCreate, tenant_id: int, user_id: Optional[int] = None,
+                require_stock: Optional[bool] = None):
+    # Fetch global settings for tax rate
+    settings = db.query(Settings).first()
+    tax_rate = settings.tax_rate if settings else 0.0
     
+    # 1. Calculate Total
+    # Resolve the whole basket in one query. Prices only: stock is changed
+    # atomically below, which takes the row locks (in id order) itself.
+    db_items = _load_items(db, tenant_id, {item_data['item_id'] for item_data in sale_in.items})
+    priced = _price_sale(sale_in, db_items, tax_rate)
+    sale_items_data = priced["lines"]
+    tax_amount = priced["tax_amount"]
+    final_total = priced["total_amount"]
+    payment_status = priced["payment_status"]
+    amount_paid = priced["amount_paid"]
+
+    # Numbered before any write: a new block lease must not wait while this
+    # sale holds its stock row locks (and on SQLite the lease is a write itself)
+    invoice_number = numbering_service.next_number(db, tenant_id, "sale")
+
+    # Reduce Stock: one UPDATE for the basket, quantities aggregated per item
+    deltas = {}
+    for data in sale_items_data:
+        deltas[data['db_item'].id] = deltas.get(data['db_item'].id, 0) - data['quantity']
+    if require_stock is None:
+        require_stock = app_settings.SALES_REJECT_INSUFFICIENT_STOCK
+    try:
+        stock = inventory_service.adjust_stock(db, tenant_id, deltas, require_stock=require_stock)
+    except inventory_service.InsufficientStock:
+        db.rollback()
+        raise
+
+    # 2. Create Sale
     new_sale = Sale(
         invoice_number=invoice_number,
         customer_id=sale_in.customer_id,
@@ -75,45 +142,172 @@ def create_sale(db: Session, sale_in: SaleCreate, tenant_id: int, user_id: Optio
     db.flush()
 
     # 3. Items & Stock Update
-    for data in sale_items_data:
-        item_discount = data.get('discount', 0)
-        new_item = SaleItem(
-            sale_id=new_sale.id,
-            item_id=data['db_item'].id,
-            quantity=data['quantity'],
-            price=data['price'],
-            discount=item_discount,
-            total=data['total']
-        )
-        db.add(new_item)
-        
-        # Reduce Stock
-        data['db_item'].quantity -= data['quantity']
-        inventory_service.check_low_stock(db, data['db_item'].id, tenant_id)
+    # One executemany for all lines (ids are not needed back, so no per-row RETURNING)
+    if sale_items_data:
+        db.execute(insert(SaleItem), [
+            {
+                "sale_id": new_sale.id,
+                "item_id": data['db_item'].id,
+                "quantity": data['quantity'],
+                "price": data['price'],
+                "discount": data.get('discount', 0),
+                "total": data['total'],
+            }
+            for data in sale_items_data
+        ])
+
+    # Low-stock alerts once per sale, over the items it changed
+    inventory_service.check_low_stock_items(db, list(stock.values()), tenant_id, commit=False)
 
     # Update Customer Balance
-    if sale_in.customer_id:
-        customer = db.query(Customer).filter(Customer.id == sale_in.customer_id, Customer.tenant_id == tenant_id).first()
-        if customer and sale_in.payment_method == "Credit":
-            customer.outstanding_balance += new_sale.total_amount
+    if sale_in.customer_id and sale_in.payment_method == "Credit":
+        add_to_balance(db, Customer, sale_in.customer_id, final_total, tenant_id)
 
     # Update Payment Account Balance
     if sale_in.account_id and sale_in.payment_method != "Credit":
-        payment_account = db.query(PaymentAccount).filter(PaymentAccount.id == sale_in.account_id, PaymentAccount.tenant_id == tenant_id).first()
-        if payment_account:
-            payment_account.balance += new_sale.total_amount
+        add_to_balance(db, PaymentAccount, sale_in.account_id, final_total, tenant_id, column="balance")
 
-    db.commit()
-    db.refresh(new_sale)
-    
     if user_id:
         activity_log_service.log_action(
             db, tenant_id, user_id, "CREATE_SALE", "sale", new_sale.id, 
-            {"invoice": new_sale.invoice_number, "total": new_sale.total_amount}
+            {"invoice": new_sale.invoice_number, "total": new_sale.total_amount},
+            commit=False
         )
+
+    # The sale, its lines, stock, balances, alerts and audit entry: one commit
+    db.commit()
+    db.refresh(new_sale)
         
     return new_sale
 
+def ingest_sales_batch(db: Session, sales_in: List[OfflineSale], tenant_id: int, user_id: Optional[int] = None) -> List[dict]:
+    """
+    Record a batch of sales queued by an offline POS, in one transaction.
+    Returns one result per input sale, in order: "created", "duplicate"
+    (its idempotency key was already recorded, now or in an earlier sync)
+    or "rejected" (no known items). A batch racing another sync with the
+    same keys is retried once, after which those keys show as duplicates.
+    """
+    try:
+        return _ingest_sales_batch(db, sales_in, tenant_id, user_id)
+    except IntegrityError:
+        db.rollback()
+        return _ingest_sales_batch(db, sales_in, tenant_id, user_id)
+
+def _ingest_sales_batch(db: Session, sales_in: List[OfflineSale], tenant_id: int, user_id: Optional[int]) -> List[dict]:
+    settings = db.query(Settings).first()
+    tax_rate = settings.tax_rate if settings else 0.0
+
+    # Keys recorded by earlier syncs
+    keys = {sale_in.idempotency_key for sale_in in sales_in}
+    recorded = {}
+    for chunk in _chunks(keys):
+        for row in db.query(Sale.id, Sale.idempotency_key, Sale.invoice_number, Sale.total_amount).filter(
+            Sale.tenant_id == tenant_id, Sale.idempotency_key.in_(chunk)
+        ):
+            recorded[row.idempotency_key] = {"sale_id": row.id, "invoice_number": row.invoice_number, "total": row.total_amount}
+
+    # Every item referenced by the batch, resolved in one pass
+    fresh = [sale_in for sale_in in sales_in if sale_in.idempotency_key not in recorded]
+    db_items = _load_items(db, tenant_id, {item_data['item_id'] for sale_in in fresh for item_data in sale_in.items})
+
+    received_at = datetime.datetime.now(datetime.timezone.utc)
+    results, accepted, seen = [], [], set()
+    deltas, customer_credit, account_income = {}, {}, {}
+    for sale_in in sales_in:
+        key = sale_in.idempotency_key
+        if key in recorded or key in seen:
+            results.append({"idempotency_key": key, "status": "duplicate"})
+            continue
+        seen.add(key)
+        priced = _price_sale(sale_in, db_items, tax_rate)
+        if not priced["lines"]:
+            results.append({"idempotency_key": key, "status": "rejected", "error": "No known items in sale"})
+            continue
+
+        # Stock deltas and balance changes aggregated over the whole batch
+        for line in priced["lines"]:
+            deltas[line['db_item'].id] = deltas.get(line['db_item'].id, 0) - line['quantity']
+        if sale_in.customer_id and sale_in.payment_method == "Credit":
+            customer_credit[sale_in.customer_id] = customer_credit.get(sale_in.customer_id, 0.0) + priced["total_amount"]
+        if sale_in.account_id and sale_in.payment_method != "Credit":
+            account_income[sale_in.account_id] = account_income.get(sale_in.account_id, 0.0) + priced["total_amount"]
+
+        row = {
+            # Same keys on every row, so the inserts batch into multi-row statements
+            "invoice_number": None, # allocated below, in one go for the batch
+            "date": sale_in.date or received_at,
+            "idempotency_key": key,
+            "customer_id": sale_in.customer_id,
+            "total_amount": priced["total_amount"],
+            "tax_amount": priced["tax_amount"],
+            "discount": sale_in.discount,
+            "payment_method": sale_in.payment_method,
+            "payment_account_id": sale_in.account_id,
+            "payment_status": priced["payment_status"],
+            "amount_paid": priced["amount_paid"],
+            "tenant_id": tenant_id,
+        }
+        accepted.append((row, priced["lines"]))
+        results.append({"idempotency_key": key, "status": "created"})
+
+    if accepted:
+        numbers = numbering_service.allocate(db, tenant_id, "sale", len(accepted))
+        for (row, _), invoice_number in zip(accepted, numbers):
+            row["invoice_number"] = invoice_number
+
+        # Sold while offline: stock may already be short, so no insufficient-stock guard
+        changed = []
+        for chunk in _chunks(sorted(deltas)):
+            changed.extend(inventory_service.adjust_stock(db, tenant_id, {item_id: deltas[item_id] for item_id in chunk}).values())
+
+        sale_ids = {}
+        for chunk in _chunks(accepted):
+            inserted = db.execute(
+                insert(Sale).returning(Sale.id, Sale.idempotency_key).execution_options(render_nulls=True),
+                [row for row, _ in chunk],
+            )
+            sale_ids.update((r.idempotency_key, r.id) for r in inserted)
+        for chunk in _chunks([
+            {
+                "sale_id": sale_ids[row["idempotency_key"]],
+                "item_id": line['db_item'].id,
+                "quantity": line['quantity'],
+                "price": line['price'],
+                "discount": line['discount'],
+                "total": line['total'],
+            }
+            for row, lines in accepted for line in lines
+        ], 5000):
+            db.execute(insert(SaleItem), chunk)
+
+        for customer_id, amount in customer_credit.items():
+            add_to_balance(db, Customer, customer_id, amount, tenant_id)
+        for account_id, amount in account_income.items():
+            add_to_balance(db, PaymentAccount, account_id, amount, tenant_id, column="balance")
+
+        if user_id:
+            db.execute(insert(ActivityLog), [
+                {
+                    "tenant_id": tenant_id, "user_id": user_id, "action": "CREATE_SALE", "entity_type": "sale",
+                    "entity_id": sale_ids[row["idempotency_key"]],
+                    "details": {"invoice": row["invoice_number"], "total": row["total_amount"], "offline_key": row["idempotency_key"]},
+                }
+                for row, _ in accepted
+            ])
+        inventory_service.check_low_stock_items(db, changed, tenant_id, commit=False)
+
+        for row, _ in accepted:
+            recorded[row["idempotency_key"]] = {
+                "sale_id": sale_ids[row["idempotency_key"]], "invoice_number": row["invoice_number"], "total": row["total_amount"],
+            }
+    db.commit()
+
+    for result in results:
+        if result["status"] != "rejected":
+            result.update(recorded[result["idempotency_key"]])
+    return results
+
 def create_purchase(db: Session, purchase_in: PurchaseCreate, tenant_id: int, user_id: Optional[int] = None, invoice_number: Optional[str] = None):
     # Fetch global settings for tax rate
     settings = db.query(Settings).first()
@@ -126,7 +320,7 @@ def create_purchase(db: Session, purchase_in: PurchaseCreate, tenant_id: int, us
     
     # Generate invoice number if not provided
     if not invoice_number:
-        invoice_number = f"PO-{int(datetime.datetime.utcnow().timestamp())}"
+        invoice_number = numbering_service.next_number(db, tenant_id, "purchase")
 
     new_purchase = Purchase(
         invoice_number=invoice_number,
@@ -156,14 +350,15 @@ def create_purchase(db: Session, purchase_in: PurchaseCreate, tenant_id: int, us
         
         # NOTE: Stock is NOT updated here anymore. It happens on "Receive".
 
-    db.commit()
-    db.refresh(new_purchase)
-    
     if user_id:
         activity_log_service.log_action(
             db, tenant_id, user_id, "CREATE_PURCHASE", "purchase", new_purchase.id, 
-            {"invoice": new_purchase.invoice_number, "total": new_purchase.total_amount}
+            {"invoice": new_purchase.invoice_number, "total": new_purchase.total_amount},
+            commit=False
         )
+
+    db.commit()
+    db.refresh(new_purchase)
         
     return new_purchase
 
@@ -174,27 +369,47 @@ def receive_purchase(db: Session, purchase_id: int, tenant_id: int, user_id: Opt
     
     if purchase.status == "Received":
         return purchase # Already received
+
+    # Claim the purchase atomically: of two concurrent receives only one gets
+    # the row back, so stock and the supplier balance are added once
+    claimed = db.execute(
+        update(Purchase)
+        .where(Purchase.id == purchase.id, Purchase.status != "Received")
+        .values(status="Received")
+        .returning(Purchase.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if claimed is None:
+        db.rollback()
+        db.refresh(purchase)
+        return purchase
         
     # Update Stock
+    deltas = {}
     for p_item in purchase.items:
-        db_item = db.query(Item).filter(Item.id == p_item.item_id).first()
-        if db_item:
-            db_item.quantity += p_item.quantity
-            db_item.purchase_price = p_item.price
+        deltas[p_item.item_id] = deltas.get(p_item.item_id, 0) + p_item.quantity
+    inventory_service.adjust_stock(db, tenant_id, deltas)
+    if purchase.items:
+        db.execute(
+            update(Item)
+            .where(Item.tenant_id == tenant_id, Item.id.in_(list(deltas)))
+            .values(purchase_price=case({p_item.item_id: p_item.price for p_item in purchase.items}, value=Item.id))
+            .execution_options(synchronize_session=False)
+        )
             
     # Update Supplier Balance
-    if purchase.supplier:
-        purchase.supplier.outstanding_balance += purchase.total_amount
+    if purchase.supplier_id:
+        add_to_balance(db, Supplier, purchase.supplier_id, purchase.total_amount)
         
-    purchase.status = "Received"
-    db.commit()
-    db.refresh(purchase)
-    
     if user_id:
         activity_log_service.log_action(
             db, tenant_id, user_id, "RECEIVE_PURCHASE", "purchase", purchase.id, 
-            {"invoice": purchase.invoice_number, "status": "Received"}
+            {"invoice": purchase.invoice_number, "status": "Received"},
+            commit=False
         )
+
+    db.commit()
+    db.refresh(purchase)
         
     return purchase
 
@@ -204,31 +419,37 @@ def record_payment(db: Session, purchase_id: int, amount: float, payment_method:
         # Raise exception or return None
         return None
         
-    purchase.amount_paid += amount
-    purchase.payment_method = payment_method
+    # amount_paid and the status derived from it move in one statement, so
+    # concurrent part-payments all count
+    paid = func.coalesce(Purchase.amount_paid, 0) + amount
+    values = {
+        "amount_paid": paid,
+        "payment_status": case((paid >= Purchase.total_amount, "paid"), else_="partial"),
+        "payment_method": payment_method,
+    }
     if account_id:
-        purchase.payment_account_id = account_id
-    
-    purchase.payment_status = "paid" if purchase.amount_paid >= purchase.total_amount else "partial"
+        values["payment_account_id"] = account_id
+    db.execute(
+        update(Purchase).where(Purchase.id == purchase.id).values(values)
+        .execution_options(synchronize_session=False)
+    )
         
     # Update Supplier Balance
-    supplier = db.query(Supplier).filter(Supplier.id == purchase.supplier_id).first()
-    if supplier:
-        supplier.outstanding_balance -= amount
+    if purchase.supplier_id:
+        add_to_balance(db, Supplier, purchase.supplier_id, -amount)
         
     # Update Payment Account Balance (if account_id provided)
     if account_id:
-        payment_account = db.query(PaymentAccount).filter(PaymentAccount.id == account_id, PaymentAccount.tenant_id == tenant_id).first()
-        if payment_account:
-            payment_account.balance -= amount # Payment is an outflow from our account
-    
-    db.commit()
-    db.refresh(purchase)
+        add_to_balance(db, PaymentAccount, account_id, -amount, tenant_id, column="balance") # Payment is an outflow from our account
     
     if user_id:
         activity_log_service.log_action(
             db, tenant_id, user_id, "PAY_PURCHASE", "purchase", purchase.id, 
-            {"invoice": purchase.invoice_number, "amount": amount, "method": payment_method}
+            {"invoice": purchase.invoice_number, "amount": amount, "method": payment_method},
+            commit=False
         )
+
+    db.commit()
+    db.refresh(purchase)
         
     return purchase
@@ -1,8 +1,209 @@
+import ipaddress
+import queue
+import threading
+import time
+from collections import Counter
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, timedelta
-from app.models.security import SecurityEvent, BlockedIP, SecurityEventType
-from typing import Optional, Dict
+from sqlalchemy import func, insert, select, delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
+from app.core.ip_blocklist import ip_blocklist, in_force
+from app.models.security import SecurityEvent, SecurityEventRollup, BlockedIP
+from typing import Optional, Dict, List
+
+
+# --------------------------------------------------
+# Hourly rollups (event type x severity x source network)
+# --------------------------------------------------
+_ROLLUP_KEY = ["hour", "event_type", "severity", "ip_prefix"]
+
+
+def ip_prefix(ip_address: Optional[str]) -> str:
+    """
+    The /24 (IPv4) or /64 (IPv6) network an address belongs to; anything
+    unparseable is kept as-is.
+    """
+    try:
+        address = ipaddress.ip_address((ip_address or "").strip())
+    except ValueError:
+        return ip_address or "unknown"
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+def _hour(created_at: Optional[datetime]) -> datetime:
+    created_at = created_at or datetime.utcnow()
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at.replace(minute=0, second=0, microsecond=0)
+
+
+def rollup_counts(rows: List[dict]) -> Counter:
+    counts = Counter()
+    for row in rows:
+        event_type = getattr(row["event_type"], "value", row["event_type"])
+        counts[(_hour(row.get("created_at")), event_type, row.get("severity") or "medium", ip_prefix(row.get("ip_address")))] += 1
+    return counts
+
+
+def apply_rollups(db: Session, counts: Counter):
+    """
+    Add `counts` to the hourly rollups inside the caller's transaction.
+    """
+    if not counts:
+        return
+    rows = [dict(zip(_ROLLUP_KEY, key), count=n) for key, n in counts.items()]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(SecurityEventRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=_ROLLUP_KEY,
+            set_={"count": SecurityEventRollup.count + stmt.excluded["count"]},
+        )
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        updated = db.execute(
+            update(SecurityEventRollup)
+            .where(*(getattr(SecurityEventRollup, k) == row[k] for k in _ROLLUP_KEY))
+            .values(count=SecurityEventRollup.count + row["count"])
+        )
+        if updated.rowcount == 0:
+            db.execute(insert(SecurityEventRollup), [row])
+
+
+def purge_raw_events(db: Session, retention_days: int, batch_size: int = 5000) -> int:
+    """
+    Delete raw events older than `retention_days` in small batches so the
+    table is never locked for long. Rollups are kept.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        ids = select(SecurityEvent.id).where(SecurityEvent.created_at < cutoff).limit(batch_size)
+        result = db.execute(delete(SecurityEvent).where(SecurityEvent.id.in_(ids.scalar_subquery())))
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+class SecurityEventWriter:
+    """
+    Persists security events off the request path. Events are queued and a
+    daemon thread inserts them in batches of up to SECURITY_EVENT_BATCH_SIZE
+    every SECURITY_EVENT_FLUSH_SECONDS, so an attack burst costs one
+    multi-row INSERT per interval instead of a commit per request.
+    """
+    def __init__(self, flush_seconds: float, batch_size: int, max_queue: int = 50000):
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._write_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    def enqueue(self, row: dict):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Never block a request on the audit trail
+            self.dropped += 1
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="security-event-writer", daemon=True)
+                self._thread.start()
+
+    def _drain(self) -> List[dict]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[dict]):
+        from app.core.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            db.execute(insert(SecurityEvent), batch)
+            apply_rollups(db, rollup_counts(batch))
+            db.commit()
+            self.written += len(batch)
+        except Exception as e:
+            db.rollback()
+            self.dropped += len(batch)
+            print(f"❌ Failed to write {len(batch)} security events: {e}")
+        finally:
+            db.close()
+
+    def start(self):
+        self._ensure_started()
+
+    def _run(self):
+        # A burst accumulates for one interval and goes out as one batch
+        next_purge = time.monotonic()
+        while not self._stopping.wait(self.flush_seconds):
+            self.flush()
+            if settings.SECURITY_EVENT_RETENTION_DAYS > 0 and time.monotonic() >= next_purge:
+                next_purge = time.monotonic() + settings.SECURITY_EVENT_PURGE_INTERVAL_SECONDS
+                self._purge()
+
+    def _purge(self):
+        from app.core.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            deleted = purge_raw_events(db, settings.SECURITY_EVENT_RETENTION_DAYS)
+            if deleted:
+                print(f"🧹 Purged {deleted} security events older than {settings.SECURITY_EVENT_RETENTION_DAYS} days")
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️  Security event purge failed: {e}")
+        finally:
+            db.close()
+
+    def flush(self):
+        """
+        Write everything queued so far (shutdown, tests). Waits for a batch
+        the background thread is writing, so nothing is still in flight after.
+        """
+        with self._write_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    return
+                self._write(batch)
+
+    def stop(self):
+        """
+        Stop the background thread and write what is queued. The writer can
+        be started again (the next lifespan in the same process).
+        """
+        with self._start_lock:
+            thread = self._thread
+            self._stopping.set()
+            if thread is not None:
+                thread.join()
+            self.flush()
+            self._thread = None
+            self._stopping.clear()
+
+
+security_event_writer = SecurityEventWriter(settings.SECURITY_EVENT_FLUSH_SECONDS, settings.SECURITY_EVENT_BATCH_SIZE)
+
 
 class SecurityService:
     @staticmethod
@@ -22,25 +223,30 @@ class SecurityService:
             user_email=user_email
         )
         db.add(event)
+        apply_rollups(db, rollup_counts([{"event_type": event_type, "ip_address": ip_address, "severity": severity}]))
         db.commit()
         db.refresh(event)
         return event
 
     @staticmethod
-    def is_ip_blocked(db: Session, ip_address: str) -> bool:
-        blocked = db.query(BlockedIP).filter(
-            BlockedIP.ip_address == ip_address,
-            BlockedIP.is_active == True
-        ).first()
-        
-        if blocked:
-            if blocked.expires_at and blocked.expires_at < datetime.utcnow():
-                # Ban expired
-                blocked.is_active = False
-                db.commit()
-                return False
-            return True
-        return False
+    def record_event(
+        event_type: str,
+        ip_address: str,
+        description: str = None,
+        severity: str = "medium",
+        user_email: str = None
+    ):
+        """
+        Non-blocking log_event: queued for the batched background writer.
+        """
+        security_event_writer.enqueue({
+            "event_type": event_type,
+            "ip_address": ip_address,
+            "description": description,
+            "severity": severity,
+            "user_email": user_email,
+            "created_at": datetime.utcnow(),
+        })
 
     @staticmethod
     def ban_ip(
@@ -60,6 +266,7 @@ class SecurityService:
             existing.blocked_at = datetime.utcnow()
             db.commit()
             db.refresh(existing)
+            ip_blocklist.add(ip_address, expires_at)
             return existing
         
         blocked = BlockedIP(
@@ -70,46 +277,54 @@ class SecurityService:
         db.add(blocked)
         db.commit()
         db.refresh(blocked)
+        ip_blocklist.add(ip_address, expires_at)
         return blocked
 
     @staticmethod
-    def check_login_failures(db: Session, ip_address: str) -> bool:
+    def get_stats(db: Session) -> Dict:
         """
-        Check if IP has exceeded failed login threshold in the last 5 minutes.
-        Returns True if IP was just banned, False otherwise.
+        Totals from the hourly rollups; "last 24h" covers the current hour and
+        the 23 before it.
         """
-        THRESHOLD = 5
-        WINDOW_MINUTES = 5
-        
-        since = datetime.utcnow() - timedelta(minutes=WINDOW_MINUTES)
-        
-        count = db.query(SecurityEvent).filter(
-            SecurityEvent.ip_address == ip_address,
-            SecurityEvent.event_type == SecurityEventType.LOGIN_FAILED,
-            SecurityEvent.created_at >= since
-        ).count()
-        
-        if count >= THRESHOLD:
-            SecurityService.ban_ip(
-                db, 
-                ip_address, 
-                reason=f"Too many failed login attempts ({count} in {WINDOW_MINUTES}m)"
-            )
-            return True
-        return False
+        since = _hour(datetime.utcnow()) - timedelta(hours=23)
+        total_events = db.query(func.coalesce(func.sum(SecurityEventRollup.count), 0)).scalar()
+        blocked_ips = db.query(BlockedIP).filter(in_force()).count()
+        by_type = dict(
+            db.query(SecurityEventRollup.event_type, func.sum(SecurityEventRollup.count))
+            .filter(SecurityEventRollup.hour >= since)
+            .group_by(SecurityEventRollup.event_type)
+            .all()
+        )
+        by_severity = dict(
+            db.query(SecurityEventRollup.severity, func.sum(SecurityEventRollup.count))
+            .filter(SecurityEventRollup.hour >= since)
+            .group_by(SecurityEventRollup.severity)
+            .all()
+        )
 
-    @staticmethod
-    def get_stats(db: Session) -> Dict:
-        total_events = db.query(SecurityEvent).count()
-        blocked_ips = db.query(BlockedIP).filter(BlockedIP.is_active == True).count()
-        recent_attacks = db.query(SecurityEvent).filter(
-            SecurityEvent.created_at >= datetime.utcnow() - timedelta(hours=24)
-        ).count()
-        
         return {
             "total_events": total_events,
             "active_bans": blocked_ips,
-            "attacks_last_24h": recent_attacks
+            "attacks_last_24h": sum(by_type.values()),
+            "last_24h_by_type": by_type,
+            "last_24h_by_severity": by_severity,
         }
 
+    @staticmethod
+    def get_top_offenders(db: Session, hours: int = 24, limit: int = 10) -> List[Dict]:
+        """
+        Source networks with the most events in the last `hours`, from the rollups.
+        """
+        since = _hour(datetime.utcnow()) - timedelta(hours=max(hours, 1) - 1)
+        events = func.sum(SecurityEventRollup.count).label("events")
+        rows = (
+            db.query(SecurityEventRollup.ip_prefix, events, func.max(SecurityEventRollup.hour).label("last_seen"))
+            .filter(SecurityEventRollup.hour >= since)
+            .group_by(SecurityEventRollup.ip_prefix)
+            .order_by(events.desc())
+            .limit(limit)
+            .all()
+        )
+        return [{"ip_prefix": prefix, "events": count, "last_seen_hour": last_seen} for prefix, count, last_seen in rows]
+
 security_service = SecurityService()
@@ -5,15 +5,24 @@ from app.core.config import settings
 from datetime import timedelta
 from app.services import auth_service
 from app.schemas import auth as schemas
+from app.core.http_client import outbound_http
+from app.core.jwks import JWKSCache
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# Google's signing keys, refreshed per their Cache-Control max-age
+google_jwks = JWKSCache(settings.GOOGLE_JWKS_URL)
+
 
 class SocialAuthService:
     def verify_google_token(self, token: str):
-        import httpx
+        # ID tokens (JWTs) are verified locally against Google's cached keys;
+        # access tokens still need the userinfo endpoint
+        if token.count(".") == 2:
+            return self._verify_google_id_token(token)
         try:
-            # Verify Access Token and get User Info from Google
-            # Frontend sends an Access Token, not an ID Token
-            response = httpx.get(
-                "https://www.googleapis.com/oauth2/v3/userinfo", 
+            response = outbound_http.get(
+                settings.GOOGLE_USERINFO_URL,
                 headers={"Authorization": f"Bearer {token}"}
             )
             
@@ -36,12 +45,65 @@ class SocialAuthService:
             print(f"Google Auth Error: {e}")
             return None
 
+    def _verify_google_id_token(self, token: str):
+        from jose import jwt, JWTError
+
+        if not settings.GOOGLE_CLIENT_ID:
+            # Without an audience to check, any app's Google token would be accepted
+            print("Google Auth Failed: GOOGLE_CLIENT_ID is not configured")
+            return None
+        try:
+            key = google_jwks.key_for(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                print("Google Auth Failed: unknown signing key")
+                return None
+            claims = jwt.decode(
+                token, key, algorithms=["RS256"],
+                audience=settings.GOOGLE_CLIENT_ID, issuer=GOOGLE_ISSUERS,
+                options={"verify_at_hash": False, "leeway": 60},
+            )
+        except JWTError as e:
+            print(f"Google Auth Failed: {e}")
+            return None
+        if not claims.get("email") or not claims.get("email_verified"):
+            print("Google Auth Failed: email missing or unverified")
+            return None
+        return {
+            "email": claims["email"],
+            "sub": claims["sub"],
+            "name": claims.get("name", claims["email"].split("@")[0])
+        }
+
     def verify_github_token(self, token: str):
-        # MOCK: In production, exchange code for token, then get user info
-        if token.startswith("mock_github_code_"):
-            username = token.replace("mock_github_code_", "")
-            return {"email": f"{username}@github.com", "id": f"github_id_{username}", "name": "GitHub User"}
-        return None
+        if not settings.GITHUB_CLIENT_ID:
+            # MOCK: local development without a GitHub OAuth app
+            if token.startswith("mock_github_code_"):
+                username = token.replace("mock_github_code_", "")
+                return {"email": f"{username}@github.com", "id": f"github_id_{username}", "name": "GitHub User"}
+            return None
+        try:
+            # Codes are single-use: the exchange is never retried once sent
+            response = outbound_http.post(
+                settings.GITHUB_OAUTH_URL,
+                data={"client_id": settings.GITHUB_CLIENT_ID, "client_secret": settings.GITHUB_CLIENT_SECRET, "code": token},
+                headers={"Accept": "application/json"},
+            )
+            access_token = response.json().get("access_token") if response.status_code == 200 else None
+            if not access_token:
+                print(f"GitHub Auth Failed: {response.text}")
+                return None
+
+            headers = {"Authorization": f"Bearer {access_token}", "Accept": "application/vnd.github+json"}
+            user = outbound_http.get(f"{settings.GITHUB_API_URL}/user", headers=headers).json()
+            emails = outbound_http.get(f"{settings.GITHUB_API_URL}/user/emails", headers=headers).json()
+            email = next((e["email"] for e in emails if e.get("primary") and e.get("verified")), None)
+            if not email:
+                print("GitHub Auth Failed: no verified primary email")
+                return None
+            return {"email": email, "id": str(user["id"]), "name": user.get("name") or user.get("login") or email.split("@")[0]}
+        except Exception as e:
+            print(f"GitHub Auth Error: {e}")
+            return None
 
     def get_or_create_social_user(self, db: Session, email: str, social_id: str, provider: str, full_name: str):
         user = db.query(User).filter(User.email == email).first()
@@ -1,14 +1,18 @@
-import stripe
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+def _stripe():
+    """Import and configure the Stripe SDK on first use instead of at import."""
+    import stripe
+    stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+    return stripe
 
 class StripeService:
     @staticmethod
     def create_customer(email: str, name: str):
+        stripe = _stripe()
         try:
             customer = stripe.Customer.create(
                 email=email,
@@ -21,6 +25,7 @@ class StripeService:
 
     @staticmethod
     def create_checkout_session(customer_id: str, price_id: str, success_url: str, cancel_url: str):
+        stripe = _stripe()
         try:
             session = stripe.checkout.Session.create(
                 customer=customer_id,
@@ -40,6 +45,7 @@ class StripeService:
 
     @staticmethod
     def create_portal_session(customer_id: str, return_url: str):
+        stripe = _stripe()
         try:
             session = stripe.billing_portal.Session.create(
                 customer=customer_id,
@@ -52,6 +58,7 @@ class StripeService:
 
     @staticmethod
     def get_subscription(subscription_id: str):
+        stripe = _stripe()
         try:
             return stripe.Subscription.retrieve(subscription_id)
         except Exception as e:
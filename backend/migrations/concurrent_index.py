@@ -0,0 +1,29 @@
+"""Index builds on live tables, shared by the migrate_* scripts"""
+
+from sqlalchemy import text
+
+
+def build_index(conn, name: str, table: str, columns: str, unique: bool = False):
+    """
+    CREATE [UNIQUE] INDEX IF NOT EXISTS on an AUTOCOMMIT connection; on
+    Postgres CONCURRENTLY, so the table stays writable while it builds.
+
+    A concurrent build that fails (or is killed) leaves an INVALID index
+    that IF NOT EXISTS would skip forever. A leftover one is dropped and
+    rebuilt, and a failed build is dropped before the error is re-raised,
+    so the migration is not recorded as applied.
+    """
+    is_postgres = conn.dialect.name == "postgresql"
+    concurrently = "CONCURRENTLY " if is_postgres else ""
+    if is_postgres and conn.execute(
+        text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+    ).scalar():
+        print(f"⚠️ Dropping invalid index {name} left by an earlier build.")
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    try:
+        conn.execute(text(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({columns})"
+        ))
+    except Exception:
+        conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {name}"))
+        raise
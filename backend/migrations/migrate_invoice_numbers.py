@@ -0,0 +1,71 @@
+from sqlalchemy import text, inspect
+from app.core.database import engine
+from app.models.sequence import DocumentSequence
+
+# (index, table): invoice numbers unique per tenant
+UNIQUE_INDEXES = [
+    ("ux_sales_tenant_id_invoice_number", "sales"),
+    ("ux_purchases_tenant_id_invoice_number", "purchases"),
+]
+
+def _renumber_duplicates(conn, table: str) -> int:
+    """
+    Numbers issued twice by the old timestamp/count() generators: the
+    oldest row keeps the number, later ones get "-2", "-3", ... appended.
+    Rows without a tenant never collide in the index (NULLs are distinct).
+    """
+    groups = conn.execute(text(
+        f"SELECT tenant_id, invoice_number FROM {table} WHERE tenant_id IS NOT NULL AND invoice_number IS NOT NULL "
+        "GROUP BY tenant_id, invoice_number HAVING COUNT(*) > 1"
+    )).all()
+    renumbered = 0
+    for tenant_id, number in groups:
+        ids = conn.execute(text(
+            f"SELECT id FROM {table} WHERE tenant_id = :tenant_id AND invoice_number = :number ORDER BY id"
+        ), {"tenant_id": tenant_id, "number": number}).scalars().all()
+        suffix = 2
+        for row_id in ids[1:]:
+            while conn.execute(text(
+                f"SELECT 1 FROM {table} WHERE tenant_id = :tenant_id AND invoice_number = :number"
+            ), {"tenant_id": tenant_id, "number": f"{number}-{suffix}"}).first():
+                suffix += 1
+            conn.execute(text(f"UPDATE {table} SET invoice_number = :number WHERE id = :id"),
+                         {"number": f"{number}-{suffix}", "id": row_id})
+            suffix += 1
+            renumbered += 1
+    return renumbered
+
+def migrate_invoice_numbers():
+    print("🔄 Checking for document_sequences and unique invoice numbers...")
+    DocumentSequence.__table__.create(bind=engine, checkfirst=True)
+    existing_tables = inspect(engine).get_table_names()
+    tables = [(index, table) for index, table in UNIQUE_INDEXES if table in existing_tables]
+
+    with engine.connect() as conn:
+        try:
+            for index, table in tables:
+                renumbered = _renumber_duplicates(conn, table)
+                if renumbered:
+                    print(f"⚠️ Renumbered {renumbered} duplicate invoice number(s) in {table}.")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Migration failed: {e}")
+            raise
+
+    # CONCURRENTLY keeps sales/purchases writable while the index builds,
+    # but can't run inside a transaction
+    concurrently = "CONCURRENTLY " if engine.dialect.name == "postgresql" else ""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for index, table in tables:
+            try:
+                conn.execute(text(f"CREATE UNIQUE INDEX {concurrently}IF NOT EXISTS {index} ON {table} (tenant_id, invoice_number)"))
+            except Exception as e:
+                # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would skip next time
+                conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {index}"))
+                print(f"❌ Migration failed: {e}")
+                raise
+    print("✅ Unique index on (tenant_id, invoice_number) ready.")
+
+if __name__ == "__main__":
+    migrate_invoice_numbers()
@@ -0,0 +1,31 @@
+from sqlalchemy import text, inspect
+from app.core.database import engine
+from migrations.concurrent_index import build_index
+
+def migrate_sales_idempotency():
+    print("🔄 Checking for sales.idempotency_key...")
+    inspector = inspect(engine)
+    existing_columns = [col["name"] for col in inspector.get_columns("sales")]
+
+    with engine.connect() as conn:
+        try:
+            if "idempotency_key" not in existing_columns:
+                conn.execute(text("ALTER TABLE sales ADD COLUMN idempotency_key VARCHAR(64)"))
+                conn.commit()
+                print("✅ 'idempotency_key' column added.")
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            raise
+
+    # CONCURRENTLY keeps sales writable while the index builds, but can't run inside a transaction.
+    # NULL keys (sales rung up online) never collide.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            build_index(conn, "ux_sales_tenant_id_idempotency_key", "sales", "tenant_id, idempotency_key", unique=True)
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            raise
+    print("✅ Unique index on (tenant_id, idempotency_key) ready.")
+
+if __name__ == "__main__":
+    migrate_sales_idempotency()
@@ -0,0 +1,42 @@
+from collections import Counter
+from sqlalchemy import inspect, select
+from app.core.database import engine, SessionLocal
+from app.models.security import SecurityEvent, SecurityEventRollup
+from app.services.security_service import apply_rollups, rollup_counts
+
+BATCH_SIZE = 10000
+
+def migrate_security_rollups():
+    """
+    Create security_event_rollups and backfill it from the existing raw events.
+    """
+    print("🔄 Checking for security_event_rollups...")
+    SecurityEventRollup.__table__.create(bind=engine, checkfirst=True)
+    if "security_events" not in inspect(engine).get_table_names():
+        print("✅ No security_events table, nothing to backfill.")
+        return
+
+    db = SessionLocal()
+    try:
+        if db.query(SecurityEventRollup.id).first() is not None:
+            print("✅ Rollups already populated.")
+            return
+        stmt = select(
+            SecurityEvent.event_type, SecurityEvent.severity, SecurityEvent.ip_address, SecurityEvent.created_at
+        ).execution_options(yield_per=BATCH_SIZE)
+        counts, events = Counter(), 0
+        for partition in db.execute(stmt).partitions():
+            counts.update(rollup_counts([row._asdict() for row in partition]))
+            events += len(partition)
+        apply_rollups(db, counts)
+        db.commit()
+        print(f"✅ Backfilled {len(counts)} rollup buckets from {events} events.")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_security_rollups()
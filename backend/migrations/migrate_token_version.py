@@ -0,0 +1,22 @@
+from sqlalchemy import text, inspect
+from app.core.database import engine
+
+def migrate_token_version():
+    print("🔄 Checking for users.token_version...")
+    inspector = inspect(engine)
+    existing_columns = [col["name"] for col in inspector.get_columns("users")]
+    if "token_version" in existing_columns:
+        print("✅ 'token_version' column already exists.")
+        return
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0"))
+            conn.commit()
+            print("✅ 'token_version' column added.")
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    migrate_token_version()
@@ -0,0 +1,79 @@
+"""
+Requests/sec for a read endpoint on the sync (threadpool) vs async session path.
+
+Both variants call the same dashboard stats function against DATABASE_URL;
+only the session dependency differs. Point DATABASE_URL at a seeded Postgres
+for representative numbers:
+
+    python scripts/bench_async_reads.py --concurrency 200 --requests 4000 --tenant-id 1
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+from fastapi import FastAPI, Depends
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database
+from app.api.v1.endpoints.dashboard import get_stats
+
+
+def build_app(tenant_id: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_stats(db: Session = Depends(database.get_db)):
+        return get_stats(db, tenant_id)
+
+    @app.get("/async")
+    async def async_stats(db: AsyncSession = Depends(database.get_async_db)):
+        return await database.run_sync(db, get_stats, tenant_id)
+
+    return app
+
+
+async def run(app: FastAPI, path: str, concurrency: int, total: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    remaining = iter(range(total))
+    errors = 0
+
+    async def client_loop(client):
+        nonlocal errors
+        for _ in remaining:
+            response = await client.get(path)
+            if response.status_code != 200:
+                errors += 1
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)  # warm up pools
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    if errors:
+        print(f"  {path}: {errors} non-200 responses")
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--tenant-id", type=int, default=1)
+    args = parser.parse_args()
+
+    app = build_app(args.tenant_id)
+    print(f"{args.requests} requests, {args.concurrency} concurrent clients, {database.engine.url.get_backend_name()}")
+    for label, path in (("sync  (threadpool + Session)", "/sync"), ("async (AsyncSession)", "/async")):
+        rps = asyncio.run(run(app, path, args.concurrency, args.requests))
+        print(f"  {label:<30} {rps:>8.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Lookup latency of the in-memory blocked-IP list.
+
+Builds a list of --entries single addresses plus a set of CIDR ranges of
+mixed prefix lengths, then times is_blocked() for blocked addresses, range
+hits and clean traffic. Fails if any case exceeds --budget-ns per lookup:
+
+    python scripts/bench_ip_blocklist.py --entries 100000 --budget-ns 1000
+"""
+import argparse
+import ipaddress
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SECRET_KEY", "bench-ip-blocklist")
+
+from app.core.ip_blocklist import IPBlocklist
+
+
+def random_ipv4(rng):
+    return str(ipaddress.IPv4Address(rng.getrandbits(32)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--ranges", type=int, default=2000, help="CIDR ranges (/16 to /30, plus some IPv6)")
+    parser.add_argument("--lookups", type=int, default=200000)
+    parser.add_argument("--budget-ns", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    singles = [random_ipv4(rng) for _ in range(args.entries)]
+    ranges = [f"{random_ipv4(rng)}/{rng.choice([16, 20, 24, 28, 30])}" for _ in range(args.ranges)]
+    ranges += [f"2001:db8:{i:x}::/48" for i in range(100)]
+
+    blocklist = IPBlocklist(refresh_seconds=3600)
+    blocklist.load([(ip, None) for ip in singles + ranges])
+
+    inside_range = str(ipaddress.ip_network(ranges[0], strict=False)[1])
+    clean = random_ipv4(rng)
+    while blocklist.is_blocked(clean):
+        clean = random_ipv4(rng)
+    cases = {
+        "blocked address": singles[len(singles) // 2],
+        "inside blocked range": inside_range,
+        "clean ipv4": clean,
+        "blocked ipv6 range": "2001:db8:5::1",
+        "clean ipv6": "2001:db9::1",
+    }
+
+    print(f"{blocklist.size} entries ({len(singles)} addresses, {len(ranges)} ranges)")
+    failures = []
+    for label, ip in cases.items():
+        seconds = min(timeit.repeat(lambda: blocklist.is_blocked(ip), number=args.lookups, repeat=5))
+        ns = seconds / args.lookups * 1e9
+        print(f"  {label:<22} {ip:<18} blocked={blocklist.is_blocked(ip)!s:<5} {ns:>7.0f} ns/lookup")
+        if ns > args.budget_ns:
+            failures.append(label)
+
+    if failures:
+        print(f"\nFAIL: over {args.budget_ns:.0f} ns budget: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nPASS")
+
+
+if __name__ == "__main__":
+    main()
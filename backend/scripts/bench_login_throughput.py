@@ -0,0 +1,154 @@
+"""
+Login throughput next to a concurrent read workload, with bcrypt hashed
+inline on request threads (PASSWORD_HASH_WORKERS=0, the old behaviour)
+versus on the dedicated hashing pool.
+
+Each mode runs the real app in a fresh interpreter over httpx's ASGI
+transport, against a new SQLite file: `--logins` clients sign in
+continuously while `--readers` clients list inventory. Reported are
+logins/s, 503s from a saturated hashing queue, and read latency:
+
+    python scripts/bench_login_throughput.py --logins 64 --readers 8 --seconds 10 --rounds 12
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def seed(users: int):
+    from app.core import database
+    from app.core.security import get_password_hash, create_access_token
+    from app.models import Tenant, User, InventoryItem
+
+    database.Base.metadata.create_all(bind=database.engine)
+    db = database.SessionLocal()
+    tenant = Tenant(name="Bench", plan="pro")
+    db.add(tenant)
+    db.flush()
+    hashed = get_password_hash("bench-password")
+    accounts = [User(email=f"user{i}@example.com", hashed_password=hashed, role="admin", tenant_id=tenant.id) for i in range(users)]
+    db.add_all(accounts)
+    db.add_all([InventoryItem(name=f"Item {i}", quantity=100, selling_price=10, tenant_id=tenant.id) for i in range(50)])
+    db.commit()
+    token = create_access_token(accounts[0].id)
+    emails = [u.email for u in accounts]
+    db.close()
+    return emails, token
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+async def workload(args, emails, token):
+    import httpx
+    from app.main import app
+
+    deadline = time.perf_counter() + args.seconds
+    results = {"logins": 0, "rejected": 0, "login_errors": 0, "reads": 0}
+    read_latencies = []
+    transport = httpx.ASGITransport(app=app)
+
+    async def login_loop(client, n):
+        i = n
+        while time.perf_counter() < deadline:
+            response = await client.post(
+                "/api/v1/auth/login/access-token",
+                data={"username": emails[i % len(emails)], "password": "bench-password"},
+            )
+            i += args.logins
+            if response.status_code == 200:
+                results["logins"] += 1
+            elif response.status_code == 503:
+                results["rejected"] += 1
+                await asyncio.sleep(0.05)
+            else:
+                results["login_errors"] += 1
+
+    async def read_loop(client):
+        headers = {"Authorization": f"Bearer {token}"}
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.get("/api/v1/inventory/", headers=headers)
+            if response.status_code == 200:
+                read_latencies.append(time.perf_counter() - started)
+                results["reads"] += 1
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(login_loop(client, n) for n in range(args.logins)),
+            *(read_loop(client) for _ in range(args.readers)),
+        )
+        results["elapsed"] = time.perf_counter() - started
+    results["read_p50_ms"] = percentile(read_latencies, 50) * 1000
+    results["read_p99_ms"] = percentile(read_latencies, 99) * 1000
+    return results
+
+
+def child(args):
+    sys.path.insert(0, BACKEND_ROOT)
+    emails, token = seed(args.logins)
+    print(json.dumps(asyncio.run(workload(args, emails, token))))
+
+
+def run_mode(workers: int, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "SECRET_KEY": env.get("SECRET_KEY", "bench"),
+            "FAST_BOOT": "true",
+            "BCRYPT_ROUNDS": str(args.rounds),
+            "PASSWORD_HASH_WORKERS": str(workers),
+            "PASSWORD_HASH_QUEUE_SIZE": str(args.queue),
+            # Measure hashing, not the limiters in front of it
+            "RATE_LIMIT_ENABLED": "false",
+            "RATELIMIT_ENABLED": "false",
+        })
+        result = subprocess.run(
+            [sys.executable, __file__, "--child", *sys.argv[1:]],
+            cwd=BACKEND_ROOT, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            print(result.stderr[-4000:])
+            sys.exit(result.returncode)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64, help="concurrent clients signing in")
+    parser.add_argument("--readers", type=int, default=8, help="concurrent clients listing inventory")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS")
+    parser.add_argument("--workers", type=int, default=4, help="PASSWORD_HASH_WORKERS for the pooled run")
+    parser.add_argument("--queue", type=int, default=64, help="PASSWORD_HASH_QUEUE_SIZE for the pooled run")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    print(f"{args.logins} login clients, {args.readers} readers, {args.seconds:.0f}s, bcrypt cost {args.rounds}")
+    for label, workers in (("inline", 0), (f"pool ({args.workers} workers)", args.workers)):
+        r = run_mode(workers, args)
+        print(
+            f"  {label:<18} {r['logins'] / r['elapsed']:>6.1f} logins/s  {r['rejected']:>5} x 503  "
+            f"{r['reads'] / r['elapsed']:>7.1f} reads/s  read p50 {r['read_p50_ms']:.1f}ms  p99 {r['read_p99_ms']:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Per-request overhead of RequestInspectionMiddleware.
+
+Drives the middleware directly with ASGI messages around a no-op app, so the
+numbers are the inspection cost alone (no routing, auth or DB). Each case is
+compared with the same request through a pass-through middleware; the extra
+time must stay under --budget-us:
+
+    python scripts/bench_request_inspection.py --requests 20000 --budget-us 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SECRET_KEY", "bench-request-inspection")
+os.environ.setdefault("REQUEST_INSPECTION_MODE", "log")
+
+from app.core import request_inspection
+from app.core.request_inspection import RequestInspectionMiddleware
+
+
+def sale_body(lines: int) -> bytes:
+    return json.dumps({
+        "customer_id": 12,
+        "payment_method": "Cash",
+        "discount": 0,
+        "items": [{"item_id": 1000 + i, "quantity": 2, "discount": 0} for i in range(lines)],
+    }).encode()
+
+
+def product_body() -> bytes:
+    return json.dumps({
+        "name": "O'Neill cotton shirt (blue)",
+        "description": "Soft cotton; machine wash cold. Fits true to size - see the size chart.",
+        "barcode": "8901234567890",
+        "selling_price": 24.99,
+        "purchase_price": 11.5,
+        "quantity": 40,
+        "min_stock": 5,
+        "category_id": 3,
+    }).encode()
+
+
+CASES = [
+    ("GET list with filters", "GET", "/api/v1/inventory/", b"skip=0&limit=100&search=shirt&category_id=3", b""),
+    ("GET report date range", "GET", "/api/v1/reports/sales", b"start_date=2024-01-01&end_date=2024-12-31", b""),
+    ("POST sale, 5 lines", "POST", "/api/v1/sales/sales", b"", sale_body(5)),
+    ("POST sale, 50 lines", "POST", "/api/v1/sales/sales", b"", sale_body(50)),
+    ("POST product", "POST", "/api/v1/inventory/", b"", product_body()),
+]
+
+
+async def noop_app(scope, receive, send):
+    # Consume the body like a real endpoint would
+    more = scope["method"] != "GET"
+    while more:
+        message = await receive()
+        more = message.get("more_body", False)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+class PassThrough:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+
+async def time_case(middleware, method, path, query, body, requests):
+    scope = {
+        "type": "http", "method": method, "path": path, "query_string": query,
+        "headers": [(b"content-type", b"application/json")] if body else [], "client": ("10.0.0.1", 5000),
+    }
+    message = {"type": "http.request", "body": body, "more_body": False}
+
+    async def receive():
+        return message
+
+    async def send(_message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await middleware(scope, receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def run(args):
+    inspected = RequestInspectionMiddleware(noop_app)
+    baseline = PassThrough(noop_app)
+    failures = []
+    print(f"mode={request_inspection.settings.REQUEST_INSPECTION_MODE}, {args.requests} requests per case")
+    for label, method, path, query, body in CASES:
+        await time_case(inspected, method, path, query, body, 1000)  # warm up
+        base = min([await time_case(baseline, method, path, query, body, args.requests) for _ in range(3)])
+        with_inspection = min([await time_case(inspected, method, path, query, body, args.requests) for _ in range(3)])
+        overhead = with_inspection - base
+        print(f"  {label:<24} {len(body):>5} B body  {overhead:>6.1f} us overhead")
+        if overhead > args.budget_us:
+            failures.append(label)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--budget-us", type=float, default=50.0)
+    args = parser.parse_args()
+
+    failures = asyncio.run(run(args))
+    if failures:
+        print(f"\nFAIL: over {args.budget_us:.0f} us: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nPASS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Sale latency (p50/p99) and commits per sale for sales_service.create_sale,
+on this tree and optionally on a baseline git revision.
+
+Each tree runs in a fresh interpreter against a new SQLite file (default
+journal mode, so every COMMIT is a real fsync) seeded with 3 admins and
+200 items, a share of them close to their minimum stock so baskets keep
+raising low-stock alerts. Sales are rung up one after another with a
+user id, so the activity log entry is part of every sale:
+
+    python scripts/bench_sale_latency.py --sales 500 --lines 10 --baseline <rev>
+
+The baseline is checked out into a temporary git worktree and removed
+afterwards.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+def child(args):
+    sys.path.insert(0, os.getcwd())
+    from sqlalchemy import event
+    from app.core import database
+    from app.models import Tenant, User, InventoryItem, Customer
+    from app.services import sales_service
+
+    database.Base.metadata.create_all(bind=database.engine)
+    db = database.SessionLocal()
+    tenant = Tenant(name="Bench", plan="pro")
+    db.add(tenant)
+    db.flush()
+    admins = [User(email=f"admin{i}@example.com", hashed_password="x", role="admin", tenant_id=tenant.id) for i in range(3)]
+    db.add_all(admins)
+    low_every = max(int(1 / args.low_share), 1) if args.low_share > 0 else 0
+    db.add_all([
+        InventoryItem(name=f"Item {i}", barcode=f"B-{i}", selling_price=10, purchase_price=5, tenant_id=tenant.id,
+                      min_stock=5, quantity=1 if low_every and i % low_every == 0 else 10 ** 6)
+        for i in range(200)
+    ])
+    customer = Customer(name="Walk-in", phone="0", tenant_id=tenant.id)
+    db.add(customer)
+    db.commit()
+    ids = [row.id for row in db.query(InventoryItem.id).order_by(InventoryItem.id)]
+    tenant_id, user_id, customer_id = tenant.id, admins[0].id, customer.id
+    db.close()
+
+    commits = [0]
+
+    @event.listens_for(database.engine, "commit")
+    def _count_commit(conn):
+        commits[0] += 1
+
+    latencies = []
+    for n in range(args.warmup + args.sales):
+        lines = [{"item_id": ids[(n * args.lines + k) % len(ids)], "quantity": 1, "discount": 0} for k in range(args.lines)]
+        sale_in = sales_service.SaleCreate(items=lines, customer_id=customer_id, payment_method="Credit")
+        if n == args.warmup:
+            commits[0] = 0
+        db = database.SessionLocal()
+        started = time.perf_counter()
+        sales_service.create_sale(db, sale_in, tenant_id, user_id)
+        elapsed = time.perf_counter() - started
+        db.close()
+        if n >= args.warmup:
+            latencies.append(elapsed)
+    print(json.dumps({
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "commits_per_sale": commits[0] / args.sales,
+    }))
+
+
+def run_tree(tree, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "SECRET_KEY": env.get("SECRET_KEY", "bench"),
+            "FAST_BOOT": "true",
+        })
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", *sys.argv[1:]],
+            cwd=tree, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            print(result.stderr[-4000:])
+            sys.exit(result.returncode)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sales", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=10, help="lines per basket")
+    parser.add_argument("--low-share", type=float, default=0.1, help="share of items at/below min stock")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--baseline", help="git revision to compare against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    print(f"{args.sales} sales, {args.lines} lines each, {args.low_share:.0%} of items low on stock")
+    runs = []
+    if args.baseline:
+        worktree = tempfile.mkdtemp(prefix="bench-baseline-")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, args.baseline],
+                       cwd=BACKEND_ROOT, check=True, capture_output=True)
+        try:
+            prefix = subprocess.run(["git", "rev-parse", "--show-prefix"], cwd=BACKEND_ROOT,
+                                    check=True, capture_output=True, text=True).stdout.strip()
+            runs.append((f"baseline {args.baseline}", run_tree(os.path.join(worktree, prefix), args)))
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=BACKEND_ROOT, capture_output=True)
+    runs.append(("this tree", run_tree(BACKEND_ROOT, args)))
+
+    for label, r in runs:
+        print(f"  {label:<20} p50 {r['p50_ms']:6.2f}ms  p99 {r['p99_ms']:6.2f}ms  {r['commits_per_sale']:.1f} commits/sale")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+create_sale throughput on SQLite with and without SQLITE_HIGH_PERFORMANCE.
+
+Each mode runs in a fresh interpreter (the engine is configured at import)
+against a new database file. Cashier threads ring up sales while reader
+threads poll dashboard stats, the way a busy edge store behaves; use
+--processes to mimic several uvicorn workers on one file:
+
+    python scripts/bench_sqlite_sales.py --processes 4 --cashiers 4 --sales 50 --readers 2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def seed():
+    from app.core import database
+    from app.models import Tenant, User, InventoryItem
+    from app.models import activity_log  # noqa: F401  (not in app.models; create_sale logs to it)
+
+    database.Base.metadata.create_all(bind=database.engine)
+    db = database.SessionLocal()
+    tenant = Tenant(name="Bench", plan="pro")
+    db.add(tenant)
+    db.flush()
+    user = User(email="bench@example.com", hashed_password="x", role="admin", tenant_id=tenant.id)
+    db.add(user)
+    items = [InventoryItem(name=f"Item {i}", quantity=10 ** 6, selling_price=10, tenant_id=tenant.id) for i in range(20)]
+    db.add_all(items)
+    db.commit()
+    ids = (tenant.id, user.id, [item.id for item in items])
+    db.close()
+    return ids
+
+
+def run_worker(args, ids, readers: int):
+    """
+    One worker process: `args.cashiers` threads calling create_sale, plus `readers`
+    threads polling dashboard stats until the cashiers finish.
+    """
+    sys.path.insert(0, BACKEND_ROOT)
+    from sqlalchemy.exc import OperationalError
+    from app.core import database
+    from app.services import sales_service
+    from app.api.v1.endpoints.dashboard import get_stats
+
+    tenant_id, user_id, item_ids = ids
+    results = {"sales": 0, "locked": 0, "errors": 0, "reads": 0}
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def cashier(n):
+        for i in range(args.sales):
+            sale_in = sales_service.SaleCreate(items=[
+                {"item_id": item_ids[(n + i + k) % len(item_ids)], "quantity": 1} for k in range(args.basket)
+            ])
+            session = database.SessionLocal()
+            try:
+                sales_service.create_sale(session, sale_in, tenant_id, user_id)
+                key = "sales"
+            except OperationalError as e:
+                session.rollback()
+                key = "locked" if "locked" in str(e) else "errors"
+            except Exception:
+                session.rollback()
+                key = "errors"
+            finally:
+                session.close()
+            with lock:
+                results[key] += 1
+
+    def reader():
+        while not done.is_set():
+            session = database.ReadSessionLocal()
+            try:
+                get_stats(session, tenant_id)
+                with lock:
+                    results["reads"] += 1
+            except OperationalError:
+                pass
+            finally:
+                session.close()
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    cashier_threads = [threading.Thread(target=cashier, args=(n,)) for n in range(args.cashiers)]
+    started = time.perf_counter()
+    for t in reader_threads + cashier_threads:
+        t.start()
+    for t in cashier_threads:
+        t.join()
+    results["elapsed"] = time.perf_counter() - started
+    done.set()
+    for t in reader_threads:
+        t.join()
+    return results
+
+
+def child(args):
+    sys.path.insert(0, BACKEND_ROOT)
+    ids = seed()
+
+    if args.processes == 1:
+        per_worker = [run_worker(args, ids, args.readers)]
+    else:
+        # Separate interpreters, like several uvicorn workers sharing one database file
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(args.processes) as pool:
+            per_worker = pool.starmap(run_worker, [(args, ids, args.readers if n == 0 else 0) for n in range(args.processes)])
+
+    # Workers time themselves so interpreter start-up isn't counted
+    results = {key: sum(r[key] for r in per_worker) for key in ("sales", "locked", "errors", "reads")}
+    results["elapsed"] = max(r["elapsed"] for r in per_worker)
+    print(json.dumps(results))
+
+
+def run_mode(high_performance: bool, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "SECRET_KEY": env.get("SECRET_KEY", "bench"),
+            "SQLITE_HIGH_PERFORMANCE": "true" if high_performance else "false",
+        })
+        env.pop("DATABASE_READ_URL", None)
+        result = subprocess.run(
+            [sys.executable, __file__, "--child", *sys.argv[1:]],
+            cwd=BACKEND_ROOT, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            print(result.stderr[-4000:])
+            sys.exit(result.returncode)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=1, help="worker processes sharing the database file")
+    parser.add_argument("--cashiers", type=int, default=8, help="threads per process calling create_sale")
+    parser.add_argument("--sales", type=int, default=50, help="sales per cashier")
+    parser.add_argument("--basket", type=int, default=3, help="line items per sale")
+    parser.add_argument("--readers", type=int, default=2, help="threads polling dashboard stats meanwhile")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    attempted = args.processes * args.cashiers * args.sales
+    print(f"{args.processes} process(es) x {args.cashiers} cashiers x {args.sales} sales ({args.basket} lines), {args.readers} readers")
+    for label, high_performance in (("default", False), ("high-performance", True)):
+        r = run_mode(high_performance, args)
+        print(
+            f"  {label:<17} {r['sales'] / r['elapsed']:>7.1f} sales/s   "
+            f"{r['sales']}/{attempted} ok, {r['locked']} 'database is locked', {r['errors']} other errors, "
+            f"{r['reads'] / r['elapsed']:.1f} reads/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
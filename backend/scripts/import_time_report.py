@@ -0,0 +1,100 @@
+"""
+Import-time report for worker cold start.
+
+Imports app.main in a fresh interpreter with `-X importtime` and prints the
+most expensive modules plus peak RSS. Exits non-zero when a budget is
+exceeded or a heavy optional dependency is imported eagerly, so it can run
+in CI:
+
+    python scripts/import_time_report.py --budget-ms 2500 --max-rss-mb 250
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Must only be imported on first use (see report_service, ai_service, pdf services, billing)
+LAZY_MODULES = ["pandas", "prophet", "reportlab", "qrcode", "stripe", "openpyxl"]
+
+CHILD_CODE = (
+    "import resource, app.main; "
+    "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+
+def run_import():
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///./import_report.db")
+    env.setdefault("SECRET_KEY", "import-time-report")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_CODE],
+        cwd=BACKEND_ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-4000:])
+        sys.exit(result.returncode)
+    return result.stderr, int(result.stdout.strip().splitlines()[-1])
+
+
+def parse(stderr: str):
+    """
+    Returns [(module, self_us, cumulative_us, depth)] from -X importtime output.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=25, help="number of modules to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if total import time exceeds this")
+    parser.add_argument("--max-rss-mb", type=float, default=None, help="fail if peak RSS after import exceeds this")
+    args = parser.parse_args()
+
+    stderr, maxrss = run_import()
+    rows = parse(stderr)
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss_mb = maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+    total_ms = sum(cum for _, _, cum, depth in rows if depth == 0) / 1000
+
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    print(f"Total import time: {total_ms:.0f} ms   Peak RSS: {rss_mb:.1f} MB   Modules: {len(rows)}\n")
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    for name, self_us, cum_us, _ in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{cum_us / 1000:>14.1f}  {self_us / 1000:>8.1f}  {name}")
+
+    print(f"\n{'self ms':>14}  package")
+    for package, self_us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>14.1f}  {package}")
+
+    failures = []
+    imported = {name for name, _, _, _ in rows}
+    eager = [m for m in LAZY_MODULES if m in imported]
+    if eager:
+        failures.append(f"heavy modules imported at startup: {', '.join(eager)}")
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+    if args.max_rss_mb is not None and rss_mb > args.max_rss_mb:
+        failures.append(f"peak RSS {rss_mb:.1f} MB exceeds budget {args.max_rss_mb:.1f} MB")
+
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nPASS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Concurrency check for stock and balance updates (inventory_service.adjust_stock,
+balance_service.add_to_balance).
+
+50 threads act as POS terminals ringing up sales of the same SKUs against
+one customer and one payment account, then receive the same purchase and
+pay the same purchase. Every total must come out exact: no lost updates.
+With require_stock, the last units of an item are sold exactly once and
+stock never goes negative.
+
+For comparison, the old ORM read-modify-write (`item.quantity -= n`) is
+run the same way and the updates it loses are reported.
+
+Uses a throwaway SQLite file unless --url points at another database
+(e.g. a scratch Postgres):
+
+    python verify_concurrent_stock.py --threads 50 --sales 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--threads", type=int, default=50)
+parser.add_argument("--sales", type=int, default=20, help="sales per thread")
+parser.add_argument("--url", help="database URL (default: a temporary SQLite file)")
+args = parser.parse_args()
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = args.url or f"sqlite:///{os.path.join(_tmp.name, 'concurrent_stock.db')}"
+os.environ.setdefault("SECRET_KEY", "verify-concurrent-stock")
+# Enough connections for every terminal at once
+os.environ.setdefault("DB_POOL_SIZE", str(args.threads))
+
+from sqlalchemy import event
+
+from app.core.database import engine, Base, SessionLocal
+from app.models import Tenant, InventoryItem, Customer, Supplier, Purchase, PurchaseItem
+from app.models.payment_account import PaymentAccount
+from app.services import sales_service, inventory_service
+
+failures = []
+
+if engine.dialect.name == "sqlite":
+    # pysqlite's 5s default is too short for 50 writers queued on one file lock
+    @event.listens_for(engine, "connect")
+    def _busy_timeout(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA busy_timeout=60000")
+
+
+def check(label, ok, detail=""):
+    print(f"{'PASS' if ok else 'FAIL'}: {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tenant = Tenant(name="Concurrent Stock", plan="pro")
+    db.add(tenant)
+    db.flush()
+    items = [
+        InventoryItem(name=f"SKU {i}", barcode=f"CS-{tenant.id}-{i}", quantity=100000, min_stock=0,
+                      selling_price=10, purchase_price=5, tenant_id=tenant.id)
+        for i in range(4)
+    ]
+    scarce = InventoryItem(name="Last units", barcode=f"CS-{tenant.id}-scarce", quantity=100, min_stock=0,
+                           selling_price=10, purchase_price=5, tenant_id=tenant.id)
+    customer = Customer(name="Account customer", phone="0", outstanding_balance=0, tenant_id=tenant.id)
+    supplier = Supplier(name="Supplier", outstanding_balance=0, tenant_id=tenant.id)
+    account = PaymentAccount(name="Till", balance=0, tenant_id=tenant.id)
+    db.add_all(items + [scarce, customer, supplier, account])
+    db.flush()
+    purchase = Purchase(invoice_number=f"PO-CS-{tenant.id}", supplier_id=supplier.id, total_amount=500,
+                        amount_paid=0, status="Ordered", tenant_id=tenant.id)
+    db.add(purchase)
+    db.flush()
+    db.add(PurchaseItem(purchase_id=purchase.id, item_id=items[3].id, quantity=50, price=4, total=200))
+    db.commit()
+    ids = {
+        "tenant": tenant.id, "items": [i.id for i in items], "scarce": scarce.id, "customer": customer.id,
+        "supplier": supplier.id, "account": account.id, "purchase": purchase.id,
+    }
+    db.close()
+    return ids
+
+
+def run_threads(target):
+    errors = []
+
+    def wrapped(n):
+        try:
+            target(n)
+        except Exception as e:  # collected and reported as a failure
+            errors.append(e)
+
+    threads = [threading.Thread(target=wrapped, args=(n,)) for n in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return errors
+
+
+def main():
+    ids = seed()
+    tenant_id = ids["tenant"]
+    a, b, c, _ = ids["items"]
+
+    # 1. Every terminal sells the same SKUs; half on credit, half into the till
+    def terminal(n):
+        for _ in range(args.sales):
+            db = SessionLocal()
+            try:
+                credit = n % 2 == 0
+                sales_service.create_sale(db, sales_service.SaleCreate(
+                    items=[{"item_id": a, "quantity": 2}, {"item_id": b, "quantity": 1}, {"item_id": a, "quantity": 1}],
+                    customer_id=ids["customer"], payment_method="Credit" if credit else "Cash",
+                    account_id=None if credit else ids["account"],
+                ), tenant_id)
+            finally:
+                db.close()
+
+    errors = run_threads(terminal)
+    sales = args.threads * args.sales
+    db = SessionLocal()
+    qty_a, qty_b = db.get(InventoryItem, a).quantity, db.get(InventoryItem, b).quantity
+    balance = db.get(Customer, ids["customer"]).outstanding_balance
+    till = db.get(PaymentAccount, ids["account"]).balance
+    db.close()
+    check(f"{sales} concurrent sales: no errors", not errors, repr(errors[:3]))
+    check("Stock decrements all applied", qty_a == 100000 - 3 * sales and qty_b == 100000 - sales,
+          f"SKU A {qty_a} (want {100000 - 3 * sales}), SKU B {qty_b} (want {100000 - sales})")
+    credit_sales = sum(args.sales for n in range(args.threads) if n % 2 == 0)
+    check("Customer balance increments all applied", round(balance, 2) == credit_sales * 40.0,
+          f"{balance} (want {credit_sales * 40.0})")
+    check("Payment account increments all applied", round(till, 2) == (sales - credit_sales) * 40.0,
+          f"{till} (want {(sales - credit_sales) * 40.0})")
+
+    # 2. 100 units left, 5 attempts per terminal: exactly 100 succeed
+    sold, rejected, lock = [0], [0], threading.Lock()
+
+    def scarce_terminal(n):
+        for _ in range(5):
+            db = SessionLocal()
+            try:
+                sales_service.create_sale(db, sales_service.SaleCreate(items=[{"item_id": ids["scarce"], "quantity": 1}]),
+                                          tenant_id, require_stock=True)
+                with lock:
+                    sold[0] += 1
+            except inventory_service.InsufficientStock:
+                with lock:
+                    rejected[0] += 1
+            finally:
+                db.close()
+
+    errors = run_threads(scarce_terminal)
+    db = SessionLocal()
+    left = db.get(InventoryItem, ids["scarce"]).quantity
+    db.close()
+    check("Insufficient-stock guard sells the last units exactly once",
+          not errors and sold[0] == 100 and left == 0,
+          f"{sold[0]} sold, {rejected[0]} rejected, {left} left, {len(errors)} errors")
+
+    # 3. Every terminal receives the same purchase: stock and supplier balance added once
+    def receiver(n):
+        db = SessionLocal()
+        try:
+            sales_service.receive_purchase(db, ids["purchase"], tenant_id)
+        finally:
+            db.close()
+
+    errors = run_threads(receiver)
+    db = SessionLocal()
+    qty_c = db.get(InventoryItem, ids["items"][3]).quantity
+    supplier_balance = db.get(Supplier, ids["supplier"]).outstanding_balance
+    db.close()
+    check("Concurrent receives add stock once", not errors and qty_c == 100050, f"{qty_c} (want 100050)")
+    check("Concurrent receives add the supplier balance once", supplier_balance == 500, f"{supplier_balance}")
+
+    # 4. Every terminal pays 1.00 against the same purchase
+    def payer(n):
+        db = SessionLocal()
+        try:
+            sales_service.record_payment(db, ids["purchase"], 1.0, "Cash", tenant_id, account_id=ids["account"])
+        finally:
+            db.close()
+
+    errors = run_threads(payer)
+    db = SessionLocal()
+    purchase = db.get(Purchase, ids["purchase"])
+    paid, status = purchase.amount_paid, purchase.payment_status
+    supplier_balance = db.get(Supplier, ids["supplier"]).outstanding_balance
+    db.close()
+    check("Concurrent part-payments all counted", not errors and paid == args.threads and status == "partial",
+          f"amount_paid {paid}, status {status}")
+    check("Supplier balance reduced by every payment", supplier_balance == 500 - args.threads, f"{supplier_balance}")
+
+    # For comparison: the old ORM read-modify-write
+    def legacy(n):
+        for _ in range(args.sales):
+            db = SessionLocal()
+            try:
+                item = db.get(InventoryItem, c)
+                item.quantity -= 1
+                db.commit()
+            finally:
+                db.close()
+
+    errors = run_threads(legacy)
+    db = SessionLocal()
+    lost = db.get(InventoryItem, c).quantity - (100000 - sales)
+    db.close()
+    print(f"INFO: ORM read-modify-write lost {lost} of {sales} decrements"
+          f"{f' and raised {len(errors)} errors' if errors else ''}")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll concurrency checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Checks for the invoice / purchase order number allocator (app/services/numbering_service.py).
+
+Against a throwaway SQLite database (or --url, e.g. a scratch Postgres):
+
+- 50 threads ring up sales and purchases at once: every number is unique,
+  in the configured format, and only one lease round-trip is made per
+  DOCUMENT_NUMBER_BLOCK_SIZE numbers
+- an offline-POS batch takes its numbers in one allocation
+- a tenant's series continues after matching numbers already on file
+  (the old count()-based PO numbers) and restarts in a new year
+- a restarted worker, a second worker and a lease rolled back in one
+  worker and re-leased by another never reissue a committed number
+- migrate_invoice_numbers renumbers existing duplicates before adding the
+  unique index
+
+    python verify_invoice_numbers.py --threads 50 --sales 20
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import threading
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--threads", type=int, default=50)
+parser.add_argument("--sales", type=int, default=20, help="sales per thread")
+parser.add_argument("--url", help="database URL (default: a temporary SQLite file)")
+args = parser.parse_args()
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = args.url or f"sqlite:///{os.path.join(_tmp.name, 'invoice_numbers.db')}"
+os.environ.setdefault("SECRET_KEY", "verify-invoice-numbers")
+os.environ.setdefault("DB_POOL_SIZE", str(args.threads))
+
+import re
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import engine, Base, SessionLocal
+from app.models import Tenant, InventoryItem, Supplier, Sale, Purchase
+from app.schemas.purchase import PurchaseCreate
+from app.services import sales_service
+from app.services.numbering_service import NumberingService, numbering_service
+from migrations.migrate_invoice_numbers import migrate_invoice_numbers
+
+failures = []
+leases = [0]
+
+if engine.dialect.name == "sqlite":
+    # pysqlite's 5s default is too short for 50 writers queued on one file lock
+    @event.listens_for(engine, "connect")
+    def _busy_timeout(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA busy_timeout=60000")
+
+
+# Any engine: off SQLite, leases run on the allocator's own engine
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_leases(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("UPDATE DOCUMENT_SEQUENCES"):
+        leases[0] += 1
+
+
+def check(label, ok, detail=""):
+    print(f"{'PASS' if ok else 'FAIL'}: {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def seed(name):
+    db = SessionLocal()
+    tenant = Tenant(name=name, plan="pro")
+    db.add(tenant)
+    db.flush()
+    item = InventoryItem(name="SKU", barcode=f"IN-{tenant.id}", quantity=10 ** 6, min_stock=0,
+                         selling_price=10, purchase_price=5, tenant_id=tenant.id)
+    supplier = Supplier(name="Supplier", outstanding_balance=0, tenant_id=tenant.id)
+    db.add_all([item, supplier])
+    db.commit()
+    ids = tenant.id, item.id, supplier.id
+    db.close()
+    return ids
+
+
+def run_threads(target):
+    errors = []
+
+    def wrapped(n):
+        try:
+            target(n)
+        except Exception as e:  # collected and reported as a failure
+            errors.append(e)
+
+    threads = [threading.Thread(target=wrapped, args=(n,)) for n in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return errors
+
+
+def numbers(model, tenant_id):
+    db = SessionLocal()
+    found = [row.invoice_number for row in db.query(model.invoice_number).filter(model.tenant_id == tenant_id)]
+    db.close()
+    return found
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    year = datetime.datetime.now().year
+    block = settings.DOCUMENT_NUMBER_BLOCK_SIZE
+
+    # 1. Concurrent sales and purchases
+    tenant_id, item_id, supplier_id = seed("Busy Store")
+
+    def terminal(n):
+        for k in range(args.sales):
+            db = SessionLocal()
+            try:
+                if k % 5 == 4:
+                    sales_service.create_purchase(db, PurchaseCreate(
+                        supplier_id=supplier_id, items=[{"item_id": item_id, "quantity": 1, "price": 5}]
+                    ), tenant_id)
+                else:
+                    sales_service.create_sale(db, sales_service.SaleCreate(items=[{"item_id": item_id, "quantity": 1}]), tenant_id)
+            finally:
+                db.close()
+
+    leases[0] = 0
+    errors = run_threads(terminal)
+    sale_numbers, po_numbers = numbers(Sale, tenant_id), numbers(Purchase, tenant_id)
+    total = args.threads * args.sales
+    check(f"{total} concurrent sales and purchases: no errors", not errors, repr(errors[:3]))
+    check("Every invoice number unique", len(sale_numbers) == len(set(sale_numbers)) == total - total // 5,
+          f"{len(set(sale_numbers))} distinct of {len(sale_numbers)}")
+    check("Every PO number unique", len(po_numbers) == len(set(po_numbers)) == total // 5,
+          f"{len(set(po_numbers))} distinct of {len(po_numbers)}")
+    check("Numbers in the configured formats",
+          all(re.fullmatch(rf"INV-{year}-\d{{6}}", n) for n in sale_numbers)
+          and all(re.fullmatch(rf"PO-{year}-\d{{4}}", n) for n in po_numbers), f"{sale_numbers[0]}, {po_numbers[0]}")
+    # Per series, one lease per block; a thread may lease early while another's block awaits its commit
+    blocks = -(-(total - total // 5) // block) + -(-(total // 5) // block)
+    check("One lease per block of numbers", leases[0] <= blocks + args.threads,
+          f"{leases[0]} lease UPDATEs for {total} numbers, {blocks} blocks of {block}")
+
+    # 2. Offline batch: one allocation for the whole batch
+    leases[0] = 0
+    db = SessionLocal()
+    results = sales_service.ingest_sales_batch(db, [
+        sales_service.OfflineSale(idempotency_key=f"k-{n}", items=[{"item_id": item_id, "quantity": 1}]) for n in range(300)
+    ], tenant_id)
+    db.close()
+    batch_numbers = [r["invoice_number"] for r in results]
+    all_numbers = numbers(Sale, tenant_id)
+    check("Batch numbers unique and increasing", len(set(all_numbers)) == len(all_numbers)
+          and batch_numbers == sorted(batch_numbers), f"{batch_numbers[0]} .. {batch_numbers[-1]}")
+    check("Batch took one lease", leases[0] <= 1, f"{leases[0]} lease UPDATEs")
+
+    # 3. Existing numbers and yearly reset
+    tenant_id, item_id, supplier_id = seed("Old Numbers")
+    db = SessionLocal()
+    db.add_all([Purchase(invoice_number=f"PO-{year}-{n:04d}", supplier_id=supplier_id, tenant_id=tenant_id) for n in (1, 2, 7)]
+               + [Purchase(invoice_number=f"PO-{year - 1}-0042", supplier_id=supplier_id, tenant_id=tenant_id)])
+    db.commit()
+    purchase = sales_service.create_purchase(db, PurchaseCreate(
+        supplier_id=supplier_id, items=[{"item_id": item_id, "quantity": 1, "price": 5}]
+    ), tenant_id)
+    check("Series continues after numbers on file", purchase.invoice_number == f"PO-{year}-0008", purchase.invoice_number)
+    next_year = datetime.datetime(year + 1, 1, 1, 0, 5)
+    first = numbering_service.allocate(db, tenant_id, "sale", 1, now=next_year)[0]
+    check("Yearly reset", first == f"INV-{year + 1}-000001", first)
+    db.commit()
+    db.close()
+
+    # 4. Restart, a second worker, a lease rolled back and re-leased elsewhere
+    tenant_id, _, _ = seed("Workers")
+    worker_a, worker_b = NumberingService(), NumberingService()
+    committed = []
+
+    def allocate(worker, count, commit=True):
+        db = SessionLocal()
+        try:
+            issued = worker.allocate(db, tenant_id, "sale", count)
+            if commit:
+                db.commit()
+                committed.extend(issued)
+            else:
+                db.rollback()
+            return issued
+        finally:
+            db.close()
+
+    allocate(worker_a, 3)
+    allocate(worker_b, 3)
+    allocate(worker_a, block)
+    worker_a.clear()  # restarted: the rest of its block becomes a gap
+    allocate(worker_a, 2)
+    allocate(worker_b, block)
+    check("Workers and restarts never reissue a number", len(committed) == len(set(committed)),
+          f"{len(committed)} issued, {len(set(committed))} distinct")
+
+    # Fresh workers: B leases a block and rolls back (on SQLite the lease is
+    # undone with it), then A leases the same range; B must not hand out the
+    # rest of its rolled-back block
+    tenant_id, _, _ = seed("Rollback")
+    worker_a, worker_b = NumberingService(), NumberingService()
+    committed.clear()
+    rolled_back = allocate(worker_b, 1, commit=False)
+    allocate(worker_a, 1)
+    allocate(worker_b, block - 1)
+    allocate(worker_a, block - 1)
+    check("A lease rolled back in one worker and re-leased by another is not reissued",
+          len(committed) == len(set(committed)),
+          f"{len(committed)} issued, {len(set(committed))} distinct; rolled back {rolled_back[0]}")
+
+    # 5. Migration: duplicates from the old generators
+    tenant_id, _, _ = seed("Duplicates")
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ux_sales_tenant_id_invoice_number"))
+    db = SessionLocal()
+    db.add_all([Sale(invoice_number=n, tenant_id=tenant_id, total_amount=1)
+                for n in ("INV-1760000000", "INV-1760000000", "INV-1760000000", "INV-1760000000-2", "INV-1760000001")])
+    db.commit()
+    db.close()
+    migrate_invoice_numbers()
+    dupes = sorted(numbers(Sale, tenant_id))
+    check("Migration renumbers duplicates", dupes == sorted(
+        ["INV-1760000000", "INV-1760000000-3", "INV-1760000000-4", "INV-1760000000-2", "INV-1760000001"]), ", ".join(dupes))
+    db = SessionLocal()
+    try:
+        db.add(Sale(invoice_number="INV-1760000001", tenant_id=tenant_id, total_amount=1))
+        db.commit()
+        check("Unique index rejects a repeated number", False)
+    except IntegrityError:
+        db.rollback()
+        check("Unique index rejects a repeated number", True)
+    finally:
+        db.close()
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll invoice number checks passed")
+
+
+if __name__ == "__main__":
+    main()
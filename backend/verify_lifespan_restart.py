@@ -0,0 +1,92 @@
+"""
+Checks that the app survives a second lifespan in the same process (a
+second `with TestClient(app)` block, an embedded server restart).
+
+Shutdown releases the bcrypt executor and stops the security event
+writer; the next startup must bring both back. Each lifespan logs in with
+a real password, registers a new account and records a security event,
+against a throwaway SQLite database:
+
+    python verify_lifespan_restart.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'lifespan_restart.db')}"
+os.environ.setdefault("SECRET_KEY", "verify-lifespan-restart")
+os.environ["FAST_BOOT"] = "true"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["RATELIMIT_ENABLED"] = "false"
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.database import engine, Base, SessionLocal
+from app.core.security import get_password_hash
+from app.models import Tenant, User
+from app.models.security import SecurityEvent
+from app.services.security_service import security_service
+from app.main import app
+
+failures = []
+
+
+def check(label, ok, detail=""):
+    print(f"{'PASS' if ok else 'FAIL'}: {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tenant = Tenant(name="Restart Store", plan="pro")
+    db.add(tenant)
+    db.flush()
+    db.add(User(email="till@example.com", hashed_password=get_password_hash("correct horse"), role="admin",
+                tenant_id=tenant.id, is_active=True))
+    db.commit()
+    db.close()
+
+
+def events(marker):
+    db = SessionLocal()
+    count = db.query(SecurityEvent).filter(SecurityEvent.description == marker).count()
+    db.close()
+    return count
+
+
+def main():
+    seed()
+    for run in (1, 2):
+        with TestClient(app) as client:
+            response = client.post("/api/v1/auth/login/access-token",
+                                   data={"username": "till@example.com", "password": "correct horse"})
+            check(f"Lifespan {run}: login", response.status_code == 200, f"status {response.status_code}")
+            response = client.post("/api/v1/auth/register", json={
+                "email": f"new{run}@example.com", "password": "battery staple", "full_name": "New Owner",
+                "tenant_name": f"New Store {run}",
+            })
+            check(f"Lifespan {run}: register", response.status_code == 200, f"status {response.status_code}")
+            response = client.post("/api/v1/auth/login/access-token",
+                                   data={"username": f"new{run}@example.com", "password": "battery staple"})
+            check(f"Lifespan {run}: registered user logs in", response.status_code == 200, f"status {response.status_code}")
+
+            marker = f"lifespan {run}"
+            security_service.record_event("restart_check", "203.0.113.7", description=marker, severity="low")
+            deadline = time.monotonic() + settings.SECURITY_EVENT_FLUSH_SECONDS * 5
+            while not events(marker) and time.monotonic() < deadline:
+                time.sleep(0.1)
+            check(f"Lifespan {run}: background writer persists events", events(marker) == 1)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll lifespan restart checks passed")
+
+
+if __name__ == "__main__":
+    main()
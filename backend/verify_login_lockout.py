@@ -0,0 +1,77 @@
+"""
+Checks the per-account login lock (LOGIN_FAILURE_THRESHOLD_EMAIL).
+
+Once an email has collected its threshold of failed logins, wrong
+passwords get 429, but the owner's correct password still logs in: the
+lock must not let anyone who knows an email address lock its owner out.
+Runs against a throwaway SQLite database:
+
+    python verify_login_lockout.py
+"""
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'login_lockout.db')}"
+os.environ.setdefault("SECRET_KEY", "verify-login-lockout")
+os.environ["FAST_BOOT"] = "true"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["RATELIMIT_ENABLED"] = "false"
+# Email lock well before the per-IP ban (every TestClient request comes from one address)
+os.environ["LOGIN_FAILURE_THRESHOLD_EMAIL"] = "3"
+os.environ["LOGIN_FAILURE_THRESHOLD_IP"] = "100"
+
+from fastapi.testclient import TestClient
+
+from app.core.database import engine, Base, SessionLocal
+from app.core.security import get_password_hash
+from app.models import Tenant, User
+from app.main import app
+
+failures = []
+
+
+def check(label, ok, detail=""):
+    print(f"{'PASS' if ok else 'FAIL'}: {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tenant = Tenant(name="Lockout Store", plan="pro")
+    db.add(tenant)
+    db.flush()
+    db.add(User(email="owner@example.com", hashed_password=get_password_hash("correct horse"), role="admin",
+                tenant_id=tenant.id, is_active=True))
+    db.commit()
+    db.close()
+
+
+def login(client, password):
+    return client.post("/api/v1/auth/login/access-token",
+                       data={"username": "owner@example.com", "password": password}).status_code
+
+
+def main():
+    seed()
+    with TestClient(app) as client:
+        statuses = [login(client, f"guess {n}") for n in range(3)]
+        check("Wrong passwords below the threshold get 400", statuses == [400, 400, 400], str(statuses))
+        status = login(client, "guess 4")
+        check("Locked account: wrong password gets 429", status == 429, f"status {status}")
+        status = login(client, "correct horse")
+        check("Locked account: correct password still logs in", status == 200, f"status {status}")
+        status = login(client, "guess 5")
+        check("A successful login clears the lock", status == 400, f"status {status}")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll login lockout checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Checks for the shared outbound HTTP client (app/core/http_client.py), local
+Google ID token verification (app/core/jwks.py) and PayPal on the shared pool.
+
+Everything runs against a local mock server on 127.0.0.1 that serves a JWKS,
+Google userinfo, flaky/slow endpoints and the PayPal REST calls we use:
+
+- Keep-alive: many calls reuse one TCP connection.
+- Retries: 503s are retried with backoff for GET, not for a plain POST;
+  strict read timeouts fail fast.
+- Google: ID tokens verify locally with one JWKS fetch for many logins;
+  wrong audience/issuer, expired, tampered and unknown-key tokens are
+  rejected; opaque access tokens still go to userinfo.
+- PayPal: the OAuth token is fetched once and every POST carries a
+  PayPal-Request-Id.
+
+    python verify_outbound_http.py
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+BASE = f"http://127.0.0.1:{server.server_address[1]}"
+os.environ.update({
+    "GOOGLE_CLIENT_ID": "biztrackr-test.apps.googleusercontent.com",
+    "GOOGLE_JWKS_URL": f"{BASE}/certs",
+    "GOOGLE_USERINFO_URL": f"{BASE}/userinfo",
+    "PAYPAL_API_BASE": f"{BASE}/paypal",
+    "PAYPAL_CLIENT_ID": "paypal-client",
+    "PAYPAL_CLIENT_SECRET": "paypal-secret",
+    "OUTBOUND_HTTP_READ_TIMEOUT": "0.5",
+    "OUTBOUND_HTTP_BACKOFF_SECONDS": "0.01",
+})
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core.http_client import outbound_http
+from app.services import paypal_service
+from app.services.social_auth import social_auth_service, google_jwks
+
+failures = []
+
+
+def check(label, ok, detail=""):
+    print(f"{'PASS' if ok else 'FAIL'}: {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def _rsa_key():
+    pem = rsa.generate_private_key(public_exponent=65537, key_size=2048).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    ).decode()
+    return pem, jwk.construct(pem, "RS256").public_key().to_dict()
+
+
+SIGNING_PEM, PUBLIC_JWK = _rsa_key()
+PUBLIC_JWK.update({"kid": "key-1", "use": "sig", "alg": "RS256"})
+OTHER_PEM, _ = _rsa_key()
+
+state = {"connections": 0, "hits": {}, "flaky": 0, "paypal_request_ids": []}
+lock = threading.Lock()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with lock:
+            state["connections"] += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _route(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        path = self.path.split("?")[0]
+        with lock:
+            state["hits"][path] = state["hits"].get(path, 0) + 1
+        if path == "/ping":
+            return self._send(200, {"ok": True})
+        if path == "/flaky":
+            with lock:
+                state["flaky"] += 1
+                failing = state["flaky"] % 3 != 0
+            return self._send(503, {}, {"Retry-After": "0"}) if failing else self._send(200, {"ok": True})
+        if path == "/slow":
+            time.sleep(2)
+            try:
+                return self._send(200, {})
+            except BrokenPipeError:
+                return None  # the client gave up, as it should
+        if path == "/certs":
+            return self._send(200, {"keys": [PUBLIC_JWK]}, {"Cache-Control": "public, max-age=3600"})
+        if path == "/userinfo":
+            if self.headers.get("Authorization") != "Bearer ya29.valid-access-token":
+                return self._send(401, {"error": "invalid_token"})
+            return self._send(200, {"sub": "g-42", "email": "ada@example.com", "name": "Ada"})
+        if path == "/paypal/v1/oauth2/token":
+            return self._send(200, {"access_token": "A21-token", "expires_in": 32400})
+        if path.startswith("/paypal/v1/payments/payment"):
+            with lock:
+                state["paypal_request_ids"].append(self.headers.get("PayPal-Request-Id"))
+            if path.endswith("/execute"):
+                return self._send(200, {
+                    "id": "PAY-1", "state": "approved", "payer": {"payer_info": {"email": "buyer@example.com"}},
+                    "transactions": [{"custom": "", "amount": {"total": "99.0"}, "item_list": {"items": [{"sku": "plan_pro"}]}}],
+                })
+            return self._send(201, {"id": "PAY-1", "state": "created",
+                                    "links": [{"rel": "approval_url", "href": "https://paypal.test/approve/PAY-1"}]})
+        self._send(404, {})
+
+    do_GET = do_POST = _route
+
+
+def id_token(key=SIGNING_PEM, kid="key-1", **claims):
+    now = int(time.time())
+    body = {
+        "iss": "https://accounts.google.com", "aud": os.environ["GOOGLE_CLIENT_ID"], "sub": "g-42",
+        "email": "ada@example.com", "email_verified": True, "name": "Ada", "iat": now, "exp": now + 3600,
+    }
+    body.update(claims)
+    return jwt.encode(body, key, algorithm="RS256", headers={"kid": kid})
+
+
+def check_keep_alive():
+    before = state["connections"]
+    for _ in range(20):
+        outbound_http.get(f"{BASE}/ping")
+    check("20 calls share one keep-alive connection", state["connections"] - before == 1,
+          f"{state['connections'] - before} connection(s) opened")
+
+
+def check_retries():
+    state["flaky"] = 0
+    response = outbound_http.get(f"{BASE}/flaky")
+    check("GET retried through 503s", response.status_code == 200 and state["flaky"] == 3, f"{state['flaky']} attempts")
+    state["flaky"] = 0
+    response = outbound_http.post(f"{BASE}/flaky")
+    check("Plain POST not retried on 503", response.status_code == 503 and state["flaky"] == 1, f"{state['flaky']} attempts")
+
+    started = time.perf_counter()
+    try:
+        outbound_http.get(f"{BASE}/slow", retries=0)
+        timed_out = False
+    except Exception as e:
+        timed_out = type(e).__name__ == "ReadTimeout"
+    elapsed = time.perf_counter() - started
+    check("Read timeout fails fast", timed_out and elapsed < 1.5, f"{elapsed:.2f}s")
+
+
+def check_google():
+    google_jwks.clear()
+    fetches_before = state["hits"].get("/certs", 0)
+    results = [social_auth_service.verify_google_token(id_token()) for _ in range(50)]
+    check("Valid ID tokens verified locally", all(r and r["email"] == "ada@example.com" and r["sub"] == "g-42" for r in results))
+    check("One JWKS fetch for 50 logins", state["hits"].get("/certs", 0) - fetches_before == 1,
+          f"{state['hits'].get('/certs', 0) - fetches_before} fetch(es)")
+
+    rejected = {
+        "wrong audience": id_token(aud="someone-else.apps.googleusercontent.com"),
+        "wrong issuer": id_token(iss="https://evil.example.com"),
+        "expired": id_token(exp=int(time.time()) - 3600, iat=int(time.time()) - 7200),
+        "unverified email": id_token(email_verified=False),
+        "foreign signature": id_token(key=OTHER_PEM),
+        "unknown key id": id_token(kid="rotated-away"),
+    }
+    for label, token in rejected.items():
+        check(f"Rejects ID token: {label}", social_auth_service.verify_google_token(token) is None)
+    tampered = id_token().split(".")
+    tampered[1] = tampered[1][:-4] + ("AAAA" if tampered[1][-4:] != "AAAA" else "BBBB")
+    check("Rejects ID token: tampered payload", social_auth_service.verify_google_token(".".join(tampered)) is None)
+
+    fetches = state["hits"].get("/certs", 0)
+    for _ in range(10):
+        social_auth_service.verify_google_token(id_token(kid="rotated-away"))
+    check("Unknown kids do not hammer the JWKS endpoint", state["hits"].get("/certs", 0) == fetches,
+          f"{state['hits'].get('/certs', 0) - fetches} extra fetch(es)")
+
+    data = social_auth_service.verify_google_token("ya29.valid-access-token")
+    check("Access tokens still use userinfo", data == {"email": "ada@example.com", "sub": "g-42", "name": "Ada"})
+    check("Bad access token rejected", social_auth_service.verify_google_token("ya29.revoked") is None)
+
+
+def check_paypal():
+    order = paypal_service.create_paypal_order(7, "pro", 99.0)
+    check("PayPal order created on the shared client", order and order["approval_url"].endswith("PAY-1"), order)
+    capture = paypal_service.capture_paypal_payment(None, "PAY-1", "PAYER-1")
+    check("PayPal payment executed", capture and capture["payer_email"] == "buyer@example.com" and capture["amount"] == "99.0", capture)
+    check("PayPal OAuth token fetched once", state["hits"].get("/paypal/v1/oauth2/token") == 1)
+    ids = state["paypal_request_ids"]
+    check("Every PayPal POST carries a PayPal-Request-Id", len(ids) == 2 and all(ids), ids)
+
+
+if __name__ == "__main__":
+    server.RequestHandlerClass = MockHandler
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        check_keep_alive()
+        check_retries()
+        check_google()
+        check_paypal()
+    finally:
+        outbound_http.close()
+        server.shutdown()
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll outbound HTTP checks passed")
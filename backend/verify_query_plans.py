@@ -0,0 +1,157 @@
+"""
+Query-plan regression check for the hottest service queries.
+
+Seeds a throwaway tenant inside a transaction, runs the read paths used by the
+dashboard, reports, analytics, tax, aging, activity logs and POS, captures every
+SELECT they emit, and EXPLAINs each one. Fails (exit 1) if any statement falls
+back to a sequential scan on an indexed-by-design table. Everything is rolled
+back at the end, so it is safe to point at a dev or staging database:
+
+    python verify_query_plans.py
+"""
+import sys
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.database import engine, Base
+from app.models import (
+    Tenant, User, InventoryItem, Category, Customer, Supplier, Sale, SaleItem,
+    Purchase, PurchaseItem, Expense, ExpenseCategory, Payment, Notification,
+)
+from app.models.activity_log import ActivityLog
+from app.services import report_service, inventory_service, ai_service
+from app.services.analytics_service import analytics_service
+from app.services.activity_log_service import activity_log_service
+from app.services.notification_service import notification_service
+from app.api.v1.endpoints.dashboard import get_stats
+
+# Tiny global tables where a full scan is expected
+SCAN_ALLOWED = {"settings", "permissions"}
+
+
+def seed(db: Session):
+    tenant = Tenant(name="Query Plan Check", plan="pro")
+    db.add(tenant)
+    db.flush()
+    admin = User(email=f"plancheck-{tenant.id}@example.com", hashed_password="x", role="admin", tenant_id=tenant.id)
+    category = Category(name="Plan", tenant_id=tenant.id)
+    customer = Customer(name="Plan Customer", phone="0", tenant_id=tenant.id)
+    supplier = Supplier(name="Plan Supplier", tenant_id=tenant.id)
+    db.add_all([admin, category, customer, supplier])
+    db.flush()
+
+    now = datetime.utcnow()
+    items = [
+        InventoryItem(name=f"Item {i}", barcode=f"PLAN-{tenant.id}-{i}", quantity=i, min_stock=5,
+                      selling_price=10, purchase_price=6, tenant_id=tenant.id, category_id=category.id)
+        for i in range(50)
+    ]
+    db.add_all(items)
+    db.flush()
+    for i in range(200):
+        sale = Sale(invoice_number=f"PLAN-{i}", date=now - timedelta(days=i % 60), total_amount=100,
+                    payment_status="pending" if i % 5 == 0 else "paid", due_date=now, customer_id=customer.id,
+                    tenant_id=tenant.id)
+        db.add(sale)
+        db.flush()
+        db.add(SaleItem(sale_id=sale.id, item_id=items[i % 50].id, quantity=1, price=100, total=100))
+    purchase = Purchase(invoice_number="PLAN-PO", date=now, total_amount=50, supplier_id=supplier.id, tenant_id=tenant.id)
+    db.add(purchase)
+    db.flush()
+    db.add(PurchaseItem(purchase_id=purchase.id, item_id=items[0].id, quantity=1, price=50, total=50))
+    db.add(Expense(category=ExpenseCategory.RENT, amount=10, date=now, tenant_id=tenant.id))
+    db.add(Payment(amount=10, date=now, customer_id=customer.id, tenant_id=tenant.id))
+    db.add(ActivityLog(tenant_id=tenant.id, user_id=admin.id, action="CHECK", entity_type="plan"))
+    db.add(Notification(tenant_id=tenant.id, user_id=admin.id, title="t", message="m"))
+    db.flush()
+    return tenant.id, admin.id
+
+
+def run_hot_paths(db: Session, tenant_id: int, user_id: int):
+    start, end = datetime.utcnow() - timedelta(days=30), datetime.utcnow()
+    get_stats(db, tenant_id)
+    analytics_service.get_sales_trends(db, tenant_id, 30)
+    analytics_service.get_top_selling_items(db, tenant_id)
+    analytics_service.get_category_distribution(db, tenant_id)
+    analytics_service.get_dashboard_summary(db, tenant_id)
+    report_service.get_sales_analytics(db, tenant_id, 30)
+    report_service.get_inventory_valuation(db, tenant_id)
+    report_service.get_profit_loss_data(db, tenant_id, start, end)
+    report_service.get_inventory_category_analytics(db, tenant_id)
+    report_service.get_expense_category_analytics(db, tenant_id, start, end)
+    ai_service.get_insights(db, tenant_id)
+    activity_log_service.get_logs(db, tenant_id)
+    notification_service.get_unread_count(db, tenant_id, user_id)
+    inventory_service.get_items(db, tenant_id)
+    inventory_service.check_low_stock(db, db.query(InventoryItem.id).filter(InventoryItem.tenant_id == tenant_id).first()[0], tenant_id)
+    db.query(Sale).filter(Sale.tenant_id == tenant_id, Sale.payment_status.in_(["pending", "partial"]),
+                          Sale.due_date.isnot(None)).all()  # aging receivables
+    db.query(Purchase).filter(Purchase.tenant_id == tenant_id, Purchase.date >= start, Purchase.date < end).all()  # tax
+    db.query(SaleItem).filter(SaleItem.sale_id == 1).all()  # receipt PDF
+    db.query(PurchaseItem).filter(PurchaseItem.purchase_id == 1).all()
+    db.query(Payment).filter(Payment.tenant_id == tenant_id, Payment.date >= start).all()
+
+
+def explain(conn, statement, parameters):
+    if engine.dialect.name == "postgresql":
+        rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).all()
+        plan = "\n".join(r[0] for r in rows)
+        bad = [line.split("Seq Scan on ")[1].split()[0] for line in plan.splitlines() if "Seq Scan on " in line]
+    else:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+        plan = "\n".join(r[-1] for r in rows)
+        bad = [
+            r[-1].split()[1] for r in rows
+            if r[-1].startswith("SCAN ") and "USING" not in r[-1] and not r[-1].startswith("SCAN CONSTANT")
+        ]
+    return plan, [table for table in bad if table not in SCAN_ALLOWED]
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    captured = []
+
+    conn = engine.connect()
+    trans = conn.begin()
+    if engine.dialect.name == "postgresql":
+        # Small seeded tables would otherwise be seq-scanned on cost alone
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        if statement.lstrip().upper().startswith("SELECT") and (statement, parameters) not in captured:
+            captured.append((statement, parameters))
+
+    try:
+        db = Session(bind=conn, join_transaction_mode="create_savepoint")
+        tenant_id, user_id = seed(db)
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            run_hot_paths(db, tenant_id, user_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        failures = 0
+        for statement, parameters in captured:
+            plan, seq_scans = explain(conn, statement, parameters)
+            status = "FAIL" if seq_scans else "PASS"
+            print(f"{status}: {' '.join(statement.split())[:110]}")
+            if seq_scans:
+                failures += 1
+                print(f"      sequential scan on: {', '.join(seq_scans)}")
+                print("      " + plan.replace("\n", "\n      "))
+    finally:
+        trans.rollback()
+        conn.close()
+
+    print(f"\n{len(captured)} statements checked, {failures} with sequential scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Checks for the route-class rate limiter (app/core/ratelimit.py).
+
+- Shared storage: several processes hit one SQLite counter file and, together,
+  get exactly the budget (no N-workers-times-the-limit leak). The same check
+  runs against an in-process Redis stand-in when `fakeredis` is installed.
+- Class isolation: a user who exhausts the reports budget can still ring up
+  sales; a tenant cap stops many users of one tenant but not another tenant.
+- Headers: RateLimit-* on normal responses, 429 + Retry-After past the budget.
+
+    python verify_rate_limits.py
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.config import settings
+from app.core.ratelimit import (
+    RouteBudgets, MemoryRateLimitStorage, RedisRateLimitStorage, SQLiteRateLimitStorage, budget_for,
+)
+
+failures = []
+
+
+def check(label, ok, detail=""):
+    print(f"{'PASS' if ok else 'FAIL'}: {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def _sqlite_worker(path, hits, now, results):
+    budgets = RouteBudgets(SQLiteRateLimitStorage(path), tenant_multiplier=0)
+    results.put(sum(budgets.hit("exports", "user:1", None, now=now).allowed for _ in range(hits)))
+
+
+def check_shared_sqlite():
+    limit = budget_for("exports").amount
+    processes, hits = 4, limit
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ratelimit.db")
+        SQLiteRateLimitStorage(path)
+        now = 1_000_000.0  # same window for every process
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_sqlite_worker, args=(path, hits, now, results)) for _ in range(processes)]
+        for w in workers:
+            w.start()
+        allowed = sum(results.get(timeout=30) for _ in workers)
+        for w in workers:
+            w.join()
+    check("SQLite storage shares one budget across processes", allowed == limit,
+          f"{processes} processes x {hits} requests, {allowed} allowed, budget {limit}")
+
+
+def check_shared_redis():
+    try:
+        import fakeredis
+    except ImportError:
+        print("SKIP: Redis storage (pip install fakeredis to run against a stand-in)")
+        return
+    server = fakeredis.FakeServer()
+    limit = budget_for("reports").amount
+    workers = [RouteBudgets(RedisRateLimitStorage(client=fakeredis.FakeRedis(server=server)), 0) for _ in range(3)]
+    allowed = sum(w.hit("reports", "user:7", None, now=0.0).allowed for _ in range(limit) for w in workers)
+    check("Redis storage shares one budget across workers", allowed == limit, f"{allowed} allowed, budget {limit}")
+
+
+def check_isolation():
+    budgets = RouteBudgets(MemoryRateLimitStorage(), tenant_multiplier=2)
+    reports = budget_for("reports").amount
+    for _ in range(reports):
+        budgets.hit("reports", "user:1", 1, now=0.0)
+    over = budgets.hit("reports", "user:1", 1, now=0.0)
+    check("Reports budget enforced per user", not over.allowed and over.remaining == 0,
+          f"Retry-After {over.headers().get('Retry-After')}s")
+    check("POS writes unaffected by exhausted reports budget", budgets.hit("pos_writes", "user:1", 1, now=0.0).allowed)
+
+    # user:1 already used one tenant share; user:2 uses the second, user:3 is past the tenant cap
+    for _ in range(reports):
+        budgets.hit("reports", "user:2", 1, now=0.0)
+    tenant_capped = budgets.hit("reports", "user:3", 1, now=0.0)
+    check("Tenant cap stops further users of the same tenant", not tenant_capped.allowed,
+          f"limit reported {tenant_capped.limit}")
+    check("Other tenants keep their own budget", budgets.hit("reports", "user:4", 2, now=0.0).allowed)
+    check("Budget resets with the next window", budgets.hit("reports", "user:1", 1, now=60.0).allowed)
+
+
+def check_headers():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.core import ratelimit
+
+    ratelimit.route_budgets = RouteBudgets(MemoryRateLimitStorage(), settings.RATE_LIMIT_TENANT_MULTIPLIER)
+    client = TestClient(app)
+    limit = budget_for("exports").amount
+    responses = [client.get("/api/v1/backup/inventory") for _ in range(limit + 1)]
+    first, last = responses[0], responses[-1]
+    check("RateLimit headers on responses", first.headers.get("RateLimit-Limit") == str(limit)
+          and first.headers.get("RateLimit-Remaining") == str(limit - 1), dict(first.headers))
+    check("429 with Retry-After past the budget", last.status_code == 429 and "Retry-After" in last.headers,
+          f"status {last.status_code}")
+
+
+if __name__ == "__main__":
+    check_shared_sqlite()
+    check_shared_redis()
+    check_isolation()
+    check_headers()
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll rate limit checks passed")
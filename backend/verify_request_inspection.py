@@ -0,0 +1,79 @@
+"""
+Checks the request inspection patterns (app/core/request_inspection.py).
+
+Ordinary product names, notes and search terms that merely contain SQL
+keywords must pass, so REQUEST_INSPECTION_MODE=block doesn't reject real
+traffic; common injection and XSS payloads must still be caught:
+
+    python verify_request_inspection.py
+"""
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")  # only the patterns are exercised
+os.environ.setdefault("SECRET_KEY", "verify-request-inspection")
+
+from app.core.request_inspection import scan
+
+BENIGN = [
+    "Upgrade (select plan) for a discount",
+    "Hotel: sleep (2 nights) and breakfast",
+    "Price; drop table at front",
+    "O'Neill cotton shirt (blue)",
+    "Soft cotton; machine wash cold. Fits true to size - see the size chart.",
+    "Credit union select savings account",
+    "Closed; exec meeting at 3pm",
+    "Tea (select from 12 blends)",
+    "Kids' sleep(3 pack) pyjamas",
+    "Rock 'n' roll -- greatest hits",
+    "Wait; shutdown the till and count cash",
+    "Bread and butter = breakfast",
+    '{"notes": "Table for two; drop table cloth off at laundry"}',
+]
+
+MALICIOUS = [
+    ("sql", "1' OR '1'='1"),
+    ("sql", "admin'--"),
+    ("sql", "1 union select null,null,null--"),
+    ("sql", "x' UNION ALL SELECT username, password FROM users--"),
+    ("sql", "1; DROP TABLE users--"),
+    ("sql", "1; drop table users"),
+    ("sql", "'; DROP TABLE sales; --"),
+    ("sql", "1 AND (SELECT 1 FROM pg_sleep(5))"),
+    ("sql", "1 and (select password from users limit 1)='a'"),
+    ("sql", "(select @@version)"),
+    ("sql", "1 or sleep(5)#"),
+    ("sql", "1) and benchmark(5000000,md5(1))"),
+    ("sql", "1; exec xp_cmdshell 'dir'"),
+    ("sql", "1; waitfor delay '0:0:5'--"),
+    ("sql", "1 or 1=1"),
+    ("xss", "<script>alert(1)</script>"),
+    ("xss", '<img src=x onerror="alert(1)">'),
+    ("xss", "javascript:alert(1)"),
+]
+
+failures = []
+
+
+def check(label, ok, detail=""):
+    print(f"{'PASS' if ok else 'FAIL'}: {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def main():
+    for text in BENIGN:
+        hit = scan(text)
+        check(f"Passes: {text}", hit is None, f"matched {hit[1]!r}" if hit else "")
+    for family, text in MALICIOUS:
+        hit = scan(text)
+        check(f"Flags {family}: {text}", hit is not None and hit[0] == family, repr(hit))
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll request inspection checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Query-count check for the sale path (sales_service.create_sale).
+
+Rings up baskets of 1 to 80 lines against a throwaway SQLite database and
+counts the statements each sale emits. The count must not depend on basket
+size: items are resolved with one IN query and low-stock alerts are evaluated
+once per sale. Stock levels and sale lines are checked along the way.
+
+    python verify_sale_queries.py
+"""
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'sale_queries.db')}"
+os.environ.setdefault("SECRET_KEY", "verify-sale-queries")
+
+from app.core.database import engine, Base, SessionLocal
+from app.core.query_stats import QueryStats, _current
+from app.models import Tenant, User, InventoryItem, Customer, Sale, Notification
+from app.services import sales_service
+
+failures = []
+
+
+def check(label, ok, detail=""):
+    print(f"{'PASS' if ok else 'FAIL'}: {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tenant = Tenant(name="Sale Queries", plan="pro")
+    db.add(tenant)
+    db.flush()
+    db.add_all([User(email=f"admin{i}@example.com", hashed_password="x", role="admin", tenant_id=tenant.id) for i in range(3)])
+    customer = Customer(name="Walk-in", phone="0", tenant_id=tenant.id)
+    db.add(customer)
+    db.add_all([
+        InventoryItem(name=f"Item {i}", barcode=f"SQ-{i}", quantity=1000, min_stock=5, selling_price=10 + i,
+                      purchase_price=5, tenant_id=tenant.id)
+        for i in range(100)
+    ])
+    db.commit()
+    ids = [row.id for row in db.query(InventoryItem.id).order_by(InventoryItem.id)]
+    result = tenant.id, customer.id, ids
+    db.close()
+    return result
+
+
+def ring_up(tenant_id, lines, **kwargs):
+    db = SessionLocal()
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        sale = sales_service.create_sale(db, sales_service.SaleCreate(items=lines, **kwargs), tenant_id, user_id=None)
+        sale_id = sale.id
+    finally:
+        _current.reset(token)
+        db.close()
+    return sale_id, stats
+
+
+def main():
+    tenant_id, customer_id, ids = seed()
+
+    # The first sale leases a block of invoice numbers; later ones take theirs from memory
+    ring_up(tenant_id, [{"item_id": ids[95], "quantity": 1}])
+
+    counts = {}
+    for size in (1, 10, 40, 80):
+        # Reversed ids: the lock order must not depend on basket order
+        lines = [{"item_id": item_id, "quantity": 2, "discount": 0} for item_id in reversed(ids[:size])]
+        _, stats = ring_up(tenant_id, lines, customer_id=customer_id, payment_method="Credit")
+        counts[size] = stats.count
+    check("Statement count independent of basket size", len(set(counts.values())) == 1,
+          ", ".join(f"{size} lines: {n}" for size, n in counts.items()))
+
+    db = SessionLocal()
+    first = db.get(InventoryItem, ids[0])
+    check("Stock decremented once per sale", first.quantity == 1000 - 4 * 2, f"quantity {first.quantity}")
+    db.close()
+
+    # Same item on two lines, plus an id from nowhere
+    lines = [{"item_id": ids[90], "quantity": 3}, {"item_id": ids[90], "quantity": 4}, {"item_id": 999999, "quantity": 1}]
+    sale_id, _ = ring_up(tenant_id, lines)
+    db = SessionLocal()
+    sale = db.get(Sale, sale_id)
+    item = db.get(InventoryItem, ids[90])
+    check("Repeated lines each recorded, unknown items skipped", len(sale.items) == 2, f"{len(sale.items)} lines")
+    check("Repeated lines both taken from stock", item.quantity == 1000 - 7, f"quantity {item.quantity}")
+    db.close()
+
+    # Push ten items under min_stock in one sale: admins are looked up once
+    lines = [{"item_id": item_id, "quantity": 996} for item_id in ids[60:70]]
+    _, stats = ring_up(tenant_id, lines)
+    admin_lookups = sum(n for sql, n in stats.statements.items() if sql.lstrip().upper().startswith("SELECT") and "FROM users" in sql)
+    db = SessionLocal()
+    alerts = db.query(Notification).filter(Notification.title == "Low Stock Alert").count()
+    db.close()
+    check("Low-stock admins looked up once per sale", admin_lookups == 1, f"{admin_lookups} lookup(s)")
+    check("One alert per low item per admin", alerts == 10 * 3, f"{alerts} alerts")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll sale query checks passed")
+
+
+if __name__ == "__main__":
+    main()
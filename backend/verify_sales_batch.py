@@ -0,0 +1,170 @@
+"""
+Checks for offline-POS batch ingestion (POST /api/v1/sales/sales/batch).
+
+Syncs a day of trading (2000 sales over 100 SKUs, some on credit, some
+with the time they were rung up) through the API against a throwaway
+SQLite database:
+
+- per-sale results in input order; an in-batch repeat and a sale with no
+  known items are reported, not fatal
+- stock moved by exactly the aggregated quantities, customer balance by
+  the credit total; one Sale per accepted sale and one SaleItem per line
+- resending the same batch changes nothing (all duplicates)
+- statements grow per 500-sale chunk, not per sale; throughput is
+  compared with the same sales posted one by one
+
+    python verify_sales_batch.py --sales 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--sales", type=int, default=2000)
+parser.add_argument("--single", type=int, default=200, help="sales posted one by one for comparison")
+args = parser.parse_args()
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'sales_batch.db')}"
+os.environ.setdefault("SECRET_KEY", "verify-sales-batch")
+os.environ["FAST_BOOT"] = "true"
+# Measure ingestion, not the limiters in front of it
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["RATELIMIT_ENABLED"] = "false"
+
+from fastapi.testclient import TestClient
+
+from app.core.database import engine, Base, SessionLocal
+from app.core.security import create_access_token
+from app.models import Tenant, User, InventoryItem, Customer, Sale, SaleItem
+from app.main import app
+
+failures = []
+
+
+def check(label, ok, detail=""):
+    print(f"{'PASS' if ok else 'FAIL'}: {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tenant = Tenant(name="Offline Store", plan="pro")
+    db.add(tenant)
+    db.flush()
+    cashier = User(email="till@example.com", hashed_password="x", role="admin", tenant_id=tenant.id)
+    customer = Customer(name="Tab customer", phone="0", outstanding_balance=0, tenant_id=tenant.id)
+    db.add_all([cashier, customer])
+    db.add_all([
+        InventoryItem(name=f"SKU {i}", barcode=f"OFF-{i}", quantity=100000, min_stock=5, selling_price=2 + i % 7,
+                      purchase_price=1, tenant_id=tenant.id)
+        for i in range(100)
+    ])
+    db.commit()
+    ids = [row.id for row in db.query(InventoryItem.id).order_by(InventoryItem.id)]
+    result = create_access_token(cashier.id), customer.id, ids
+    db.close()
+    return result
+
+
+def stock(ids):
+    db = SessionLocal()
+    levels = dict(db.query(InventoryItem.id, InventoryItem.quantity).filter(InventoryItem.id.in_(ids)).all())
+    db.close()
+    return levels
+
+
+def main():
+    token, customer_id, ids = seed()
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+    rng = random.Random(7)
+
+    sales = []
+    for n in range(args.sales):
+        credit = n % 10 == 0
+        sale = {
+            "idempotency_key": f"till-1-{n:06d}",
+            "items": [{"item_id": rng.choice(ids), "quantity": rng.randint(1, 3)} for _ in range(rng.randint(1, 8))],
+            "payment_method": "Credit" if credit else "Cash",
+            "customer_id": customer_id if credit else None,
+        }
+        if n % 3 == 0:
+            sale["date"] = f"2026-10-16T{8 + n % 12:02d}:{n % 60:02d}:00Z"
+        sales.append(sale)
+    sales.append(dict(sales[5]))  # re-queued by the till
+    sales.append({"idempotency_key": "till-1-ghost", "items": [{"item_id": 999999, "quantity": 1}]})
+
+    expected = {}
+    for sale in sales[:args.sales]:
+        for line in sale["items"]:
+            expected[line["item_id"]] = expected.get(line["item_id"], 0) + line["quantity"]
+    before = stock(ids)
+
+    started = time.perf_counter()
+    response = client.post("/api/v1/sales/sales/batch", json={"sales": sales}, headers=headers)
+    elapsed = time.perf_counter() - started
+    body = response.json()
+    batch_statements = int(response.headers["x-db-query-count"])
+    check("Batch accepted", response.status_code == 200, f"status {response.status_code}")
+    results = body["results"]
+    statuses = [r["status"] for r in results]
+    check("One result per sale, in order", len(results) == len(sales)
+          and all(r["idempotency_key"] == s["idempotency_key"] for r, s in zip(results, sales)))
+    check("Counts", (body["created"], body["duplicates"], body["rejected"]) == (args.sales, 1, 1),
+          f"created {body['created']}, duplicates {body['duplicates']}, rejected {body['rejected']}")
+    check("In-batch repeat points at the first sale", statuses[-2] == "duplicate" and results[-2]["sale_id"] == results[5]["sale_id"])
+    check("Sale with no known items rejected", statuses[-1] == "rejected")
+    print(f"INFO: {args.sales} sales synced in {elapsed:.2f}s "
+          f"({args.sales / elapsed:.0f} sales/s, {batch_statements} statements)")
+
+    after = stock(ids)
+    check("Stock moved by the aggregated quantities", all(before[i] - after[i] == expected.get(i, 0) for i in ids))
+    db = SessionLocal()
+    lines = sum(len(s["items"]) for s in sales[:args.sales])
+    credit_total = sum(r["total"] for r, s in zip(results[:args.sales], sales) if s["payment_method"] == "Credit")
+    check("One Sale and one SaleItem per line", db.query(Sale).count() == args.sales and db.query(SaleItem).count() == lines,
+          f"{db.query(Sale).count()} sales, {db.query(SaleItem).count()} lines")
+    balance = db.get(Customer, customer_id).outstanding_balance
+    check("Credit sales on the customer balance", round(balance, 2) == round(credit_total, 2), f"{balance} vs {credit_total}")
+    dated = db.query(Sale).filter(Sale.idempotency_key == "till-1-000003").one()
+    check("Offline sale keeps the time it was rung up", dated.date.strftime("%H:%M") == "11:03", str(dated.date))
+    db.close()
+
+    response = client.post("/api/v1/sales/sales/batch", json={"sales": sales}, headers=headers)
+    body = response.json()
+    check("Resent batch is all duplicates", body["created"] == 0 and body["duplicates"] == len(sales) - 1)
+    check("Resent batch leaves stock alone", stock(ids) == after)
+    check("Resent batch returns the original sale ids",
+          [r.get("sale_id") for r in body["results"]] == [r.get("sale_id") for r in results])
+
+    small = client.post("/api/v1/sales/sales/batch", json={"sales": [
+        dict(s, idempotency_key=f"till-2-{n}") for n, s in enumerate(sales[:50])
+    ]}, headers=headers)
+    # IN lists and inserts go in chunks of 500 sales: a handful of statements per chunk, none per sale
+    chunks = -(-args.sales // 500)
+    small_statements = int(small.headers["x-db-query-count"])
+    check("Statements grow per 500-sale chunk, not per sale", batch_statements <= small_statements + 4 * (chunks - 1),
+          f"50 sales: {small_statements}, {args.sales} sales: {batch_statements}")
+
+    started = time.perf_counter()
+    for sale in sales[:args.single]:
+        client.post("/api/v1/sales/sales", json={k: v for k, v in sale.items() if k not in ("idempotency_key", "date")},
+                    headers=headers)
+    single_rate = args.single / (time.perf_counter() - started)
+    print(f"INFO: one by one through POST /sales: {single_rate:.0f} sales/s "
+          f"({args.sales / single_rate:.1f}s for {args.sales} sales)")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll batch ingestion checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Access check for the platform-wide security endpoints (/api/v1/security).
+
+The rollups behind /stats and /top-offenders cover every tenant, so a
+tenant's admin must get 403 and only a superuser may read them. Runs
+against a throwaway SQLite database:
+
+    python verify_security_stats_access.py
+"""
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'security_access.db')}"
+os.environ.setdefault("SECRET_KEY", "verify-security-access")
+os.environ["FAST_BOOT"] = "true"
+
+from fastapi.testclient import TestClient
+
+from app.core.database import engine, Base, SessionLocal
+from app.core.security import create_access_token
+from app.models import Tenant, User
+from app.main import app
+
+failures = []
+
+
+def check(label, ok, detail=""):
+    print(f"{'PASS' if ok else 'FAIL'}: {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tenant = Tenant(name="Some Store", plan="pro")
+    db.add(tenant)
+    db.flush()
+    admin = User(email="owner@example.com", hashed_password="x", role="admin", tenant_id=tenant.id)
+    operator = User(email="ops@example.com", hashed_password="x", role="admin", is_superuser=True)
+    db.add_all([admin, operator])
+    db.commit()
+    tokens = create_access_token(admin.id), create_access_token(operator.id)
+    db.close()
+    return tokens
+
+
+def main():
+    admin_token, operator_token = seed()
+    client = TestClient(app)
+    for path in ("/api/v1/security/stats", "/api/v1/security/top-offenders"):
+        response = client.get(path, headers={"Authorization": f"Bearer {admin_token}"})
+        check(f"Tenant admin denied {path}", response.status_code == 403, f"status {response.status_code}")
+        response = client.get(path, headers={"Authorization": f"Bearer {operator_token}"})
+        check(f"Superuser allowed {path}", response.status_code == 200, f"status {response.status_code}")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll security endpoint access checks passed")
+
+
+if __name__ == "__main__":
+    main()
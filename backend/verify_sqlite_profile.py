@@ -0,0 +1,104 @@
+"""
+Checks for the SQLite WAL profile (SQLITE_HIGH_PERFORMANCE) on a throwaway
+database file, with a one-connection writer pool so a request that needs a
+second primary connection fails fast instead of hiding behind pool headroom:
+
+- an authenticated read endpoint (get_current_user + get_read_db) answers,
+  also right after the caller wrote (read-your-writes on the primary)
+- a session that only reads holds no write lock; one that writes does
+
+    python verify_sqlite_profile.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+
+_tmp = tempfile.TemporaryDirectory()
+_path = os.path.join(_tmp.name, "sqlite_profile.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_path}"
+# Same file as the "replica", so read-your-writes routing is exercised
+os.environ["DATABASE_READ_URL"] = f"sqlite:///{_path}"
+os.environ.setdefault("SECRET_KEY", "verify-sqlite-profile")
+os.environ["FAST_BOOT"] = "true"
+os.environ["SQLITE_HIGH_PERFORMANCE"] = "true"
+os.environ["SQLITE_WRITE_POOL_SIZE"] = "1"
+os.environ["DB_POOL_TIMEOUT"] = "3"
+os.environ["PRINCIPAL_CACHE_TTL_SECONDS"] = "0"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["RATELIMIT_ENABLED"] = "false"
+
+from fastapi.testclient import TestClient
+
+from app.core.database import engine, Base, SessionLocal
+from app.core.security import create_access_token
+from app.models import Tenant, User, InventoryItem
+from app.main import app
+
+failures = []
+
+
+def check(label, ok, detail=""):
+    print(f"{'PASS' if ok else 'FAIL'}: {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(label)
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tenant = Tenant(name="Edge Store", plan="pro")
+    db.add(tenant)
+    db.flush()
+    user = User(email="edge@example.com", hashed_password="x", role="admin", tenant_id=tenant.id, is_active=True)
+    db.add(user)
+    db.commit()
+    ids = tenant.id, user.id
+    db.close()
+    return ids
+
+
+def can_write_elsewhere() -> bool:
+    """True if another connection can take the write lock right now."""
+    other = sqlite3.connect(_path, timeout=0, isolation_level=None)
+    try:
+        other.execute("BEGIN IMMEDIATE")
+        other.execute("ROLLBACK")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        other.close()
+
+
+def main():
+    tenant_id, user_id = seed()
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    client = TestClient(app)
+
+    response = client.get("/api/v1/reports/inventory/export", headers=headers)
+    check("Authenticated read endpoint", response.status_code == 200, f"status {response.status_code}")
+    response = client.post("/api/v1/inventory/", headers=headers, json={"name": "Kettle", "quantity": 3})
+    check("Authenticated write endpoint", response.status_code == 200, f"status {response.status_code}")
+    response = client.get("/api/v1/reports/inventory/export", headers=headers)
+    check("Read right after a write (same request session, no second connection)",
+          response.status_code == 200, f"status {response.status_code}")
+
+    db = SessionLocal()
+    db.query(InventoryItem).filter(InventoryItem.tenant_id == tenant_id).all()
+    check("A session that only reads holds no write lock", can_write_elsewhere())
+    db.add(InventoryItem(name="Toaster", quantity=1, tenant_id=tenant_id))
+    db.flush()
+    check("A session that writes holds the write lock", not can_write_elsewhere())
+    db.commit()
+    check("Commit releases the write lock", can_write_elsewhere())
+    db.close()
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll SQLite profile checks passed")
+
+
+if __name__ == "__main__":
+    main()